@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Microbenchmark for temp cleanup pattern matching.
+
+Compares the per-entry cost of the original matching loop (one ``Path.match``
+per glob and one ``lower()`` per skip prefix) with ``CleanupMatcher``.
+
+Usage: python scripts/bench_cleanup_matcher.py [entries] [repeats]
+"""
+
+import random
+import sys
+import timeit
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.cleanup_engine import CleanupMatcher  # noqa: E402
+from src.core.performance_optimizer import PerformanceOptimizer  # noqa: E402
+
+CONFIG = PerformanceOptimizer.DEFAULT_CLEANUP_CONFIG
+SUFFIXES = [".tmp", ".log", ".log.1", ".cache", ".part", ".txt", ".py", ".json", ""]
+PREFIXES = ["", "", "", "~", "sys", "config", "build-", "pip-"]
+
+
+def make_names(count):
+    """Generate a reproducible mix of matching and non-matching names."""
+    rng = random.Random(42)
+    return [
+        f"{rng.choice(PREFIXES)}entry{i}{rng.choice(SUFFIXES)}" for i in range(count)
+    ]
+
+
+def legacy_match(names, base):
+    """The loop clean_temp_files used before CleanupMatcher."""
+    skip_prefixes = CONFIG["skip_prefixes"]
+    patterns = CONFIG["patterns"]
+    hits = 0
+    for name in names:
+        if any(name.lower().startswith(p) for p in skip_prefixes):
+            continue
+        item_path = base / name
+        for category_patterns in patterns.values():
+            if any(item_path.match(p) for p in category_patterns):
+                hits += 1
+                break
+    return hits
+
+
+def compiled_match(names, matcher):
+    """The same decisions made through CleanupMatcher."""
+    hits = 0
+    for name in names:
+        if matcher.is_skipped(name):
+            continue
+        if matcher.match(name) is not None:
+            hits += 1
+    return hits
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    names = make_names(count)
+    base = Path("/tmp")
+    matcher = CleanupMatcher(CONFIG["patterns"], CONFIG["skip_prefixes"])
+
+    assert legacy_match(names, base) == compiled_match(names, matcher)
+
+    results = {}
+    for label, func in (
+        ("legacy Path.match loop", lambda: legacy_match(names, base)),
+        ("CleanupMatcher", lambda: compiled_match(names, matcher)),
+    ):
+        best = min(timeit.repeat(func, number=1, repeat=repeats))
+        results[label] = best / count * 1e9
+        print(f"{label:<24} {results[label]:>10.0f} ns/entry")
+
+    legacy, compiled = results.values()
+    print(f"{'speedup':<24} {legacy / compiled:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Benchmark for the per-process top-N sampler.
+
+Starts a number of idle child processes, then times repeated
+``ProcessSampler.sample()`` scans and reports the cost per scan and per
+process, and the share of one core used at the default process sampling
+interval of the monitoring manager.
+
+Usage: python scripts/bench_process_sampler.py [children] [scans]
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.monitoring_manager import MonitoringManager  # noqa: E402
+from src.core.process_sampler import ProcessSampler  # noqa: E402
+
+
+def main():
+    children = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    scans = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    sleeper = [sys.executable, "-c", "import time; time.sleep(600)"]
+    processes = [subprocess.Popen(sleeper) for _ in range(children)]
+    try:
+        sampler = ProcessSampler()
+        sampler.sample()  # Warm the Process cache, as the monitor does
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        for _ in range(scans):
+            snapshot = sampler.sample()
+        wall = (time.perf_counter() - started) / scans
+        cpu = (time.process_time() - cpu_started) / scans
+        count = snapshot["process_count"]
+        interval = MonitoringManager.DEFAULT_PROCESS_SAMPLING_INTERVAL
+        print(f"processes:        {count}")
+        print(f"scan wall time:   {wall * 1000:.1f} ms")
+        print(
+            f"scan CPU time:    {cpu * 1000:.1f} ms ({cpu / count * 1e6:.1f} us/process)"
+        )
+        print(f"core share @ {interval:g}s: {cpu / interval * 100:.2f}%")
+        print(
+            f"estimate @ 2000:  {cpu / count * 2000 / interval * 100:.2f}% of one core"
+        )
+    finally:
+        for process in processes:
+            process.kill()
+        for process in processes:
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -51,9 +51,9 @@ class SentinelCLI:
         for opt in results["optimizations"]:
             print(f"  - {opt}")
 
-        print("\nFinal State:")
-        for key, value in results["final_state"].items():
-            print(f"  {key}: {value}")
+        print("\nState Changes:")
+        for key, change in results.get("state_changes", {}).items():
+            print(f"  {key}: {change['before']} -> {change['after']}")
 
     def run(self, profile: Optional[str] = None) -> None:
         """Run the CLI interface.
@@ -0,0 +1,181 @@
+"""
+Asyncio facade over SentinelCore.
+
+SentinelCore is synchronous: psutil calls, filesystem scans and the
+optimization run all block. AsyncSentinelCore runs them on executors it
+owns and lets concurrent callers asking for the same data share a single
+in-flight call, so any number of coroutines can use the core without
+blocking the event loop or multiplying the work.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterable, Optional
+
+from .metrics_events import TOPICS, MetricsEvent
+from .sentinel_core import SentinelCore
+
+
+class AsyncSentinelCore:
+    """
+    Asyncio-native access to a SentinelCore.
+
+    Reads (system info, metrics, startup programs) run on a small thread
+    pool; optimizations run one at a time on a dedicated thread, so a long
+    optimization never starves reads and two runs never overlap. A call
+    that is already in flight with the same arguments is joined rather than
+    started again, and cancelling one waiting coroutine does not cancel the
+    call for the others. Usable from several event loops.
+    """
+
+    def __init__(self, core: SentinelCore, max_workers: int = 4):
+        """
+        Initializes the facade.
+
+        Args:
+            core: Core to delegate to; it must already be initialized.
+            max_workers: Threads available for concurrent reads.
+
+        Raises:
+            ValueError: If max_workers is not positive.
+        """
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        self.core = core
+        self.logger = logging.getLogger(__name__)
+        self._readers = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="sentinel-async"
+        )
+        self._optimizer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sentinel-optimize"
+        )
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _shared(
+        self, key: Hashable, executor: ThreadPoolExecutor, func: Callable, *args: Any
+    ) -> Future:
+        """Return the in-flight future for ``key``, submitting ``func`` if none."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("AsyncSentinelCore is closed")
+            future = self._in_flight.get(key)
+            if future is None:
+                future = executor.submit(func, *args)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda done: self._forget(key, done))
+            return future
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def _call(
+        self, key: Hashable, executor: ThreadPoolExecutor, func: Callable, *args: Any
+    ) -> Any:
+        future = self._shared(key, executor, func, *args)
+        # The shield keeps one caller's cancellation from cancelling the others'
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running or queued."""
+        with self._lock:
+            return len(self._in_flight)
+
+    async def optimize_system(self, profile: Optional[str] = None) -> Dict[str, Any]:
+        """Run SentinelCore.optimize_system without blocking the event loop.
+
+        Args:
+            profile: Optional profile name to use for optimization
+
+        Returns:
+            Dict containing optimization results
+        """
+        return await self._call(
+            ("optimize_system", profile),
+            self._optimizer,
+            self.core.optimize_system,
+            profile,
+        )
+
+    async def get_system_info(self) -> Dict[str, Any]:
+        """Get system information and state without blocking the event loop.
+
+        Returns:
+            Dict containing system information
+        """
+        return await self._call(
+            ("get_system_info",), self._readers, self.core.get_system_info
+        )
+
+    async def get_system_metrics(self) -> Dict[str, Any]:
+        """Get current system metrics without blocking the event loop.
+
+        Returns:
+            Dict containing system metrics
+        """
+        return await self._call(
+            ("get_system_metrics",), self._readers, self.core.get_system_metrics
+        )
+
+    async def get_startup_programs(self) -> Dict[str, Any]:
+        """Get startup programs without blocking the event loop.
+
+        Returns:
+            Dict containing startup program information
+        """
+        return await self._call(
+            ("get_startup_programs",), self._readers, self.core.get_startup_programs
+        )
+
+    async def stream_metrics(
+        self,
+        min_interval: float = 0.0,
+        topics: Iterable[str] = TOPICS,
+        max_queue: int = 1,
+    ) -> AsyncIterator[MetricsEvent]:
+        """Yield metrics samples and health events as they are published.
+
+        Events are pushed by the monitoring sampler; nothing is polled. A
+        consumer slower than the sampler receives the newest sample.
+
+        Args:
+            min_interval: Minimum seconds between two delivered samples
+            topics: Topics to receive
+            max_queue: Events buffered for this consumer
+
+        Yields:
+            MetricsEvent: Each delivered event
+        """
+        queue: "asyncio.Queue[MetricsEvent]" = asyncio.Queue(maxsize=max_queue)
+        subscription = self.core.monitoring.subscribe(
+            queue=queue, topics=topics, min_interval=min_interval
+        )
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            subscription.cancel()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting calls and shut the executors down.
+
+        Args:
+            wait: Wait for running calls to finish
+        """
+        with self._lock:
+            self._closed = True
+        self._readers.shutdown(wait=wait)
+        self._optimizer.shutdown(wait=wait)
+
+    async def __aenter__(self) -> "AsyncSentinelCore":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        # Waiting for running calls must not block the event loop either
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
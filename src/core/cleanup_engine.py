@@ -0,0 +1,1100 @@
+"""Cleanup engine for SentinelPC.
+
+This module contains the building blocks used by temporary file cleanup:
+a parallel, bounded directory scanner that streams deletion candidates to
+the caller while the walk is still in progress, a compiled matcher for the
+cleanup patterns, a single-pass tree remover that measures freed space
+while it deletes, and a streamable on-disk deletion plan so that scanning
+and deleting can run at different times. Removals can be paced by an
+IOThrottle from ``io_throttle``.
+"""
+
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import queue
+import re
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from .io_throttle import IOThrottle
+
+# Decisions a scan classifier can return for a directory entry
+SCAN_DELETE = "delete"
+SCAN_DESCEND = "descend"
+SCAN_PRESERVE = "preserve"
+
+ScanClassifier = Callable[[os.DirEntry, os.stat_result, int], str]
+
+
+def _is_link_like(entry: os.DirEntry, st: os.stat_result) -> bool:
+    """Return True for symlinks and Windows reparse points (e.g. junctions)."""
+    if entry.is_symlink():
+        return True
+    attributes = getattr(st, "st_file_attributes", 0)
+    return bool(attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+
+
+@dataclass
+class ScanCandidate:
+    """
+    A filesystem entry selected for deletion by the scanner.
+
+    Attributes:
+        path (str): Full path of the entry.
+        name (str): Base name of the entry.
+        is_dir (bool): True if the entry is a real directory (not a link).
+        size (int): Size in bytes as reported by lstat (0 for directories).
+        mtime (float): Modification time as reported by lstat.
+        depth (int): Depth below the scanned root (0 for direct children).
+    """
+
+    path: str
+    name: str
+    is_dir: bool
+    size: int
+    mtime: float
+    depth: int
+
+
+@dataclass
+class ScanStats:
+    """
+    Counters collected while scanning.
+
+    Attributes:
+        entries_scanned (int): Number of directory entries examined.
+        dirs_scanned (int): Number of directories listed.
+        candidates (int): Number of entries emitted for deletion.
+        preserved (int): Number of entries the classifier chose to keep.
+        errors (List[Dict[str, str]]): Per-path errors hit during the walk.
+        elapsed_seconds (float): Wall-clock duration of the scan.
+        index_hits (int): Directories replayed from the scan index.
+        index_misses (int): Directories listed from disk while an index was in use.
+        roots_scanned (int): Roots whose listing was finished or failed.
+        completed (bool): True if the walk ran to the end.
+    """
+
+    entries_scanned: int = 0
+    dirs_scanned: int = 0
+    candidates: int = 0
+    preserved: int = 0
+    errors: List[Dict[str, str]] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    index_hits: int = 0
+    index_misses: int = 0
+    roots_scanned: int = 0
+    completed: bool = False
+
+    @property
+    def entries_per_second(self) -> float:
+        """Scan throughput in entries per second."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.entries_scanned / self.elapsed_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the counters as a report-friendly dictionary."""
+        return {
+            "entries_scanned": self.entries_scanned,
+            "dirs_scanned": self.dirs_scanned,
+            "candidates": self.candidates,
+            "preserved": self.preserved,
+            "errors": len(self.errors),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "entries_per_second": round(self.entries_per_second, 1),
+            "index_hits": self.index_hits,
+            "index_misses": self.index_misses,
+        }
+
+    @classmethod
+    def combine(cls, stats: Iterable["ScanStats"]) -> "ScanStats":
+        """
+        Aggregate the statistics of scans that ran side by side.
+
+        Args:
+            stats: Per-scan statistics.
+
+        Returns:
+            ScanStats: Summed counters; the elapsed time is that of the slowest scan.
+        """
+        combined = cls(completed=True)
+        for item in stats:
+            combined.entries_scanned += item.entries_scanned
+            combined.dirs_scanned += item.dirs_scanned
+            combined.candidates += item.candidates
+            combined.preserved += item.preserved
+            combined.errors.extend(item.errors)
+            combined.elapsed_seconds = max(
+                combined.elapsed_seconds, item.elapsed_seconds
+            )
+            combined.index_hits += item.index_hits
+            combined.index_misses += item.index_misses
+            combined.roots_scanned += item.roots_scanned
+            combined.completed = combined.completed and item.completed
+        return combined
+
+
+class CleanupMatcher:
+    """
+    Compiled form of the cleanup ``patterns`` and ``skip_prefixes`` settings.
+
+    All name globs are translated once into a single regular expression with
+    one named group per category, so matching an entry costs one regex call
+    instead of one ``Path.match`` per glob, and the matched group tells which
+    category the entry belongs to. Skip prefixes are lowercased once and
+    checked with a single ``str.startswith(tuple)``.
+    """
+
+    # Category reported when no patterns are configured and every old entry matches
+    UNCATEGORIZED = "uncategorized"
+
+    def __init__(
+        self,
+        patterns: Optional[Dict[str, Sequence[str]]],
+        skip_prefixes: Sequence[str] = (),
+        case_sensitive: Optional[bool] = None,
+    ):
+        """
+        Compiles the cleanup configuration.
+
+        Args:
+            patterns: Mapping of category name to glob patterns. An empty or
+                      missing mapping matches every entry.
+            skip_prefixes: Case-insensitive name prefixes to protect.
+            case_sensitive: Whether globs are case sensitive. Defaults to the
+                            platform behaviour of ``Path.match`` (insensitive
+                            on Windows).
+        """
+        if case_sensitive is None:
+            case_sensitive = platform.system() != "Windows"
+        self.skip_prefixes = tuple(p.lower() for p in skip_prefixes if p)
+        self.match_all = not patterns
+        self._categories: Dict[str, str] = {}
+        self._path_globs: List[Any] = []
+
+        groups = []
+        for index, (category, globs) in enumerate((patterns or {}).items()):
+            name_globs = []
+            for glob in globs:
+                if "/" in glob or "\\" in glob:
+                    # Multi-component globs keep Path.match semantics
+                    self._path_globs.append((category, glob))
+                else:
+                    name_globs.append(fnmatch.translate(glob))
+            if name_globs:
+                group = f"c{index}"
+                self._categories[group] = category
+                groups.append(f"(?P<{group}>{'|'.join(name_globs)})")
+
+        flags = 0 if case_sensitive else re.IGNORECASE
+        self._regex = re.compile("|".join(groups), flags) if groups else None
+
+    def is_skipped(self, name: str) -> bool:
+        """Return True if the name starts with one of the skip prefixes."""
+        return bool(self.skip_prefixes) and name.lower().startswith(self.skip_prefixes)
+
+    def match(self, name: str, path: Optional[str] = None) -> Optional[str]:
+        """
+        Find the cleanup category of an entry.
+
+        Args:
+            name: Base name of the entry.
+            path: Full path, only needed for multi-component globs.
+
+        Returns:
+            Optional[str]: The first matching category, or None.
+        """
+        if self.match_all:
+            return self.UNCATEGORIZED
+        if self._regex is not None:
+            found = self._regex.match(name)
+            if found is not None:
+                # fnmatch may emit its own groups, so lastgroup is not reliable
+                for group, category in self._categories.items():
+                    if found.group(group) is not None:
+                        return category
+        if self._path_globs:
+            entry_path = Path(path or name)
+            for category, glob in self._path_globs:
+                if entry_path.match(glob):
+                    return category
+        return None
+
+
+# Entry kinds stored in the scan index
+_KIND_FILE = "f"
+_KIND_DIR = "d"
+_KIND_LINK = "l"
+
+
+class _CachedStat:
+    """The subset of ``os.stat_result`` the scanner needs, rebuilt from the index."""
+
+    __slots__ = ("st_size", "st_mtime")
+
+    def __init__(self, size: int, mtime: float):
+        self.st_size = size
+        self.st_mtime = mtime
+
+
+class _CachedEntry:
+    """Stand-in for ``os.DirEntry`` when a directory listing comes from the index."""
+
+    __slots__ = ("name", "path", "_kind", "_stat")
+
+    def __init__(self, parent: str, name: str, kind: str, st: Any):
+        self.name = name
+        self.path = os.path.join(parent, name)
+        self._kind = kind
+        self._stat = st
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return self._kind == _KIND_DIR
+
+    def is_symlink(self) -> bool:
+        return self._kind == _KIND_LINK
+
+    def stat(self, follow_symlinks: bool = True) -> Any:
+        return self._stat
+
+
+class ScanIndex:
+    """
+    Persistent cache of directory listings keyed on each directory's mtime.
+
+    Adding, removing or renaming a child updates a directory's mtime, so as
+    long as the mtime is unchanged the cached listing (names, kinds, sizes and
+    mtimes of the children) can be replayed without ``scandir`` or a stat per
+    file. Subdirectories are still stat'ed because their own contents may
+    have changed. Per-directory aggregates (entry count, file bytes, oldest
+    and newest file mtime) are kept alongside each listing.
+
+    Files rewritten in place do not touch their directory's mtime, so entries
+    selected from a replayed listing should be re-checked before deletion
+    (see ``execute_plan(verify=True)``).
+    """
+
+    VERSION = 1
+    # Directories modified this close to the scan may change again within the
+    # same mtime tick, so they are not cached.
+    RACY_WINDOW_SECONDS = 2.0
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path else None
+        self._dirs: Dict[str, Dict[str, Any]] = {}
+        self._visited: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "ScanIndex":
+        """
+        Load an index from disk; a missing or unreadable file yields an empty index.
+
+        Args:
+            path: Index file location.
+
+        Returns:
+            ScanIndex: The loaded index.
+        """
+        index = cls(path)
+        try:
+            with open(path, "r", encoding="utf-8") as index_file:
+                data = json.load(index_file)
+            if data.get("version") == cls.VERSION:
+                index._dirs = data.get("dirs", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return index
+
+    def __len__(self) -> int:
+        return len(self._dirs)
+
+    def lookup(self, dir_path: str, mtime: Optional[float]) -> Optional[List[Any]]:
+        """
+        Return the cached child records of a directory if its mtime is unchanged.
+
+        Args:
+            dir_path: Directory path.
+            mtime: The directory's current mtime.
+
+        Returns:
+            Optional[List[Any]]: ``[name, kind, size, mtime]`` records, or None on a miss.
+        """
+        if mtime is None:
+            return None
+        record = self._dirs.get(dir_path)
+        if record is None or record.get("mtime") != mtime:
+            return None
+        with self._lock:
+            self._visited[dir_path] = record
+        return record["entries"]
+
+    def store(self, dir_path: str, mtime: Optional[float], entries: List[Any]) -> None:
+        """
+        Record the listing of a directory scanned from disk.
+
+        Args:
+            dir_path: Directory path.
+            mtime: The directory's mtime when it was listed.
+            entries: ``[name, kind, size, mtime]`` records of its children.
+        """
+        if mtime is None or mtime >= self._started - self.RACY_WINDOW_SECONDS:
+            return
+        file_mtimes = [e[3] for e in entries if e[1] == _KIND_FILE]
+        record = {
+            "mtime": mtime,
+            "entries": entries,
+            "stats": {
+                "entries": len(entries),
+                "files": len(file_mtimes),
+                "file_bytes": sum(e[2] for e in entries if e[1] == _KIND_FILE),
+                "oldest_mtime": min(file_mtimes) if file_mtimes else None,
+                "newest_mtime": max(file_mtimes) if file_mtimes else None,
+            },
+        }
+        with self._lock:
+            self._visited[dir_path] = record
+
+    def stats_for(self, dir_path: str) -> Optional[Dict[str, Any]]:
+        """Return the aggregated statistics recorded for a directory."""
+        record = self._visited.get(dir_path) or self._dirs.get(dir_path)
+        return record["stats"] if record else None
+
+    def save(self, complete: bool = True) -> None:
+        """
+        Write the index to disk atomically.
+
+        Args:
+            complete: True if the scan visited every directory, in which case
+                      directories that were not seen again are dropped.
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            dirs = dict(self._visited) if complete else {**self._dirs, **self._visited}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".part")
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump(
+                {"version": self.VERSION, "dirs": dirs},
+                index_file,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, self.path)
+        self._dirs = dirs
+
+
+def _entry_kind(entry: Any, st: Any) -> str:
+    """Classify a directory entry for the scan index."""
+    if _is_link_like(entry, st):
+        return _KIND_LINK
+    if entry.is_dir(follow_symlinks=False):
+        return _KIND_DIR
+    return _KIND_FILE
+
+
+class ParallelDirectoryScanner:
+    """
+    Walks directory trees on a bounded worker pool.
+
+    Every directory is listed by one worker with ``os.scandir``. Each entry is
+    stat'ed exactly once (``DirEntry.stat(follow_symlinks=False)``, which is
+    cached by the entry) and handed to a classifier that decides whether the
+    entry is a deletion candidate, a directory to descend into, or something
+    to keep. Candidates are streamed to the consumer through a bounded queue,
+    so deletion can start before the walk has finished. With a ScanIndex,
+    directories whose mtime is unchanged are replayed from the index instead.
+    """
+
+    def __init__(
+        self,
+        classify: ScanClassifier,
+        max_workers: int = 1,
+        max_depth: int = 0,
+        queue_size: int = 1024,
+        index: Optional[ScanIndex] = None,
+    ):
+        """
+        Initializes the scanner.
+
+        Args:
+            classify: Callable returning SCAN_DELETE, SCAN_DESCEND or
+                      SCAN_PRESERVE for an entry, its lstat result and its depth.
+            max_workers: Size of the worker pool.
+            max_depth: How many levels of subdirectories may be descended into.
+                       0 only examines the direct children of each root.
+            queue_size: Capacity of the candidate queue; workers block when the
+                        consumer falls behind.
+            index: Optional ScanIndex; unchanged directories are replayed from
+                   it and freshly listed ones are recorded in it.
+        """
+        self.classify = classify
+        self.index = index
+        self.max_workers = max(1, int(max_workers))
+        self.max_depth = max(0, int(max_depth))
+        self.queue_size = max(1, int(queue_size))
+        self.stats = ScanStats()
+        self._lock = threading.Lock()
+
+    def scan(self, roots: Sequence[Union[str, Path]]) -> Iterator[ScanCandidate]:
+        """
+        Scan the given roots and yield deletion candidates as they are found.
+
+        The generator may be closed early; outstanding work is then abandoned
+        and the worker pool is shut down.
+
+        Args:
+            roots: Directories to scan.
+
+        Yields:
+            ScanCandidate: Entries classified as SCAN_DELETE.
+        """
+        self.stats = ScanStats()
+        candidates: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        done = object()
+        pending = [0]
+        start_time = time.monotonic()
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="temp-scan"
+        )
+
+        def put(item: Any) -> None:
+            while not stop.is_set():
+                try:
+                    candidates.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def submit(path: str, depth: int, mtime: Optional[float]) -> None:
+            with self._lock:
+                pending[0] += 1
+            executor.submit(scan_dir, path, depth, mtime)
+
+        def listed_entries(path: str, records: List[Any]) -> Iterator[Any]:
+            # Live listing: one lstat per entry, recorded for the index
+            with os.scandir(path) as iterator:
+                for entry in iterator:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError as e:
+                        yield entry, None, e
+                        continue
+                    kind = _entry_kind(entry, st)
+                    records.append([entry.name, kind, st.st_size, st.st_mtime])
+                    yield entry, st, None
+
+        def replayed_entries(path: str, records: List[Any]) -> Iterator[Any]:
+            # Index replay: files reuse cached stats, directories are re-stat'ed
+            for name, kind, size, mtime in records:
+                st: Any = _CachedStat(size, mtime)
+                if kind == _KIND_DIR:
+                    try:
+                        st = os.stat(os.path.join(path, name), follow_symlinks=False)
+                    except FileNotFoundError:
+                        continue
+                    except OSError as e:
+                        yield _CachedEntry(path, name, kind, None), None, e
+                        continue
+                yield _CachedEntry(path, name, kind, st), st, None
+
+        def scan_dir(path: str, depth: int, dir_mtime: Optional[float]) -> None:
+            entries = preserved = found = 0
+            errors: List[Dict[str, str]] = []
+            records: List[Any] = []
+            cached = (
+                self.index.lookup(path, dir_mtime) if self.index is not None else None
+            )
+            try:
+                if cached is not None:
+                    iterator = replayed_entries(path, cached)
+                else:
+                    iterator = listed_entries(path, records)
+                for entry, st, error in iterator:
+                    if stop.is_set():
+                        break
+                    entries += 1
+                    if error is not None:
+                        errors.append({"path": entry.path, "error": str(error)})
+                        continue
+                    try:
+                        decision = self.classify(entry, st, depth)
+                        is_dir = entry.is_dir(
+                            follow_symlinks=False
+                        ) and not _is_link_like(entry, st)
+                    except OSError as e:
+                        errors.append({"path": entry.path, "error": str(e)})
+                        continue
+
+                    if decision == SCAN_DELETE:
+                        found += 1
+                        put(
+                            ScanCandidate(
+                                path=entry.path,
+                                name=entry.name,
+                                is_dir=is_dir,
+                                size=0 if is_dir else st.st_size,
+                                mtime=st.st_mtime,
+                                depth=depth,
+                            )
+                        )
+                    elif decision == SCAN_DESCEND and is_dir and depth < self.max_depth:
+                        submit(entry.path, depth + 1, st.st_mtime)
+                    else:
+                        preserved += 1
+                else:
+                    if cached is None and self.index is not None:
+                        self.index.store(path, dir_mtime, records)
+            except OSError as e:
+                errors.append({"path": path, "error": str(e)})
+            except Exception as e:
+                errors.append({"path": path, "error": f"Unexpected error: {e}"})
+            finally:
+                with self._lock:
+                    self.stats.dirs_scanned += 1
+                    self.stats.entries_scanned += entries
+                    self.stats.preserved += preserved
+                    self.stats.candidates += found
+                    self.stats.errors.extend(errors)
+                    if depth == 0 and not stop.is_set():
+                        self.stats.roots_scanned += 1
+                    if self.index is not None:
+                        if cached is not None:
+                            self.stats.index_hits += 1
+                        else:
+                            self.stats.index_misses += 1
+                    pending[0] -= 1
+                    finished = pending[0] == 0
+                if finished:
+                    put(done)
+
+        try:
+            root_paths = [str(root) for root in roots]
+            if not root_paths:
+                return
+            # Count every root before the first one can finish, so the
+            # pending counter cannot reach zero while roots are still unsent
+            with self._lock:
+                pending[0] += len(root_paths)
+            for root in root_paths:
+                try:
+                    root_mtime: Optional[float] = os.stat(root).st_mtime
+                except OSError:
+                    root_mtime = None
+                executor.submit(scan_dir, root, 0, root_mtime)
+
+            while True:
+                item = candidates.get()
+                if item is done:
+                    self.stats.completed = True
+                    break
+                yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.stats.elapsed_seconds = time.monotonic() - start_time
+
+
+def find_mount_point(path: Union[str, Path]) -> str:
+    """
+    Return the mount point of the filesystem holding a path.
+
+    Args:
+        path: Any existing path.
+
+    Returns:
+        str: The closest ancestor (or the path itself) that is a mount point.
+    """
+    current = os.path.realpath(path)
+    while not os.path.ismount(current):
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+    return current
+
+
+def group_by_mount(paths: Iterable[Union[str, Path]]) -> Dict[str, List[Path]]:
+    """
+    Group paths by the mount point of their filesystem.
+
+    Args:
+        paths: Paths to group.
+
+    Returns:
+        Dict[str, List[Path]]: Paths per mount point, in first-seen order.
+    """
+    groups: Dict[str, List[Path]] = {}
+    for path in paths:
+        groups.setdefault(find_mount_point(path), []).append(Path(path))
+    return groups
+
+
+class ByteBudget:
+    """
+    Thread-safe cap on the number of bytes a cleanup may free.
+
+    A budget created with ``limit=None`` never runs out.
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit if limit and limit > 0 else None
+        self.used = 0
+        self._lock = threading.Lock()
+
+    @property
+    def exhausted(self) -> bool:
+        """True once at least ``limit`` bytes have been freed."""
+        return self.limit is not None and self.used >= self.limit
+
+    def consume(self, num_bytes: int) -> None:
+        """Record freed bytes against the budget."""
+        with self._lock:
+            self.used += num_bytes
+
+
+@dataclass
+class RemovalResult:
+    """
+    Outcome of a file or tree removal.
+
+    Attributes:
+        files_removed (int): Number of files and links unlinked.
+        dirs_removed (int): Number of directories removed.
+        bytes_freed (int): Sum of the lstat sizes of the unlinked files.
+        errors (List[Dict[str, str]]): One entry per path that could not be removed.
+        budget_exhausted (bool): True if removal stopped because the byte budget ran out.
+    """
+
+    files_removed: int = 0
+    dirs_removed: int = 0
+    bytes_freed: int = 0
+    errors: List[Dict[str, str]] = field(default_factory=list)
+    budget_exhausted: bool = False
+
+    def merge(self, other: "RemovalResult") -> None:
+        """Add the counters of another result to this one."""
+        self.files_removed += other.files_removed
+        self.dirs_removed += other.dirs_removed
+        self.bytes_freed += other.bytes_freed
+        self.errors.extend(other.errors)
+        self.budget_exhausted = self.budget_exhausted or other.budget_exhausted
+
+
+def remove_file(
+    path: Union[str, Path],
+    size: int,
+    budget: Optional[ByteBudget] = None,
+    throttle: Optional[IOThrottle] = None,
+) -> RemovalResult:
+    """
+    Unlink a single file or link and account for its size.
+
+    Args:
+        path: File to remove.
+        size: Size in bytes (usually taken from the scan's lstat result).
+        budget: Optional byte budget to charge.
+        throttle: Optional IOThrottle to wait on before unlinking.
+
+    Returns:
+        RemovalResult: Outcome of the removal.
+    """
+    result = RemovalResult()
+    if budget is not None and budget.exhausted:
+        result.budget_exhausted = True
+        return result
+    if throttle is not None:
+        throttle.acquire(1, size)
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        return result
+    except OSError as e:
+        result.errors.append({"path": str(path), "error": f"OS error: {e}"})
+        return result
+    result.files_removed = 1
+    result.bytes_freed = size
+    if budget is not None:
+        budget.consume(size)
+    return result
+
+
+def remove_tree(
+    path: Union[str, Path],
+    budget: Optional[ByteBudget] = None,
+    throttle: Optional[IOThrottle] = None,
+) -> RemovalResult:
+    """
+    Delete a directory tree and measure the freed space in the same walk.
+
+    Unlike ``sum(glob("**/*"))`` followed by ``shutil.rmtree``, every entry is
+    visited once: files are lstat'ed through the cached ``DirEntry.stat()``
+    and unlinked immediately, then each directory is removed once its
+    children are gone. Symlinks and junctions are unlinked, never followed.
+    Failures are recorded per path and do not stop the walk. If ``budget``
+    runs out, the walk stops and leaves the rest of the tree in place.
+    With a ``throttle``, every unlink and rmdir waits for its tokens first.
+
+    Args:
+        path: Directory to remove.
+        budget: Optional byte budget shared with other removals.
+        throttle: Optional IOThrottle shared with other removals.
+
+    Returns:
+        RemovalResult: Outcome of the removal.
+    """
+    result = RemovalResult()
+    # Post-order walk: (directory, children_done)
+    stack: List[Any] = [(str(path), False)]
+
+    while stack:
+        current, children_done = stack.pop()
+        if children_done:
+            if throttle is not None:
+                throttle.acquire(1)
+            try:
+                os.rmdir(current)
+                result.dirs_removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                result.errors.append({"path": current, "error": f"OS error: {e}"})
+            continue
+
+        stack.append((current, True))
+        try:
+            with os.scandir(current) as iterator:
+                for entry in iterator:
+                    if budget is not None and budget.exhausted:
+                        result.budget_exhausted = True
+                        return result
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        if entry.is_dir(follow_symlinks=False) and not _is_link_like(
+                            entry, st
+                        ):
+                            stack.append((entry.path, False))
+                            continue
+                        if throttle is not None:
+                            throttle.acquire(1, st.st_size)
+                        # os.unlink also removes directory junctions on Windows
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        continue
+                    except OSError as e:
+                        result.errors.append(
+                            {"path": entry.path, "error": f"OS error: {e}"}
+                        )
+                        continue
+                    result.files_removed += 1
+                    result.bytes_freed += st.st_size
+                    if budget is not None:
+                        budget.consume(st.st_size)
+        except FileNotFoundError:
+            stack.pop()
+        except OSError as e:
+            stack.pop()
+            result.errors.append({"path": current, "error": f"OS error: {e}"})
+
+    return result
+
+
+# --- Deletion plans ---
+
+PLAN_FORMAT = "sentinelpc-cleanup-plan"
+PLAN_FORMAT_VERSION = 1
+
+
+@dataclass
+class PlanEntry:
+    """
+    One line of a deletion plan.
+
+    Attributes:
+        path (str): Full path of the entry to delete.
+        is_dir (bool): True if the entry is a directory tree.
+        size (int): Size in bytes at planning time (0 for directories).
+        mtime (float): Modification time at planning time.
+        category (Optional[str]): Cleanup category the entry matched.
+    """
+
+    path: str
+    is_dir: bool
+    size: int
+    mtime: float
+    category: Optional[str] = None
+
+    @classmethod
+    def from_candidate(
+        cls, candidate: ScanCandidate, category: Optional[str]
+    ) -> "PlanEntry":
+        """Build a plan entry from a scan candidate."""
+        return cls(
+            path=candidate.path,
+            is_dir=candidate.is_dir,
+            size=candidate.size,
+            mtime=candidate.mtime,
+            category=category,
+        )
+
+
+class DeletionPlanWriter:
+    """
+    Streams plan entries to a JSON-lines file.
+
+    The first line is a header object carrying the format version and any
+    metadata passed in; every following line is a compact
+    ``{"p", "d", "s", "m", "c"}`` object. The plan is written to a ``.part``
+    file and renamed into place on a clean close, so a reader never sees a
+    half-written plan.
+    """
+
+    def __init__(self, path: Union[str, Path], metadata: Optional[Dict] = None):
+        self.path = Path(path)
+        self.metadata = metadata or {}
+        self.entries = 0
+        self.total_bytes = 0
+        self.bytes_by_category: Dict[str, int] = {}
+        self._tmp_path = self.path.with_name(self.path.name + ".part")
+        self._file: Optional[Any] = None
+
+    def __enter__(self) -> "DeletionPlanWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._tmp_path, "w", encoding="utf-8")
+        header = {
+            "format": PLAN_FORMAT,
+            "version": PLAN_FORMAT_VERSION,
+            "created": datetime.datetime.now().isoformat(),
+        }
+        header.update(self.metadata)
+        self._file.write(json.dumps(header) + "\n")
+        return self
+
+    def write(self, entry: PlanEntry) -> None:
+        """Append one entry to the plan."""
+        record = {
+            "p": entry.path,
+            "d": int(entry.is_dir),
+            "s": entry.size,
+            "m": entry.mtime,
+            "c": entry.category,
+        }
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.entries += 1
+        self.total_bytes += entry.size
+        category = entry.category or CleanupMatcher.UNCATEGORIZED
+        self.bytes_by_category[category] = (
+            self.bytes_by_category.get(category, 0) + entry.size
+        )
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self._file.close()
+        if exc_type is None:
+            os.replace(self._tmp_path, self.path)
+        else:
+            try:
+                os.unlink(self._tmp_path)
+            except OSError:
+                pass
+
+
+def read_plan_header(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Read and validate the header line of a deletion plan.
+
+    Args:
+        path: Plan file to read.
+
+    Returns:
+        Dict[str, Any]: The plan header.
+
+    Raises:
+        ValueError: If the file is not a supported deletion plan.
+    """
+    with open(path, "r", encoding="utf-8") as plan_file:
+        first_line = plan_file.readline()
+    try:
+        header = json.loads(first_line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid deletion plan header in {path}: {e}") from e
+    if not isinstance(header, dict) or header.get("format") != PLAN_FORMAT:
+        raise ValueError(f"{path} is not a SentinelPC deletion plan.")
+    if header.get("version") != PLAN_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported deletion plan version {header.get('version')} in {path}."
+        )
+    return header
+
+
+def read_plan(path: Union[str, Path]) -> Iterator[PlanEntry]:
+    """
+    Stream the entries of a deletion plan without loading it into memory.
+
+    Args:
+        path: Plan file to read.
+
+    Yields:
+        PlanEntry: Entries in the order they were planned.
+
+    Raises:
+        ValueError: If the header or a line is malformed.
+    """
+    read_plan_header(path)
+    with open(path, "r", encoding="utf-8") as plan_file:
+        plan_file.readline()  # header
+        for line_number, line in enumerate(plan_file, start=2):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                yield PlanEntry(
+                    path=record["p"],
+                    is_dir=bool(record["d"]),
+                    size=int(record["s"]),
+                    mtime=float(record["m"]),
+                    category=record.get("c"),
+                )
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                raise ValueError(
+                    f"Malformed deletion plan entry at {path}:{line_number}: {e}"
+                ) from e
+
+
+@dataclass
+class PlanExecutionResult:
+    """
+    Outcome of executing a deletion plan.
+
+    Attributes:
+        removal (RemovalResult): Aggregated removal counters and errors.
+        freed_by_category (Dict[str, int]): Freed bytes per cleanup category.
+        skipped (int): Entries skipped because they vanished or changed since planning.
+        stopped (bool): True if execution was stopped early by ``should_stop``.
+    """
+
+    removal: RemovalResult = field(default_factory=RemovalResult)
+    freed_by_category: Dict[str, int] = field(default_factory=dict)
+    skipped: int = 0
+    stopped: bool = False
+
+    def merge(self, other: "PlanExecutionResult") -> None:
+        """Add the outcome of another execution to this one."""
+        self.removal.merge(other.removal)
+        for category, freed in other.freed_by_category.items():
+            self.freed_by_category[category] = (
+                self.freed_by_category.get(category, 0) + freed
+            )
+        self.skipped += other.skipped
+        self.stopped = self.stopped or other.stopped
+
+
+def _unchanged_since_plan(entry: PlanEntry) -> bool:
+    """Return True if the entry still exists with the planned mtime."""
+    try:
+        st = os.lstat(entry.path)
+    except OSError:
+        return False
+    return st.st_mtime == entry.mtime
+
+
+def execute_plan(
+    entries: Iterable[PlanEntry],
+    max_workers: int = 1,
+    budget: Optional[ByteBudget] = None,
+    verify: bool = True,
+    throttle: Optional[IOThrottle] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> PlanExecutionResult:
+    """
+    Delete the entries of a plan, optionally on a worker pool.
+
+    Entries are consumed lazily and at most a few per worker are in flight,
+    so plans far larger than memory can be executed.
+
+    Args:
+        entries: Plan entries, e.g. from read_plan() or straight from a scan.
+        max_workers: Number of deletion workers.
+        budget: Optional byte budget; no new entries are started once it runs out.
+        verify: Re-stat each entry and skip it if it vanished or its mtime
+                changed since planning. Needed when a plan is executed later.
+        throttle: Optional IOThrottle pacing the unlinks of all workers.
+        should_stop: Optional callable polled before each entry; once it
+                     returns True no new entries are started.
+
+    Returns:
+        PlanExecutionResult: Aggregated outcome.
+    """
+    result = PlanExecutionResult()
+
+    def stop_requested() -> bool:
+        if budget is not None and budget.exhausted:
+            return True
+        if should_stop is not None and should_stop():
+            result.stopped = True
+            return True
+        return False
+
+    lock = threading.Lock()
+
+    def run(entry: PlanEntry) -> None:
+        if verify and not _unchanged_since_plan(entry):
+            with lock:
+                result.skipped += 1
+            return
+        try:
+            if entry.is_dir:
+                item_result = remove_tree(entry.path, budget, throttle)
+            else:
+                item_result = remove_file(entry.path, entry.size, budget, throttle)
+        except Exception as e:
+            item_result = RemovalResult(
+                errors=[{"path": entry.path, "error": f"Unexpected error: {e}"}]
+            )
+        category = entry.category or CleanupMatcher.UNCATEGORIZED
+        with lock:
+            result.removal.merge(item_result)
+            result.freed_by_category[category] = (
+                result.freed_by_category.get(category, 0) + item_result.bytes_freed
+            )
+
+    workers = max(1, int(max_workers))
+    if workers == 1:
+        for entry in entries:
+            if stop_requested():
+                break
+            run(entry)
+    else:
+        in_flight = threading.BoundedSemaphore(workers * 4)
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="temp-delete"
+        ) as executor:
+            for entry in entries:
+                if stop_requested():
+                    break
+                in_flight.acquire()
+                future = executor.submit(run, entry)
+                future.add_done_callback(lambda _: in_flight.release())
+
+    if budget is not None and budget.exhausted:
+        result.removal.budget_exhausted = True
+    return result
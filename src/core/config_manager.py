@@ -3,6 +3,7 @@
 This module handles loading, saving, and managing configuration settings.
 """
 
+import hashlib
 import os
 import platform
 import logging
@@ -19,6 +20,39 @@ WINDOWS_SYSTEM = "Windows"
 MEMORY_THRESHOLD_2GB = 2 * 1024**3
 
 
+class VersionedConfigParser(configparser.ConfigParser):
+    """ConfigParser that counts its changes.
+
+    ``version`` is increased by every call that adds, changes or removes a
+    section or option, including reading files and dicts, so callers can
+    tell cheaply whether the content may have changed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.version = 0
+        super().__init__(*args, **kwargs)
+
+    def _read(self, fp, fpname):
+        self.version += 1
+        super()._read(fp, fpname)
+
+    def add_section(self, section):
+        self.version += 1
+        super().add_section(section)
+
+    def remove_section(self, section):
+        self.version += 1
+        return super().remove_section(section)
+
+    def set(self, section, option, value=None):
+        self.version += 1
+        super().set(section, option, value)
+
+    def remove_option(self, section, option):
+        self.version += 1
+        return super().remove_option(section, option)
+
+
 class ConfigManager:
     """Manages configuration settings for SentinelPC.
 
@@ -39,6 +73,7 @@ class ConfigManager:
         message = f"ConfigManager: Config directory is {self.config_dir}"
         self.logger.info(message)
         self.config_path = self.config_dir / config_file
+        self._hash_cache = None
         self.config = self._load_config()
         message = f"ConfigManager: Configuration loaded from {self.config_path}"
         self.logger.info(message)
@@ -63,7 +98,7 @@ class ConfigManager:
             Loaded configuration
         """
         self.logger.info("ConfigManager: Loading configuration")
-        config = configparser.ConfigParser()
+        config = VersionedConfigParser()
         config.read_dict(
             {
                 "UI": {"theme": "auto", "animations": "true"},
@@ -108,6 +143,33 @@ class ConfigManager:
             return self._default_output_dir()
         return Path(self.config["Paths"]["output_dir"])
 
+    def content_hash(self) -> str:
+        """Get a hash of the current configuration content.
+
+        The hash is only recomputed after the configuration object was
+        replaced or its change counter moved.
+
+        Returns:
+            Hex digest that changes whenever any option is added, removed or changed
+        """
+        version = getattr(self.config, "version", None)
+        cached = self._hash_cache
+        if (
+            version is not None
+            and cached is not None
+            and cached[0] is self.config
+            and cached[1] == version
+        ):
+            return cached[2]
+        digest = hashlib.sha1()
+        for section in self.config.sections():
+            digest.update(f"[{section}]\n".encode("utf-8"))
+            for key, value in self.config.items(section, raw=True):
+                digest.update(f"{key}={value}\n".encode("utf-8"))
+        content_hash = digest.hexdigest()
+        self._hash_cache = (self.config, version, content_hash)
+        return content_hash
+
     def load_config(self) -> bool:
         """Load configuration from file.
 
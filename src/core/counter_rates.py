@@ -0,0 +1,125 @@
+"""
+Per-interval deltas and rates from cumulative system counters.
+
+psutil reports network and disk I/O as totals since boot. CounterTracker
+keeps the previous snapshot and turns each new one into deltas and
+per-second rates, per NIC or per disk, tolerating counter wraparound and
+resets.
+"""
+
+import threading
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+NET_FIELDS = ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv")
+DISK_FIELDS = ("read_bytes", "write_bytes", "read_count", "write_count")
+
+_WRAP_32 = 2**32
+
+
+def counter_delta(current: int, previous: int) -> int:
+    """
+    Difference between two readings of a monotonically increasing counter.
+
+    A decrease is either a 32-bit counter wrapping around (some platforms
+    and drivers still expose 32-bit counters) or a reset, e.g. when a NIC is
+    re-created. A wrap is assumed when it implies a plausible increment of
+    less than 2**31; otherwise the counter restarted from zero and the
+    current value is the increment.
+
+    Args:
+        current: Latest reading.
+        previous: Previous reading.
+
+    Returns:
+        int: Non-negative increment.
+    """
+    if current >= previous:
+        return current - previous
+    if previous < _WRAP_32:
+        wrapped = current + _WRAP_32 - previous
+        if wrapped < _WRAP_32 // 2:
+            return wrapped
+    return current
+
+
+class CounterTracker:
+    """
+    Remembers the last snapshot of keyed counters (per NIC, per disk, ...).
+
+    update() returns the increments since the previous snapshot. Keys seen
+    for the first time produce no entry, because their increment is
+    unknown; keys that disappeared are forgotten. Thread-safe.
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        """
+        Initializes the tracker.
+
+        Args:
+            fields: Counter attribute names to track, e.g. NET_FIELDS.
+        """
+        self.fields = tuple(fields)
+        self.elapsed: Optional[float] = None
+        self._previous: Dict[str, Dict[str, int]] = {}
+        self._timestamp: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(
+        self, counters: Optional[Mapping[str, Any]], timestamp: float
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Record a snapshot and return the increments since the previous one.
+
+        Args:
+            counters: Mapping of key to a psutil counters tuple (or None
+                      when the platform does not report them).
+            timestamp: Time of the snapshot in seconds.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Increment per key and field.
+        """
+        current = {
+            key: {field: getattr(value, field, 0) for field in self.fields}
+            for key, value in (counters or {}).items()
+        }
+        with self._lock:
+            previous, self._previous = self._previous, current
+            last, self._timestamp = self._timestamp, timestamp
+            self.elapsed = None if last is None else timestamp - last
+        return {
+            key: {
+                field: counter_delta(values[field], previous[key][field])
+                for field in self.fields
+            }
+            for key, values in current.items()
+            if key in previous
+        }
+
+    def reset(self) -> None:
+        """Forget the previous snapshot."""
+        with self._lock:
+            self._previous = {}
+            self._timestamp = None
+            self.elapsed = None
+
+
+def to_rates(
+    deltas: Mapping[str, Mapping[str, int]], elapsed: Optional[float]
+) -> Dict[str, Dict[str, float]]:
+    """
+    Convert increments to per-second rates.
+
+    Args:
+        deltas: Output of CounterTracker.update().
+        elapsed: Seconds between the two snapshots.
+
+    Returns:
+        Dict[str, Dict[str, float]]: ``<field>_per_second`` per key; empty
+        when the elapsed time is unknown or not positive.
+    """
+    if not elapsed or elapsed <= 0:
+        return {}
+    return {
+        key: {f"{field}_per_second": value / elapsed for field, value in fields.items()}
+        for key, fields in deltas.items()
+    }
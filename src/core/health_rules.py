@@ -0,0 +1,406 @@
+"""
+Threshold-based health evaluation for SentinelPC metrics.
+
+A HealthEngine holds one HealthRule per metric and keeps a small state per
+metric (and per mount for per-mount metrics). Each sample is evaluated
+incrementally in O(rules): thresholds are compared against the previous
+level with a hysteresis band, and a new level only takes effect after it
+has held for the rule's minimum duration. Level changes are reported as
+HealthEvent objects to registered listeners.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Severity levels in increasing order
+SEVERITIES = ("healthy", "warning", "critical")
+_RANK = {severity: rank for rank, severity in enumerate(SEVERITIES)}
+
+
+@dataclass(frozen=True)
+class HealthRule:
+    """
+    Upper thresholds for one metric.
+
+    A level is entered when the value exceeds its threshold and left when
+    the value drops ``hysteresis`` below it. ``min_duration`` is how long a
+    higher level must be observed before it is raised, ``clear_duration``
+    how long a lower one must be observed before it is lowered.
+    """
+
+    metric: str
+    warning: Optional[float] = None
+    critical: Optional[float] = None
+    hysteresis: float = 0.0
+    min_duration: float = 0.0
+    clear_duration: float = 0.0
+
+    def __post_init__(self):
+        if self.warning is None and self.critical is None:
+            raise ValueError(f"Health rule for {self.metric} has no threshold")
+        if (
+            self.warning is not None
+            and self.critical is not None
+            and self.critical < self.warning
+        ):
+            raise ValueError(
+                f"Critical threshold of {self.metric} is below its warning threshold"
+            )
+        if self.hysteresis < 0 or self.min_duration < 0 or self.clear_duration < 0:
+            raise ValueError(
+                f"Hysteresis and durations of {self.metric} must not be negative"
+            )
+
+    def level_for(self, value: float, current: str) -> str:
+        """
+        Level indicated by a value, given the level currently in effect.
+
+        Args:
+            value: Latest metric value.
+            current: Level currently in effect.
+
+        Returns:
+            str: One of SEVERITIES.
+        """
+        for severity, threshold in (
+            ("critical", self.critical),
+            ("warning", self.warning),
+        ):
+            if threshold is None:
+                continue
+            # Levels already reached are kept until the value leaves the band
+            if _RANK[severity] <= _RANK[current]:
+                threshold -= self.hysteresis
+            if value > threshold:
+                return severity
+        return "healthy"
+
+
+DEFAULT_HEALTH_RULES = (
+    # CPU usage is noisy; only sustained load changes the health
+    HealthRule(
+        "cpu_percent", warning=90.0, critical=98.0, hysteresis=5.0, min_duration=5.0
+    ),
+    HealthRule("memory_percent", warning=90.0, critical=95.0, hysteresis=3.0),
+    HealthRule("disk_percent", warning=90.0, critical=95.0, hysteresis=1.0),
+)
+
+
+@dataclass
+class HealthEvent:
+    """A change of level of one metric (or one mount of a per-mount metric)."""
+
+    metric: str
+    key: Optional[str]
+    previous: str
+    current: str
+    value: Optional[float]
+    timestamp: float
+    status: str  # Overall health after the change
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "metric": self.metric,
+            "key": self.key,
+            "previous": self.previous,
+            "current": self.current,
+            "value": self.value,
+            "timestamp": self.timestamp,
+            "status": self.status,
+        }
+
+
+@dataclass
+class _MetricState:
+    """Level in effect for one metric key and a pending change, if any."""
+
+    level: str = "healthy"
+    since: Optional[float] = None
+    value: Optional[float] = None
+    pending: Optional[str] = None
+    pending_since: float = 0.0
+
+
+@dataclass
+class _Counts:
+    """Number of metric keys per non-healthy level, for O(1) overall status."""
+
+    levels: Dict[str, int] = field(
+        default_factory=lambda: {"warning": 0, "critical": 0}
+    )
+
+    def move(self, previous: str, current: str) -> None:
+        if previous in self.levels:
+            self.levels[previous] -= 1
+        if current in self.levels:
+            self.levels[current] += 1
+
+    @property
+    def status(self) -> str:
+        if self.levels["critical"]:
+            return "critical"
+        if self.levels["warning"]:
+            return "warning"
+        return "healthy"
+
+
+class HealthEngine:
+    """
+    Evaluates HealthRules against each new sample.
+
+    Metric values are passed as a mapping of metric name to a number, or to
+    a mapping of key to number for per-key metrics such as
+    ``disk_percent``. Metrics without a rule are ignored; rules whose metric
+    is missing from a sample keep their level. Per-key states whose key
+    disappears (e.g. an unmounted filesystem) are dropped, and cleared if
+    they were raised. Thread-safe.
+    """
+
+    def __init__(self, rules: Iterable[HealthRule] = DEFAULT_HEALTH_RULES):
+        """
+        Initializes the engine.
+
+        Args:
+            rules: One rule per metric.
+
+        Raises:
+            ValueError: If two rules target the same metric.
+        """
+        self.logger = logging.getLogger(__name__)
+        self._listeners: List[Callable[[HealthEvent], None]] = []
+        self._lock = threading.Lock()
+        self.set_rules(rules)
+
+    def set_rules(self, rules: Iterable[HealthRule]) -> None:
+        """
+        Replace the rules and forget every metric state.
+
+        Args:
+            rules: One rule per metric.
+
+        Raises:
+            ValueError: If two rules target the same metric.
+        """
+        by_metric: Dict[str, HealthRule] = {}
+        for rule in rules:
+            if rule.metric in by_metric:
+                raise ValueError(f"Duplicate health rule for {rule.metric}")
+            by_metric[rule.metric] = rule
+        with self._lock:
+            self._rules = by_metric
+            self._states: Dict[Tuple[str, Optional[str]], _MetricState] = {}
+            self._counts = _Counts()
+
+    @property
+    def rules(self) -> List[HealthRule]:
+        with self._lock:
+            return list(self._rules.values())
+
+    @property
+    def status(self) -> str:
+        """Overall health: the highest level of any metric."""
+        with self._lock:
+            return self._counts.status
+
+    def add_listener(self, listener: Callable[[HealthEvent], None]) -> None:
+        """
+        Register a function called with every HealthEvent.
+
+        Listeners run on the thread that evaluated the sample and must not
+        block; exceptions they raise are logged and ignored.
+
+        Args:
+            listener: Function taking a HealthEvent.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[HealthEvent], None]) -> None:
+        """Unregister a listener; does nothing if it is not registered."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def evaluate(
+        self, values: Mapping[str, Any], timestamp: float
+    ) -> List[HealthEvent]:
+        """
+        Evaluate a sample and notify listeners of level changes.
+
+        Args:
+            values: Metric name to value, or to a mapping of key to value.
+            timestamp: Sample time in seconds.
+
+        Returns:
+            List[HealthEvent]: Level changes caused by this sample.
+        """
+        events: List[HealthEvent] = []
+        with self._lock:
+            for metric, rule in self._rules.items():
+                value = values.get(metric)
+                if value is None:
+                    continue
+                if isinstance(value, Mapping):
+                    for key, item in value.items():
+                        self._step(rule, key, item, timestamp, events)
+                    self._drop_missing(rule, value, timestamp, events)
+                else:
+                    self._step(rule, None, value, timestamp, events)
+            listeners = list(self._listeners)
+        for event in events:
+            self._log(event)
+            for listener in listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    self.logger.error(f"Health listener failed: {e}")
+        return events
+
+    def _step(
+        self,
+        rule: HealthRule,
+        key: Optional[str],
+        value: float,
+        timestamp: float,
+        events: List[HealthEvent],
+    ) -> None:
+        """Advance one metric state. Called under the lock."""
+        state = self._states.get((rule.metric, key))
+        if state is None:
+            state = self._states[(rule.metric, key)] = _MetricState(since=timestamp)
+        state.value = value
+        target = rule.level_for(value, state.level)
+        if target == state.level:
+            state.pending = None
+            return
+        if state.pending != target:
+            state.pending = target
+            state.pending_since = timestamp
+        raising = _RANK[target] > _RANK[state.level]
+        required = rule.min_duration if raising else rule.clear_duration
+        if timestamp - state.pending_since >= required:
+            self._transition(rule.metric, key, state, target, timestamp, events)
+
+    def _drop_missing(
+        self,
+        rule: HealthRule,
+        present: Mapping[str, Any],
+        timestamp: float,
+        events: List[HealthEvent],
+    ) -> None:
+        """Forget per-key states whose key is gone. Called under the lock."""
+        missing = [
+            state_key
+            for state_key in self._states
+            if state_key[0] == rule.metric and state_key[1] not in present
+        ]
+        for state_key in missing:
+            state = self._states.pop(state_key)
+            if state.level != "healthy":
+                state.value = None
+                self._transition(
+                    rule.metric, state_key[1], state, "healthy", timestamp, events
+                )
+
+    def _transition(
+        self,
+        metric: str,
+        key: Optional[str],
+        state: _MetricState,
+        level: str,
+        timestamp: float,
+        events: List[HealthEvent],
+    ) -> None:
+        """Apply a level change and record its event. Called under the lock."""
+        previous = state.level
+        self._counts.move(previous, level)
+        state.level = level
+        state.since = timestamp
+        state.pending = None
+        events.append(
+            HealthEvent(
+                metric,
+                key,
+                previous,
+                level,
+                state.value,
+                timestamp,
+                self._counts.status,
+            )
+        )
+
+    def _log(self, event: HealthEvent) -> None:
+        subject = (
+            event.metric if event.key is None else f"{event.metric} on {event.key}"
+        )
+        message = f"Health of {subject}: {event.previous} -> {event.current}"
+        if event.value is not None:
+            message += f" ({event.value:.1f})"
+        if _RANK[event.current] > _RANK[event.previous]:
+            self.logger.warning(message)
+        else:
+            self.logger.info(message)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current level of every tracked metric.
+
+        Returns:
+            Dict[str, Any]: ``status`` and ``metrics``, a list of dicts with
+            metric, key, level, value, since and pending.
+        """
+        with self._lock:
+            return {
+                "status": self._counts.status,
+                "metrics": [
+                    {
+                        "metric": metric,
+                        "key": key,
+                        "level": state.level,
+                        "value": state.value,
+                        "since": state.since,
+                        "pending": state.pending,
+                    }
+                    for (metric, key), state in self._states.items()
+                ],
+            }
+
+    def reset(self) -> None:
+        """Forget every metric state; the rules and listeners are kept."""
+        with self._lock:
+            self._states = {}
+            self._counts = _Counts()
+
+
+def parse_rules(value: Any) -> List[HealthRule]:
+    """
+    Parse a health rule setting.
+
+    Args:
+        value: Sequence of HealthRule objects or dicts with HealthRule
+               fields, or a mapping of metric name to such a dict.
+
+    Returns:
+        List[HealthRule]: The parsed rules.
+
+    Raises:
+        ValueError: If a rule is malformed.
+    """
+    if isinstance(value, Mapping):
+        value = [dict(spec, metric=metric) for metric, spec in value.items()]
+    rules: List[HealthRule] = []
+    for spec in value:
+        if isinstance(spec, HealthRule):
+            rules.append(spec)
+            continue
+        try:
+            fields = {
+                name: item if name == "metric" or item is None else float(item)
+                for name, item in spec.items()
+            }
+            rules.append(HealthRule(**fields))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid health rule {spec}: {e}") from e
+    return rules
@@ -0,0 +1,245 @@
+"""
+I/O throttling for SentinelPC disk maintenance.
+
+Provides a token-bucket rate limiter for filesystem operations and bytes,
+with adaptive backoff when the disks are already busy, so bulk deletions do
+not starve latency-sensitive workloads on the same host.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import psutil
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of blocking.
+
+    A reservation larger than the available tokens drives the bucket into
+    debt and returns how long the caller has to wait, so a single large
+    request is paced rather than rejected. Not thread-safe on its own;
+    callers serialize access.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initializes the bucket, full.
+
+        Args:
+            rate: Tokens added per second.
+            capacity: Maximum burst size. Defaults to one second's worth of tokens.
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else self.rate
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+
+    def reserve(self, amount: float, now: Optional[float] = None) -> float:
+        """
+        Take tokens from the bucket.
+
+        Args:
+            amount: Tokens to take.
+            now: Current ``time.monotonic()`` value, if already known.
+
+        Returns:
+            float: Seconds the caller must wait before using the tokens.
+        """
+        now = time.monotonic() if now is None else now
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        self._tokens -= amount
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+
+def disk_busy_percent_probe() -> Callable[[], Optional[float]]:
+    """
+    Build a probe reporting how busy the disks were since the previous call.
+
+    Uses the ``busy_time`` counter of ``psutil.disk_io_counters()``, which is
+    only available on some platforms (e.g. Linux); elsewhere the probe always
+    returns None.
+
+    Returns:
+        Callable[[], Optional[float]]: Probe returning the busy percentage.
+    """
+    state: Dict[str, float] = {}
+
+    def probe() -> Optional[float]:
+        try:
+            counters = psutil.disk_io_counters()
+        except (OSError, RuntimeError):
+            return None
+        busy_ms = getattr(counters, "busy_time", None)
+        if busy_ms is None:
+            return None
+        now = time.monotonic()
+        previous = state.get("busy_ms"), state.get("time")
+        state["busy_ms"], state["time"] = busy_ms, now
+        if previous[0] is None or now <= previous[1]:
+            return None
+        busy_percent = (busy_ms - previous[0]) / ((now - previous[1]) * 1000) * 100
+        # The aggregate counter sums all disks and may exceed 100%
+        return max(0.0, min(100.0, busy_percent))
+
+    return probe
+
+
+@dataclass
+class ThrottleStats:
+    """
+    Counters describing how an IOThrottle paced its callers.
+
+    Attributes:
+        operations (int): Operations admitted.
+        bytes (int): Bytes admitted.
+        elapsed_seconds (float): Time since the throttle was created.
+        throttled_seconds (float): Total time callers spent waiting.
+        backoffs (int): Number of times the rate was cut because the disks were busy.
+        rate_factor (float): Current fraction of the configured rates in effect.
+    """
+
+    operations: int = 0
+    bytes: int = 0
+    elapsed_seconds: float = 0.0
+    throttled_seconds: float = 0.0
+    backoffs: int = 0
+    rate_factor: float = 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the counters and achieved rates as a report-friendly dictionary."""
+        elapsed = self.elapsed_seconds or 0.0
+        return {
+            "operations": self.operations,
+            "bytes": self.bytes,
+            "ops_per_second": round(self.operations / elapsed, 1) if elapsed else 0.0,
+            "bytes_per_second": round(self.bytes / elapsed, 1) if elapsed else 0.0,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "backoffs": self.backoffs,
+            "rate_factor": round(self.rate_factor, 2),
+        }
+
+
+class IOThrottle:
+    """
+    Rate limiter for filesystem operations and bytes, shared by worker threads.
+
+    Each caller reserves tokens for one operation and its byte count, then
+    sleeps outside the lock for as long as either bucket is in debt. When a
+    busy probe is given, the configured rates are halved while the disks are
+    busier than ``busy_threshold_percent`` and restored gradually once they
+    calm down. A rate of 0 means that dimension is unlimited.
+    """
+
+    MIN_RATE_FACTOR = 0.1
+    RECOVERY_STEP = 0.1
+
+    def __init__(
+        self,
+        ops_per_second: float = 0,
+        bytes_per_second: float = 0,
+        busy_threshold_percent: float = 0,
+        busy_probe: Optional[Callable[[], Optional[float]]] = None,
+        probe_interval: float = 0.5,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initializes the throttle.
+
+        Args:
+            ops_per_second: Maximum operations per second (0 = unlimited).
+            bytes_per_second: Maximum bytes per second (0 = unlimited).
+            busy_threshold_percent: Disk busy percentage above which the rates
+                                    back off (0 disables adaptive backoff).
+            busy_probe: Callable returning the current disk busy percentage,
+                        or None when unknown. Defaults to disk_busy_percent_probe().
+            probe_interval: Minimum seconds between two busy probes.
+            sleep: Sleep function, replaceable for testing.
+        """
+        self.ops_per_second = max(0.0, float(ops_per_second))
+        self.bytes_per_second = max(0.0, float(bytes_per_second))
+        self.busy_threshold_percent = max(0.0, float(busy_threshold_percent))
+        self._ops = TokenBucket(self.ops_per_second) if self.ops_per_second else None
+        self._bytes = (
+            TokenBucket(self.bytes_per_second) if self.bytes_per_second else None
+        )
+        if self.busy_threshold_percent and busy_probe is None:
+            busy_probe = disk_busy_percent_probe()
+        self._busy_probe = busy_probe if self.busy_threshold_percent else None
+        self.probe_interval = probe_interval
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._next_probe = self._started
+        self.stats = ThrottleStats()
+
+    @property
+    def enabled(self) -> bool:
+        """True if any rate limit is configured."""
+        return self._ops is not None or self._bytes is not None
+
+    def _adapt(self, now: float) -> None:
+        """Adjust the rate factor from the busy probe. Called under the lock."""
+        if self._busy_probe is None or now < self._next_probe:
+            return
+        self._next_probe = now + self.probe_interval
+        busy_percent = self._busy_probe()
+        if busy_percent is None:
+            return
+        factor = self.stats.rate_factor
+        if busy_percent > self.busy_threshold_percent:
+            factor = max(self.MIN_RATE_FACTOR, factor / 2)
+            self.stats.backoffs += 1
+        else:
+            factor = min(1.0, factor + self.RECOVERY_STEP)
+        if factor != self.stats.rate_factor:
+            self.stats.rate_factor = factor
+            if self._ops is not None:
+                self._ops.rate = self.ops_per_second * factor
+            if self._bytes is not None:
+                self._bytes.rate = self.bytes_per_second * factor
+
+    def acquire(self, operations: int = 1, nbytes: int = 0) -> float:
+        """
+        Wait until the given operations and bytes fit within the rate limits.
+
+        Args:
+            operations: Number of operations about to be performed.
+            nbytes: Number of bytes those operations touch.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._adapt(now)
+            wait = 0.0
+            if self._ops is not None and operations:
+                wait = self._ops.reserve(operations, now)
+            if self._bytes is not None and nbytes:
+                wait = max(wait, self._bytes.reserve(nbytes, now))
+            self.stats.operations += operations
+            self.stats.bytes += nbytes
+            self.stats.throttled_seconds += wait
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the throttle statistics, including achieved rates.
+
+        Returns:
+            Dict[str, Any]: ThrottleStats.to_dict() plus the configured limits.
+        """
+        with self._lock:
+            self.stats.elapsed_seconds = time.monotonic() - self._started
+            stats = self.stats.to_dict()
+        stats["limit_ops_per_second"] = self.ops_per_second
+        stats["limit_bytes_per_second"] = self.bytes_per_second
+        return stats
@@ -0,0 +1,233 @@
+"""
+Columnar ring buffer for SentinelPC metrics history.
+
+Stores each metric in its own preallocated typed array instead of keeping
+one object per sample, so appends are O(1), memory per sample is a few
+dozen bytes, and history slices can be exported column by column.
+"""
+
+import math
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+# Scalar columns and their array type codes
+COLUMN_TYPES = {
+    "timestamp": "d",
+    "cpu_percent": "d",
+    "memory_percent": "d",
+    "bytes_sent": "q",
+    "bytes_recv": "q",
+    "disk_read_bytes": "q",
+    "disk_write_bytes": "q",
+}
+# Columns holding increments since the previous sample
+DELTA_COLUMNS = ("bytes_sent", "bytes_recv", "disk_read_bytes", "disk_write_bytes")
+DISK_TYPE = "d"
+
+
+class MetricsRingBuffer:
+    """
+    Fixed-capacity ring buffer with one typed array per metric.
+
+    Positions are chronological: 0 is the oldest retained sample and -1 the
+    newest. Disk usage is stored as one percentage column per mount point;
+    a mount that is missing from a sample holds NaN there. ``version`` is
+    incremented on every change, so derived values can be cached until the
+    next sample arrives. Thread-safe.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initializes the buffer.
+
+        Args:
+            capacity: Maximum number of samples retained.
+
+        Raises:
+            ValueError: If capacity is not positive.
+        """
+        if capacity <= 0:
+            raise ValueError("Metrics history size must be positive integer")
+        self.capacity = capacity
+        self._columns = {
+            name: array(code, bytes(array(code).itemsize * capacity))
+            for name, code in COLUMN_TYPES.items()
+        }
+        self._disk: Dict[str, array] = {}
+        self._next = 0  # Slot the next sample is written to
+        self._size = 0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def mounts(self) -> List[str]:
+        """Mount points seen so far, in order of first appearance."""
+        with self._lock:
+            return list(self._disk)
+
+    def append(
+        self,
+        timestamp: float,
+        cpu_percent: float,
+        memory_percent: float,
+        disk_percent: Dict[str, float],
+        bytes_sent: int = 0,
+        bytes_recv: int = 0,
+        disk_read_bytes: int = 0,
+        disk_write_bytes: int = 0,
+    ) -> None:
+        """
+        Add a sample, overwriting the oldest one when the buffer is full.
+
+        Args:
+            timestamp: Sample time as seconds since the epoch.
+            cpu_percent: CPU utilization percentage.
+            memory_percent: Memory utilization percentage.
+            disk_percent: Usage percentage per mount point.
+            bytes_sent: Bytes sent since the previous sample.
+            bytes_recv: Bytes received since the previous sample.
+            disk_read_bytes: Bytes read from disk since the previous sample.
+            disk_write_bytes: Bytes written to disk since the previous sample.
+        """
+        with self._lock:
+            slot = self._next
+            columns = self._columns
+            columns["timestamp"][slot] = timestamp
+            columns["cpu_percent"][slot] = cpu_percent
+            columns["memory_percent"][slot] = memory_percent
+            columns["bytes_sent"][slot] = bytes_sent
+            columns["bytes_recv"][slot] = bytes_recv
+            columns["disk_read_bytes"][slot] = disk_read_bytes
+            columns["disk_write_bytes"][slot] = disk_write_bytes
+            for mount in disk_percent:
+                if mount not in self._disk:
+                    self._disk[mount] = array(DISK_TYPE, [math.nan]) * self.capacity
+            for mount, column in self._disk.items():
+                column[slot] = disk_percent.get(mount, math.nan)
+            self._next = (slot + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            self.version += 1
+
+    def clear(self) -> None:
+        """Forget all samples and mount points."""
+        with self._lock:
+            self._disk.clear()
+            self._next = 0
+            self._size = 0
+            self.version += 1
+
+    def position_since(self, timestamp: float) -> int:
+        """
+        Find the first sample taken at or after a point in time.
+
+        Args:
+            timestamp: Seconds since the epoch.
+
+        Returns:
+            int: Chronological position of that sample, or len(self) if
+            every sample is older.
+        """
+        with self._lock:
+            timestamps = self._columns["timestamp"]
+            oldest = self._next if self._size == self.capacity else 0
+            low, high = 0, self._size
+            while low < high:
+                middle = (low + high) // 2
+                if timestamps[(oldest + middle) % self.capacity] < timestamp:
+                    low = middle + 1
+                else:
+                    high = middle
+            return low
+
+    def _chronological(
+        self, column: array, start: Optional[int], stop: Optional[int]
+    ) -> array:
+        """Return a chronological slice of a column. Called under the lock."""
+        first, last, _ = slice(start, stop).indices(self._size)
+        count = max(0, last - first)
+        # Physical slot of the oldest sample is 0 until the buffer wraps
+        oldest = self._next if self._size == self.capacity else 0
+        begin = (oldest + first) % self.capacity
+        end = begin + count
+        if end <= self.capacity:
+            return column[begin:end]
+        return column[begin:] + column[: end - self.capacity]
+
+    def column(
+        self, name: str, start: Optional[int] = None, stop: Optional[int] = None
+    ) -> array:
+        """
+        Return a chronological slice of one scalar column.
+
+        Args:
+            name: Column name from COLUMN_TYPES.
+            start: First position (supports negative indexes).
+            stop: End position, exclusive.
+
+        Returns:
+            array: Copy of the requested values.
+
+        Raises:
+            KeyError: If the column does not exist.
+        """
+        with self._lock:
+            return self._chronological(self._columns[name], start, stop)
+
+    def disk_column(
+        self, mount: str, start: Optional[int] = None, stop: Optional[int] = None
+    ) -> array:
+        """
+        Return a chronological slice of one mount point's usage percentages.
+
+        Args:
+            mount: Mount point.
+            start: First position (supports negative indexes).
+            stop: End position, exclusive.
+
+        Returns:
+            array: Copy of the requested values; NaN where the mount was absent.
+
+        Raises:
+            KeyError: If the mount point was never sampled.
+        """
+        with self._lock:
+            return self._chronological(self._disk[mount], start, stop)
+
+    def export(
+        self,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Export a slice of the history as plain lists, one per column.
+
+        Args:
+            start: First position (supports negative indexes).
+            stop: End position, exclusive.
+            columns: Scalar columns to include. Defaults to all of them.
+
+        Returns:
+            Dict[str, Any]: Column name to list of values, plus
+            ``disk_percent`` mapping each mount point to its list of
+            percentages (None where the mount was absent).
+        """
+        names = list(COLUMN_TYPES) if columns is None else list(columns)
+        with self._lock:
+            exported: Dict[str, Any] = {
+                name: self._chronological(self._columns[name], start, stop).tolist()
+                for name in names
+            }
+            disk = {
+                mount: self._chronological(column, start, stop).tolist()
+                for mount, column in self._disk.items()
+            }
+        exported["disk_percent"] = {
+            mount: [None if math.isnan(value) else value for value in values]
+            for mount, values in disk.items()
+        }
+        return exported
@@ -0,0 +1,344 @@
+"""
+Publish/subscribe delivery of SentinelPC monitoring events.
+
+MonitoringManager publishes every new sample and every health transition
+to a MetricsPublisher. Subscribers receive them through a callback, run on
+a delivery thread of their own, or an asyncio queue. Samples are rate
+limited per subscriber and coalesced: a subscriber that is slower than the
+sampler only ever receives the newest sample. Health events are never
+coalesced; they are delivered in order ahead of the pending sample.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+SAMPLE = "sample"
+HEALTH = "health"
+TOPICS = (SAMPLE, HEALTH)
+
+
+@dataclass(frozen=True)
+class MetricsEvent:
+    """One published event."""
+
+    topic: str
+    payload: Dict[str, Any]
+    timestamp: float
+
+
+class Subscription:
+    """
+    Pending events of one subscriber.
+
+    Publishing only stores the event and wakes the delivery mechanism, so a
+    slow subscriber never delays the sampler or other subscribers.
+    """
+
+    def __init__(
+        self,
+        publisher: "MetricsPublisher",
+        topics: Iterable[str],
+        min_interval: float = 0.0,
+        max_backlog: int = 100,
+    ):
+        """
+        Initializes the subscription.
+
+        Args:
+            publisher: Publisher the subscription belongs to.
+            topics: Topics to receive, from TOPICS.
+            min_interval: Minimum seconds between two delivered samples.
+            max_backlog: Maximum undelivered health events; the oldest are
+                         dropped beyond that.
+
+        Raises:
+            ValueError: If a topic is unknown or a limit is out of range.
+        """
+        self.topics = frozenset(topics)
+        unknown = self.topics.difference(TOPICS)
+        if unknown:
+            raise ValueError(f"Unknown metrics topics: {', '.join(sorted(unknown))}")
+        if min_interval < 0:
+            raise ValueError("Minimum delivery interval must not be negative")
+        if max_backlog <= 0:
+            raise ValueError("Event backlog must be positive")
+        self.min_interval = min_interval
+        self.max_backlog = max_backlog
+        self.logger = logging.getLogger(__name__)
+        self._publisher = publisher
+        self._condition = threading.Condition()
+        self._sample: Optional[MetricsEvent] = None
+        self._events: Deque[MetricsEvent] = deque()
+        self._last_sample_at = float("-inf")
+        self.active = True
+        # Delivery statistics
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def offer(self, event: MetricsEvent) -> None:
+        """Queue an event for delivery. Called by the publisher."""
+        if event.topic not in self.topics:
+            return
+        with self._condition:
+            if not self.active:
+                return
+            if event.topic == SAMPLE:
+                if self._sample is not None:
+                    self.coalesced += 1
+                self._sample = event
+            else:
+                if len(self._events) >= self.max_backlog:
+                    self._events.popleft()
+                    self.dropped += 1
+                self._events.append(event)
+            self._condition.notify()
+        self._wake()
+
+    def cancel(self) -> None:
+        """Stop delivery and detach from the publisher."""
+        with self._condition:
+            self.active = False
+            self._sample = None
+            self._events.clear()
+            self._condition.notify()
+        self._publisher.unsubscribe(self)
+
+    def _wake(self) -> None:
+        """Hook for delivery mechanisms that are not waiting on the condition."""
+
+    def _take_ready(self) -> Tuple[List[MetricsEvent], Optional[float]]:
+        """
+        Take the events that may be delivered now. Called under the condition.
+
+        Returns:
+            Tuple[List[MetricsEvent], Optional[float]]: Ready events, and the
+            seconds until a rate-limited sample may be delivered (or None).
+        """
+        ready = list(self._events)
+        self._events.clear()
+        wait = None
+        if self._sample is not None:
+            now = time.monotonic()
+            remaining = self._last_sample_at + self.min_interval - now
+            if remaining <= 0:
+                ready.append(self._sample)
+                self._sample = None
+                self._last_sample_at = now
+            else:
+                wait = remaining
+        return ready, wait
+
+    def _requeue(self, events: List[MetricsEvent]) -> None:
+        """Put back events that could not be delivered. Called under the condition."""
+        for event in reversed(events):
+            if event.topic != SAMPLE:
+                self._events.appendleft(event)
+            elif self._sample is None:
+                self._sample = event
+            else:
+                self.coalesced += 1
+        while len(self._events) > self.max_backlog:
+            self._events.popleft()
+            self.dropped += 1
+
+
+class CallbackSubscription(Subscription):
+    """Delivers events to a callback on a dedicated daemon thread."""
+
+    def __init__(
+        self,
+        publisher: "MetricsPublisher",
+        callback: Callable[[MetricsEvent], Any],
+        topics: Iterable[str],
+        min_interval: float = 0.0,
+        max_backlog: int = 100,
+    ):
+        super().__init__(publisher, topics, min_interval, max_backlog)
+        self.callback = callback
+        self._thread = threading.Thread(
+            target=self._deliver, name="metrics-subscriber", daemon=True
+        )
+        self._thread.start()
+
+    def _deliver(self) -> None:
+        """Delivery thread body."""
+        while True:
+            with self._condition:
+                while True:
+                    if not self.active:
+                        return
+                    ready, wait = self._take_ready()
+                    if ready:
+                        break
+                    self._condition.wait(wait)
+            for event in ready:
+                try:
+                    self.callback(event)
+                    self.delivered += 1
+                except Exception as e:
+                    self.logger.error(f"Metrics subscriber callback failed: {e}")
+
+
+class QueueSubscription(Subscription):
+    """
+    Delivers events into an asyncio.Queue on its event loop.
+
+    When the queue is full, undelivered events are retried shortly after,
+    and newer samples replace the undelivered one.
+    """
+
+    RETRY_SECONDS = 0.1
+
+    def __init__(
+        self,
+        publisher: "MetricsPublisher",
+        queue: "asyncio.Queue[MetricsEvent]",
+        loop: asyncio.AbstractEventLoop,
+        topics: Iterable[str],
+        min_interval: float = 0.0,
+        max_backlog: int = 100,
+    ):
+        super().__init__(publisher, topics, min_interval, max_backlog)
+        self.queue = queue
+        self.loop = loop
+        self._scheduled = False
+
+    def _wake(self) -> None:
+        with self._condition:
+            if self._scheduled or not self.active:
+                return
+            self._scheduled = True
+        try:
+            self.loop.call_soon_threadsafe(self._deliver)
+        except RuntimeError:
+            # The event loop was closed; nobody can receive events any more
+            self.cancel()
+
+    def _deliver(self) -> None:
+        """Runs on the event loop."""
+        retry = None
+        with self._condition:
+            self._scheduled = False
+            if not self.active:
+                return
+            ready, wait = self._take_ready()
+            for index, event in enumerate(ready):
+                try:
+                    self.queue.put_nowait(event)
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    self._requeue(ready[index:])
+                    retry = self.RETRY_SECONDS
+                    break
+            delay = retry if wait is None else min(wait, retry or wait)
+            if delay is not None:
+                self._scheduled = True
+        if delay is not None:
+            self.loop.call_later(delay, self._deliver)
+
+
+class MetricsPublisher:
+    """Fans published events out to subscriptions. Thread-safe."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._subscriptions: Tuple[Subscription, ...] = ()
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self,
+        callback: Optional[Callable[[MetricsEvent], Any]] = None,
+        queue: Optional["asyncio.Queue[MetricsEvent]"] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        topics: Iterable[str] = TOPICS,
+        min_interval: float = 0.0,
+        max_backlog: int = 100,
+    ) -> Subscription:
+        """
+        Register a subscriber.
+
+        Exactly one of ``callback`` and ``queue`` must be given.
+
+        Args:
+            callback: Function called with each MetricsEvent on the
+                      subscription's own delivery thread.
+            queue: asyncio queue receiving each MetricsEvent.
+            loop: Event loop owning ``queue``; defaults to the running loop.
+            topics: Topics to receive, from TOPICS.
+            min_interval: Minimum seconds between two delivered samples.
+            max_backlog: Maximum undelivered health events.
+
+        Returns:
+            Subscription: Handle whose cancel() stops delivery.
+
+        Raises:
+            ValueError: If the arguments are inconsistent.
+        """
+        if (callback is None) == (queue is None):
+            raise ValueError("Subscribe with either a callback or a queue")
+        if callback is not None:
+            subscription: Subscription = CallbackSubscription(
+                self, callback, topics, min_interval, max_backlog
+            )
+        else:
+            if loop is None:
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    raise ValueError(
+                        "An event loop is required to subscribe with a queue"
+                    ) from None
+            subscription = QueueSubscription(
+                self, queue, loop, topics, min_interval, max_backlog
+            )
+        with self._lock:
+            self._subscriptions += (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Detach a subscription; does nothing if it is not registered."""
+        with self._lock:
+            self._subscriptions = tuple(
+                existing
+                for existing in self._subscriptions
+                if existing is not subscription
+            )
+        if subscription.active:
+            subscription.cancel()
+
+    def has_subscribers(self, topic: str) -> bool:
+        """True if any subscription receives the topic."""
+        return any(topic in subscription.topics for subscription in self._subscriptions)
+
+    def publish(
+        self, topic: str, payload: Dict[str, Any], timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Offer an event to every subscription; never blocks on subscribers.
+
+        Args:
+            topic: Event topic, from TOPICS.
+            payload: Event data; subscribers must treat it as read-only.
+            timestamp: Event time; defaults to now.
+        """
+        subscriptions = self._subscriptions
+        if not subscriptions:
+            return
+        event = MetricsEvent(
+            topic, payload, time.time() if timestamp is None else timestamp
+        )
+        for subscription in subscriptions:
+            subscription.offer(event)
+
+    def close(self) -> None:
+        """Cancel every subscription."""
+        with self._lock:
+            subscriptions, self._subscriptions = self._subscriptions, ()
+        for subscription in subscriptions:
+            subscription.cancel()
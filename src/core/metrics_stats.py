@@ -0,0 +1,330 @@
+"""
+Rolling statistics over the SentinelPC metrics history.
+
+Computes mean, min, max and percentiles over time windows of a
+MetricsRingBuffer, plus exponentially weighted moving averages and network
+and disk throughput. Window results are cached until the next sample arrives, so
+frequent polling between samples costs a dictionary lookup. NumPy is used
+for the window computations when it is installed.
+"""
+
+import math
+import threading
+from array import array
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+
+    _HAS_NUMPY = True
+except ImportError:
+    np = None
+    _HAS_NUMPY = False
+
+from .metrics_buffer import DELTA_COLUMNS, MetricsRingBuffer
+
+PERCENTILES = (50, 95, 99)
+# Metrics tracked with an EWMA; byte counters are tracked as rates
+EWMA_METRICS = ("cpu_percent", "memory_percent") + tuple(
+    f"{name}_per_second" for name in DELTA_COLUMNS
+)
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    Percentile of sorted values with linear interpolation (NumPy's default).
+
+    Args:
+        sorted_values: Values in ascending order; must not be empty.
+        q: Percentile between 0 and 100.
+
+    Returns:
+        float: The interpolated percentile.
+    """
+    rank = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = rank - lower
+    return (
+        sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+    )
+
+
+def describe(values: array) -> Dict[str, Any]:
+    """
+    Summarize a column slice, ignoring NaN values.
+
+    Args:
+        values: Typed array as returned by MetricsRingBuffer.column().
+
+    Returns:
+        Dict[str, Any]: count, mean, min, max and one ``pNN`` entry per
+        PERCENTILES value. Statistics are None when there are no values.
+    """
+    if _HAS_NUMPY:
+        data = np.frombuffer(values, dtype=values.typecode).astype(float)
+        data = data[~np.isnan(data)]
+        count = int(data.size)
+        if not count:
+            return _empty_description()
+        quantiles = np.percentile(data, PERCENTILES)
+        stats = {
+            "count": count,
+            "mean": float(data.mean()),
+            "min": float(data.min()),
+            "max": float(data.max()),
+        }
+        for q, value in zip(PERCENTILES, quantiles):
+            stats[f"p{q}"] = float(value)
+        return stats
+
+    data = sorted(value for value in values if value == value)  # Drop NaN
+    if not data:
+        return _empty_description()
+    stats = {
+        "count": len(data),
+        "mean": math.fsum(data) / len(data),
+        "min": data[0],
+        "max": data[-1],
+    }
+    for q in PERCENTILES:
+        stats[f"p{q}"] = percentile(data, q)
+    return stats
+
+
+def _empty_description() -> Dict[str, Any]:
+    """Description of an empty window."""
+    stats: Dict[str, Any] = {"count": 0, "mean": None, "min": None, "max": None}
+    for q in PERCENTILES:
+        stats[f"p{q}"] = None
+    return stats
+
+
+class MetricsStatistics:
+    """
+    Windowed statistics and moving averages for a MetricsRingBuffer.
+
+    EWMAs are updated incrementally by observe(), once per sample. Window
+    statistics are computed on demand and cached per buffer version, so
+    they are recomputed at most once per sample however often they are
+    requested.
+    """
+
+    def __init__(self, buffer: MetricsRingBuffer, ewma_alpha: float = 0.2):
+        """
+        Initializes the statistics.
+
+        Args:
+            buffer: History buffer to summarize.
+            ewma_alpha: Weight of the newest sample in the moving averages
+                        (0 < alpha <= 1).
+
+        Raises:
+            ValueError: If ewma_alpha is out of range.
+        """
+        if not 0 < ewma_alpha <= 1:
+            raise ValueError("EWMA alpha must be in (0, 1]")
+        self.buffer = buffer
+        self.ewma_alpha = ewma_alpha
+        self._ewma: Dict[str, float] = {}
+        self._last_timestamp: Optional[float] = None
+        self._cache: Dict[Tuple, Any] = {}
+        self._cache_version = -1
+        self._lock = threading.Lock()
+
+    def observe(
+        self,
+        timestamp: float,
+        cpu_percent: float,
+        memory_percent: float,
+        deltas: Mapping[str, float],
+    ) -> None:
+        """
+        Update the moving averages with a new sample.
+
+        Args:
+            timestamp: Sample time as seconds since the epoch.
+            cpu_percent: CPU utilization percentage.
+            memory_percent: Memory utilization percentage.
+            deltas: Increments since the previous sample per DELTA_COLUMNS
+                    name, e.g. "bytes_sent".
+        """
+        with self._lock:
+            values = {"cpu_percent": cpu_percent, "memory_percent": memory_percent}
+            previous, self._last_timestamp = self._last_timestamp, timestamp
+            if previous is not None and timestamp > previous:
+                elapsed = timestamp - previous
+                for name, delta in deltas.items():
+                    values[f"{name}_per_second"] = delta / elapsed
+            alpha = self.ewma_alpha
+            for name, value in values.items():
+                current = self._ewma.get(name)
+                self._ewma[name] = (
+                    value if current is None else current + alpha * (value - current)
+                )
+
+    def reset(self) -> None:
+        """Forget the moving averages and cached window statistics."""
+        with self._lock:
+            self._ewma.clear()
+            self._last_timestamp = None
+            self._cache.clear()
+
+    def ewma(self) -> Dict[str, Optional[float]]:
+        """
+        Current exponentially weighted moving averages.
+
+        Returns:
+            Dict[str, Optional[float]]: Value per EWMA_METRICS name, None
+            until enough samples were observed.
+        """
+        with self._lock:
+            return {name: self._ewma.get(name) for name in EWMA_METRICS}
+
+    def _cached(self, key: Tuple, compute) -> Any:
+        """Return a cached value for the current buffer version, computing it once."""
+        version = self.buffer.version
+        with self._lock:
+            if version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = version
+            if key in self._cache:
+                return self._cache[key]
+        value = compute()
+        with self._lock:
+            if version == self._cache_version:
+                self._cache[key] = value
+        return value
+
+    def _window_start(self, seconds: Optional[float]) -> Optional[int]:
+        """Negative start position of the last ``seconds`` of history."""
+        size = len(self.buffer)
+        if seconds is None or not size:
+            return None
+        newest = self.buffer.column("timestamp", -1)[0]
+        return self.buffer.position_since(newest - seconds) - size
+
+    def window(self, name: str, seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Statistics of a scalar column over the most recent samples.
+
+        Args:
+            name: Column name, e.g. "cpu_percent".
+            seconds: Window length ending at the newest sample; None for the
+                     whole history.
+
+        Returns:
+            Dict[str, Any]: Output of describe().
+        """
+
+        def compute():
+            return describe(self.buffer.column(name, self._window_start(seconds)))
+
+        return dict(self._cached(("column", name, seconds), compute))
+
+    def disk_window(
+        self, mount: str, seconds: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Statistics of one mount point's usage percentage.
+
+        Args:
+            mount: Mount point.
+            seconds: Window length ending at the newest sample; None for the
+                     whole history.
+
+        Returns:
+            Dict[str, Any]: Output of describe().
+        """
+
+        def compute():
+            start = self._window_start(seconds)
+            return describe(self.buffer.disk_column(mount, start))
+
+        return dict(self._cached(("disk", mount, seconds), compute))
+
+    def rate(self, name: str, seconds: Optional[float] = None) -> float:
+        """
+        Average per-second rate of a delta column, such as "bytes_sent".
+
+        Args:
+            name: Column holding per-sample deltas.
+            seconds: Window length ending at the newest sample; None for the
+                     whole history.
+
+        Returns:
+            float: Sum of the deltas divided by the time they cover, or 0.0
+            with fewer than two samples in the window.
+        """
+
+        def compute():
+            start = self._window_start(seconds)
+            timestamps = self.buffer.column("timestamp", start)
+            deltas = self.buffer.column(name, start)
+            if len(timestamps) < 2 or timestamps[-1] <= timestamps[0]:
+                return 0.0
+            # The first delta was accumulated before the window began
+            return sum(deltas[1:]) / (timestamps[-1] - timestamps[0])
+
+        return self._cached(("rate", name, seconds), compute)
+
+    def summary(self, windows: Sequence[Optional[float]]) -> Dict[str, Any]:
+        """
+        Statistics for every metric over several windows.
+
+        Args:
+            windows: Window lengths in seconds; None stands for the whole
+                     history.
+
+        Returns:
+            Dict[str, Any]: ``windows`` (one entry per window, keyed like
+            "60s" or "all") and ``ewma``.
+        """
+        mounts = self.buffer.mounts
+        results: Dict[str, Any] = {}
+        for seconds in windows:
+            label = "all" if seconds is None else f"{seconds:g}s"
+            results[label] = {
+                "window_seconds": seconds,
+                "cpu_percent": self.window("cpu_percent", seconds),
+                "memory_percent": self.window("memory_percent", seconds),
+                "disk_percent": {
+                    mount: self.disk_window(mount, seconds) for mount in mounts
+                },
+                "network": {
+                    "bytes_sent_per_second": self.rate("bytes_sent", seconds),
+                    "bytes_recv_per_second": self.rate("bytes_recv", seconds),
+                },
+                "disk_io": {
+                    "read_bytes_per_second": self.rate("disk_read_bytes", seconds),
+                    "write_bytes_per_second": self.rate("disk_write_bytes", seconds),
+                },
+            }
+        return {"windows": results, "ewma": self.ewma()}
+
+
+def parse_windows(value: Any) -> List[Optional[float]]:
+    """
+    Parse a statistics window setting.
+
+    Args:
+        value: Sequence of seconds, or a comma-separated string such as
+               "60, 300, all". "all" (or None) stands for the whole history.
+
+    Returns:
+        List[Optional[float]]: Window lengths in seconds.
+
+    Raises:
+        ValueError: If a window is not a positive number or "all".
+    """
+    items = value.split(",") if isinstance(value, str) else list(value)
+    windows: List[Optional[float]] = []
+    for item in items:
+        if item is None or str(item).strip().lower() == "all":
+            windows.append(None)
+            continue
+        seconds = float(item)
+        if seconds <= 0:
+            raise ValueError(f"Statistics window must be positive: {item}")
+        windows.append(seconds)
+    return windows
@@ -0,0 +1,613 @@
+"""
+Persistent time-series store for SentinelPC monitoring data.
+
+Samples are appended to chunked columnar files, one file of float64 values
+per column, so a range query only reads the timestamp column and the byte
+ranges it selects from the others. Raw samples are downsampled into
+one-minute and one-hour tiers, and each tier keeps its chunks for a
+limited time. A background writer keeps disk I/O out of the sampling loop.
+"""
+
+import json
+import logging
+import math
+import os
+import queue
+import shutil
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote, unquote
+
+TIER_RAW = "raw"
+TIER_MINUTE = "1m"
+TIER_HOUR = "1h"
+
+COLUMN_SUFFIX = ".f64"
+DISK_PREFIX = "disk_percent@"
+# Columns summed when downsampling; the others are averaged
+SUM_COLUMNS = (
+    "bytes_sent",
+    "bytes_recv",
+    "disk_read_bytes",
+    "disk_write_bytes",
+    "samples",
+)
+# Columns holding the maximum of their source column in downsampled tiers
+MAX_COLUMNS = {"cpu_percent_max": "cpu_percent", "memory_percent_max": "memory_percent"}
+# Upper bound on the points a query should return when picking a resolution
+MAX_QUERY_POINTS = 10000
+
+
+@dataclass(frozen=True)
+class TierSpec:
+    """
+    Storage tier settings.
+
+    Attributes:
+        name (str): Tier name and directory.
+        bucket_seconds (int): Downsampling bucket; 0 for raw samples.
+        chunk_seconds (int): Time span covered by one chunk directory.
+        retention_seconds (int): How long chunks are kept.
+    """
+
+    name: str
+    bucket_seconds: int
+    chunk_seconds: int
+    retention_seconds: int
+
+
+DEFAULT_TIERS = (
+    TierSpec(TIER_RAW, 0, 3600, 2 * 86400),
+    TierSpec(TIER_MINUTE, 60, 86400, 30 * 86400),
+    TierSpec(TIER_HOUR, 3600, 30 * 86400, 730 * 86400),
+)
+
+
+def _column_file(name: str) -> str:
+    """File name of a column; mount points are percent-encoded."""
+    if name.startswith(DISK_PREFIX):
+        name = DISK_PREFIX + quote(name[len(DISK_PREFIX) :], safe="")
+    return name + COLUMN_SUFFIX
+
+
+def _column_name(file_name: str) -> str:
+    """Inverse of _column_file()."""
+    name = file_name[: -len(COLUMN_SUFFIX)]
+    if name.startswith(DISK_PREFIX):
+        name = DISK_PREFIX + unquote(name[len(DISK_PREFIX) :])
+    return name
+
+
+def flatten_sample(sample: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Turn a sample with a ``disk_percent`` mapping into flat store columns.
+
+    Args:
+        sample: timestamp, scalar metrics and ``disk_percent`` per mount.
+
+    Returns:
+        Dict[str, float]: Column name to value.
+    """
+    row = {
+        name: float(value) for name, value in sample.items() if name != "disk_percent"
+    }
+    for mount, percent in (sample.get("disk_percent") or {}).items():
+        row[DISK_PREFIX + mount] = float(percent)
+    return row
+
+
+class _Chunk:
+    """One chunk directory: a float64 file per column, all with the same row count."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def columns(self) -> List[str]:
+        """Names of the columns stored in this chunk."""
+        try:
+            return [
+                _column_name(entry.name)
+                for entry in os.scandir(self.path)
+                if entry.name.endswith(COLUMN_SUFFIX)
+            ]
+        except FileNotFoundError:
+            return []
+
+    def row_count(self) -> int:
+        """Number of complete rows; the timestamp column is written last."""
+        try:
+            return (self.path / _column_file("timestamp")).stat().st_size // 8
+        except FileNotFoundError:
+            return 0
+
+    def repair(self) -> int:
+        """
+        Bring every column to the timestamp row count after an interrupted append.
+
+        Returns:
+            int: The row count.
+        """
+        rows = self.row_count()
+        for name in self.columns():
+            path = self.path / _column_file(name)
+            size = path.stat().st_size
+            if size > rows * 8:
+                with open(path, "r+b") as column_file:
+                    column_file.truncate(rows * 8)
+            elif size < rows * 8:
+                with open(path, "ab") as column_file:
+                    array("d", [math.nan] * (rows - size // 8)).tofile(column_file)
+        return rows
+
+    def append(self, rows: Sequence[Dict[str, float]], existing_rows: int) -> None:
+        """
+        Append rows; columns missing from a row are stored as NaN.
+
+        Args:
+            rows: Flat rows, each with a "timestamp".
+            existing_rows: Current row count (see repair()).
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        names = set(self.columns())
+        for row in rows:
+            names.update(row)
+        names.discard("timestamp")
+        for name in sorted(names):
+            values = array("d", (row.get(name, math.nan) for row in rows))
+            path = self.path / _column_file(name)
+            with open(path, "ab") as column_file:
+                if column_file.tell() < existing_rows * 8:
+                    # New column: pad the rows written before it appeared
+                    padding = existing_rows - column_file.tell() // 8
+                    array("d", [math.nan] * padding).tofile(column_file)
+                values.tofile(column_file)
+        with open(self.path / _column_file("timestamp"), "ab") as column_file:
+            array("d", (row["timestamp"] for row in rows)).tofile(column_file)
+
+    def read(
+        self, start: float, end: float, columns: Optional[Iterable[str]] = None
+    ) -> Dict[str, array]:
+        """
+        Read the rows with start <= timestamp < end.
+
+        Args:
+            start: Range start, seconds since the epoch.
+            end: Range end, exclusive.
+            columns: Scalar columns to read besides the timestamp; defaults
+                     to all. Disk columns are always read.
+
+        Returns:
+            Dict[str, array]: Column name to values.
+        """
+        rows = self.row_count()
+        timestamps = array("d")
+        with open(self.path / _column_file("timestamp"), "rb") as column_file:
+            timestamps.fromfile(column_file, rows)
+        first = bisect_left(timestamps, start)
+        last = bisect_left(timestamps, end, first)
+        result = {"timestamp": timestamps[first:last]}
+        wanted = None if columns is None else set(columns)
+        for name in self.columns():
+            if name == "timestamp":
+                continue
+            if (
+                wanted is not None
+                and name not in wanted
+                and not name.startswith(DISK_PREFIX)
+            ):
+                continue
+            values = array("d")
+            try:
+                with open(self.path / _column_file(name), "rb") as column_file:
+                    column_file.seek(first * 8)
+                    values.fromfile(column_file, last - first)
+            except FileNotFoundError:
+                pass
+            except EOFError:
+                pass  # Partially written column; the rest is padded below
+            if len(values) < last - first:
+                values.extend([math.nan] * (last - first - len(values)))
+            result[name] = values
+        return result
+
+
+class MetricsStore:
+    """
+    Chunked columnar time-series store with downsampling tiers.
+
+    The raw tier receives samples through append(), in time order; rows
+    within a chunk must stay sorted for range queries. compact() aggregates
+    complete buckets into each coarser tier (raw -> 1m -> 1h) and deletes
+    chunks past their tier's retention. Downsampled rows are stamped with
+    their bucket start and hold the mean of each metric, the sum of the
+    network and disk byte counters, a ``samples`` count and the CPU and memory
+    maxima. Thread-safe.
+    """
+
+    STATE_VERSION = 1
+
+    def __init__(
+        self, root: Union[str, Path], tiers: Sequence[TierSpec] = DEFAULT_TIERS
+    ):
+        """
+        Initializes the store.
+
+        Args:
+            root: Store directory, created on first append.
+            tiers: Tiers from finest to coarsest; the first one holds raw samples.
+        """
+        self.root = Path(root)
+        self.tiers = list(tiers)
+        self._tiers_by_name = {tier.name: tier for tier in self.tiers}
+        self._lock = threading.Lock()
+        self._repaired: set = set()
+        self._state = self._load_state()
+
+    def _state_path(self) -> Path:
+        return self.root / "state.json"
+
+    def _load_state(self) -> Dict[str, Any]:
+        """Read the compaction state; a missing or unreadable file yields a fresh one."""
+        try:
+            with open(self._state_path(), encoding="utf-8") as state_file:
+                state = json.load(state_file)
+            if state.get("version") == self.STATE_VERSION:
+                return state
+        except (OSError, ValueError):
+            pass
+        return {"version": self.STATE_VERSION, "downsampled_until": {}}
+
+    def _save_state(self) -> None:
+        """Write the compaction state atomically."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._state_path()
+        tmp_path = path.with_name(path.name + ".part")
+        with open(tmp_path, "w", encoding="utf-8") as state_file:
+            json.dump(self._state, state_file)
+        os.replace(tmp_path, path)
+
+    def _chunk(self, tier: TierSpec, chunk_start: int) -> _Chunk:
+        return _Chunk(self.root / tier.name / f"{chunk_start:012d}")
+
+    def _chunks(
+        self, tier: TierSpec, start: float, end: float
+    ) -> List[Tuple[int, _Chunk]]:
+        """Chunks of a tier overlapping [start, end), oldest first."""
+        try:
+            names = sorted(os.listdir(self.root / tier.name))
+        except FileNotFoundError:
+            return []
+        chunks = []
+        for name in names:
+            if not name.isdigit():
+                continue
+            chunk_start = int(name)
+            if chunk_start < end and chunk_start + tier.chunk_seconds > start:
+                chunks.append((chunk_start, _Chunk(self.root / tier.name / name)))
+        return chunks
+
+    def _append_rows(self, tier: TierSpec, rows: Sequence[Dict[str, float]]) -> None:
+        """Append flat rows to a tier, grouped by chunk. Called under the lock."""
+        groups: Dict[int, List[Dict[str, float]]] = {}
+        for row in rows:
+            chunk_start = (
+                int(row["timestamp"] // tier.chunk_seconds) * tier.chunk_seconds
+            )
+            groups.setdefault(chunk_start, []).append(row)
+        for chunk_start, chunk_rows in sorted(groups.items()):
+            chunk = self._chunk(tier, chunk_start)
+            if chunk.path not in self._repaired:
+                existing = chunk.repair() if chunk.path.exists() else 0
+                self._repaired.add(chunk.path)
+            else:
+                existing = chunk.row_count()
+            chunk.append(chunk_rows, existing)
+
+    def append(self, samples: Sequence[Dict[str, Any]]) -> int:
+        """
+        Append raw samples.
+
+        Args:
+            samples: Dicts with ``timestamp`` (seconds since the epoch),
+                     scalar metrics and an optional ``disk_percent`` mapping.
+
+        Returns:
+            int: Number of samples written.
+        """
+        rows = [flatten_sample(sample) for sample in samples]
+        if not rows:
+            return 0
+        rows.sort(key=lambda row: row["timestamp"])
+        with self._lock:
+            self._append_rows(self.tiers[0], rows)
+        return len(rows)
+
+    def _read(
+        self,
+        tier: TierSpec,
+        start: float,
+        end: float,
+        columns: Optional[Iterable[str]] = None,
+    ) -> Dict[str, array]:
+        """Read a tier's rows in [start, end) across chunks."""
+        result: Dict[str, array] = {"timestamp": array("d")}
+        for _, chunk in self._chunks(tier, start, end):
+            try:
+                part = chunk.read(start, end, columns)
+            except FileNotFoundError:
+                continue  # Removed by retention meanwhile
+            rows_before = len(result["timestamp"])
+            rows = len(part["timestamp"])
+            for name, values in part.items():
+                if name not in result:
+                    result[name] = array("d", [math.nan] * rows_before)
+                result[name].extend(values)
+            for name, values in result.items():
+                if name not in part:
+                    values.extend([math.nan] * rows)
+        return result
+
+    def select_tier(
+        self, start: float, end: float, now: Optional[float] = None
+    ) -> TierSpec:
+        """
+        Pick the finest tier that still retains ``start`` and keeps the
+        number of points under MAX_QUERY_POINTS.
+
+        Args:
+            start: Range start.
+            end: Range end.
+            now: Current time; defaults to time.time().
+
+        Returns:
+            TierSpec: The tier to query.
+        """
+        now = time.time() if now is None else now
+        for tier in self.tiers:
+            retained = start >= now - tier.retention_seconds
+            points = (end - start) / max(tier.bucket_seconds, 1)
+            if retained and points <= MAX_QUERY_POINTS:
+                return tier
+        return self.tiers[-1]
+
+    def query(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        resolution: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Read a time range.
+
+        Args:
+            start: Range start, seconds since the epoch.
+            end: Range end, exclusive; defaults to now.
+            resolution: Tier name ("raw", "1m", "1h"); chosen with
+                        select_tier() when omitted.
+            columns: Scalar columns to return; defaults to all stored ones.
+                     Disk columns are always included.
+
+        Returns:
+            Dict[str, Any]: ``resolution`` plus one list per column (as in
+            MetricsRingBuffer.export()), with ``disk_percent`` mapping each
+            mount point to its values and None for missing values.
+
+        Raises:
+            ValueError: If the resolution is unknown.
+        """
+        end = time.time() if end is None else end
+        if resolution is None:
+            tier = self.select_tier(start, end)
+        elif resolution in self._tiers_by_name:
+            tier = self._tiers_by_name[resolution]
+        else:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        with self._lock:
+            data = self._read(tier, start, end, columns)
+        exported: Dict[str, Any] = {"resolution": tier.name}
+        disk: Dict[str, List[Optional[float]]] = {}
+        for name, values in data.items():
+            cleaned = [None if math.isnan(value) else value for value in values]
+            if name.startswith(DISK_PREFIX):
+                disk[name[len(DISK_PREFIX) :]] = cleaned
+            else:
+                exported[name] = cleaned
+        exported["disk_percent"] = disk
+        return exported
+
+    def _downsample(
+        self, source: TierSpec, target: TierSpec, start: float, end: float
+    ) -> int:
+        """Aggregate source rows in [start, end) into target buckets. Called under the lock."""
+        data = self._read(source, start, end)
+        timestamps = data.pop("timestamp")
+        weights = data.get("samples")
+        bucket_seconds = target.bucket_seconds
+        rows: List[Dict[str, float]] = []
+        index = 0
+        while index < len(timestamps):
+            bucket = int(timestamps[index] // bucket_seconds) * bucket_seconds
+            stop = index
+            while stop < len(timestamps) and timestamps[stop] < bucket + bucket_seconds:
+                stop += 1
+            row: Dict[str, float] = {"timestamp": float(bucket)}
+            bucket_weights = (
+                [w if w == w else 1.0 for w in weights[index:stop]]
+                if weights is not None
+                else [1.0] * (stop - index)
+            )
+            for name, values in data.items():
+                if name in MAX_COLUMNS:
+                    continue
+                window = values[index:stop]
+                if name in SUM_COLUMNS:
+                    row[name] = math.fsum(v for v in window if v == v)
+                    continue
+                pairs = [(v, w) for v, w in zip(window, bucket_weights) if v == v]
+                total = sum(w for _, w in pairs)
+                row[name] = (
+                    math.fsum(v * w for v, w in pairs) / total if total else math.nan
+                )
+            for name, source_name in MAX_COLUMNS.items():
+                values = data.get(name, data.get(source_name))
+                if values is not None:
+                    window = [v for v in values[index:stop] if v == v]
+                    row[name] = max(window) if window else math.nan
+            row["samples"] = math.fsum(bucket_weights)
+            rows.append(row)
+            index = stop
+        if rows:
+            self._append_rows(target, rows)
+        return len(rows)
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Downsample complete buckets into the coarser tiers and apply retention.
+
+        Args:
+            now: Current time; defaults to time.time().
+
+        Returns:
+            Dict[str, Any]: ``downsampled`` rows written per tier and
+            ``removed_chunks`` per tier.
+        """
+        now = time.time() if now is None else now
+        summary: Dict[str, Any] = {"downsampled": {}, "removed_chunks": {}}
+        with self._lock:
+            until = self._state["downsampled_until"]
+            for source, target in zip(self.tiers, self.tiers[1:]):
+                end = int(now // target.bucket_seconds) * target.bucket_seconds
+                start = until.get(target.name, now - source.retention_seconds)
+                if end <= start:
+                    continue
+                summary["downsampled"][target.name] = self._downsample(
+                    source, target, start, end
+                )
+                until[target.name] = end
+            for tier in self.tiers:
+                removed = 0
+                for chunk_start, chunk in self._chunks(tier, 0, now):
+                    if chunk_start + tier.chunk_seconds <= now - tier.retention_seconds:
+                        shutil.rmtree(chunk.path, ignore_errors=True)
+                        self._repaired.discard(chunk.path)
+                        removed += 1
+                summary["removed_chunks"][tier.name] = removed
+            self._save_state()
+        return summary
+
+
+class MetricsStoreWriter:
+    """
+    Background thread that batches samples into a MetricsStore.
+
+    submit() only puts the sample on a bounded queue, so the caller never
+    waits for disk I/O; when the queue is full the sample is dropped and
+    counted. The thread flushes every ``flush_interval`` seconds and runs
+    compaction every ``compact_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        store: MetricsStore,
+        flush_interval: float = 5.0,
+        compact_interval: float = 300.0,
+        max_pending: int = 10000,
+    ):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self.logger = logging.getLogger(__name__)
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(max_pending)
+        self._stop = threading.Event()
+        # Keeps batches in time order when flush() is also called by readers
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        """Start the writer thread if it is not already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-store", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, sample: Dict[str, Any]) -> bool:
+        """
+        Queue a sample for writing.
+
+        Args:
+            sample: Sample in the format accepted by MetricsStore.append().
+
+        Returns:
+            bool: False if the queue was full and the sample was dropped.
+        """
+        try:
+            self._queue.put_nowait(sample)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self) -> int:
+        """
+        Write all queued samples now.
+
+        Returns:
+            int: Number of samples written.
+        """
+        with self._flush_lock:
+            batch: List[Dict[str, Any]] = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return 0
+            try:
+                written = self.store.append(batch)
+            except OSError as e:
+                self.errors += 1
+                self.logger.error(f"Failed to write {len(batch)} metrics samples: {e}")
+                return 0
+            self.written += written
+            return written
+
+    def _run(self) -> None:
+        """Writer thread body."""
+        next_compaction = time.monotonic()
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+            if time.monotonic() >= next_compaction:
+                next_compaction = time.monotonic() + self.compact_interval
+                try:
+                    self.store.compact()
+                except OSError as e:
+                    self.errors += 1
+                    self.logger.error(f"Failed to compact metrics store: {e}")
+        self.flush()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Stop the thread after writing the queued samples.
+
+        Args:
+            timeout: Maximum seconds to wait for the thread.
+        """
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join(timeout)
+        else:
+            self.flush()
@@ -4,11 +4,23 @@ This module handles system monitoring, health checks, and performance tracking.
 """
 
 import logging
+import threading
+import time
 import psutil
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Union
+from dataclasses import dataclass, field
 from .base_manager import BaseMonitoringManager
+from .counter_rates import DISK_FIELDS, NET_FIELDS, CounterTracker, to_rates
+from .health_rules import HealthEngine, HealthEvent, parse_rules
+from .metrics_events import HEALTH, SAMPLE, MetricsPublisher, Subscription
+from .metrics_buffer import DELTA_COLUMNS, MetricsRingBuffer
+from .metrics_stats import MetricsStatistics, parse_windows
+from .metrics_store import MetricsStore, MetricsStoreWriter
+from .partition_registry import MountProbeTimeout, get_partition_registry
+from .process_sampler import RANKINGS, format_top, get_process_sampler
 
 
 @dataclass
@@ -22,6 +34,12 @@ class SystemMetrics:
         disk_usage (Dict[str, float]): Disk usage statistics for each mounted partition.
         network_io (Dict[str, int]): Network I/O statistics (bytes sent and received).
         timestamp (datetime): Timestamp of when the metrics were collected.
+        disk_io (Dict[str, int]): Cumulative disk I/O counters (bytes and operations).
+        io_deltas (Dict[str, int]): Network and disk bytes since the previous sample.
+        network_rates (Dict[str, Dict[str, float]]): Per-second rates per NIC.
+        disk_io_rates (Dict[str, Dict[str, float]]): Per-second rates per disk.
+        top_processes (Dict[str, Any]): Latest per-process scan (top N by CPU,
+            memory and I/O rate), if process sampling is enabled.
     """
 
     cpu_percent: float
@@ -29,6 +47,16 @@ class SystemMetrics:
     disk_usage: Dict[str, float]
     network_io: Dict[str, int]
     timestamp: datetime
+    disk_io: Dict[str, int] = field(default_factory=dict)
+    io_deltas: Dict[str, int] = field(default_factory=dict)
+    network_rates: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    disk_io_rates: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    top_processes: Optional[Dict[str, Any]] = None
+
+
+def _epoch(value: Union[datetime, float]) -> float:
+    """Convert a datetime or epoch seconds to epoch seconds."""
+    return value.timestamp() if isinstance(value, datetime) else float(value)
 
 
 class MonitoringManager(BaseMonitoringManager):
@@ -37,13 +65,65 @@ class MonitoringManager(BaseMonitoringManager):
 
     This class collects and stores system performance metrics,
     calculates health status, and provides access to historical data.
+    History is kept in a columnar MetricsRingBuffer holding CPU, memory,
+    per-mount disk percentages and per-sample network deltas, and summarized
+    by MetricsStatistics. When a ``store_dir`` is configured, samples are
+    also persisted to a MetricsStore by a background writer.
+
+    Once sampling is started, a background thread collects a sample every
+    ``sampling_interval`` seconds, and ``collect_metrics`` returns the latest
+    sample instead of blocking on a fresh CPU measurement.
+
+    Health is evaluated on every sample by a HealthEngine; its rules can be
+    replaced with the ``health_rules`` setting. New samples and health
+    transitions are pushed to subscribers registered with ``subscribe``, so
+    consumers do not need to poll.
+
+    Every ``process_sampling_interval`` seconds the sampler also ranks
+    processes by CPU, memory and I/O rate; the scans are kept in
+    ``process_history`` and attached to health transitions.
     """
 
-    def __init__(self, metrics_history_size: int = 100):
+    DEFAULT_SAMPLING_INTERVAL = 1.0
+    # Delay before the first background sample, so CPU usage has a baseline
+    WARMUP_SECONDS = 0.1
+    # Default statistics windows in seconds; None covers the whole history
+    DEFAULT_STATISTICS_WINDOWS = (60.0, 300.0, None)
+    # Per-process scans are costlier than system counters; 0 disables them
+    DEFAULT_PROCESS_SAMPLING_INTERVAL = 5.0
+
+    def __init__(
+        self,
+        metrics_history_size: int = 100,
+        sampling_interval: float = DEFAULT_SAMPLING_INTERVAL,
+    ):
         self.logger = logging.getLogger(__name__)
-        self.metrics_history: List[SystemMetrics] = []
+        self.metrics_history = MetricsRingBuffer(metrics_history_size)
         self.metrics_history_size = metrics_history_size
+        self.statistics = MetricsStatistics(self.metrics_history)
+        self.statistics_windows = list(self.DEFAULT_STATISTICS_WINDOWS)
+        self.health = HealthEngine()
+        self.events = MetricsPublisher()
+        self.health.add_listener(self._publish_health)
         self.health_status = "healthy"
+        self.sampling_interval = sampling_interval
+        self._latest: Optional[SystemMetrics] = None
+        self._lock = threading.Lock()
+        self._first_sample = threading.Event()
+        self._stop_sampling = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self.store: Optional[MetricsStore] = None
+        self._store_writer: Optional[MetricsStoreWriter] = None
+        # Previous counter snapshots, for per-interval deltas and rates
+        self._net_totals = CounterTracker(NET_FIELDS)
+        self._disk_totals = CounterTracker(DISK_FIELDS)
+        self._nic_counters = CounterTracker(NET_FIELDS)
+        self._disk_counters = CounterTracker(DISK_FIELDS)
+        self.partitions = get_partition_registry()
+        self.processes = get_process_sampler()
+        self.process_sampling_interval = self.DEFAULT_PROCESS_SAMPLING_INTERVAL
+        self.process_history: deque = deque(maxlen=metrics_history_size)
+        self._process_scan_due = 0.0
 
     def initialize(self, config: Optional[Dict[str, Any]] = None) -> bool:
         """Initialize monitoring system.
@@ -60,6 +140,39 @@ class MonitoringManager(BaseMonitoringManager):
                 self.metrics_history_size = config.get("metrics_history_size", 100)
                 if self.metrics_history_size <= 0:
                     raise ValueError("Metrics history size must be positive integer")
+                if self.metrics_history_size != self.metrics_history.capacity:
+                    self.metrics_history = MetricsRingBuffer(self.metrics_history_size)
+                    self.statistics = MetricsStatistics(self.metrics_history)
+                    self.process_history = deque(
+                        self.process_history, maxlen=self.metrics_history_size
+                    )
+                if "statistics_windows" in config:
+                    self.statistics_windows = parse_windows(
+                        config["statistics_windows"]
+                    )
+                if "health_rules" in config:
+                    self.health.set_rules(parse_rules(config["health_rules"]))
+                self.sampling_interval = float(
+                    config.get("sampling_interval", self.sampling_interval)
+                )
+                if self.sampling_interval <= 0:
+                    raise ValueError("Sampling interval must be positive")
+                self.process_sampling_interval = float(
+                    config.get(
+                        "process_sampling_interval", self.process_sampling_interval
+                    )
+                )
+                if "process_top_n" in config:
+                    top_n = int(config["process_top_n"])
+                    if top_n <= 0:
+                        raise ValueError("Process top-N size must be positive")
+                    self.processes.top_n = top_n
+                if config.get("store_dir"):
+                    self.open_store(
+                        config["store_dir"],
+                        float(config.get("store_flush_interval", 5.0)),
+                    )
+            self.start_sampling()
             # Initial metrics collection to verify functionality
             return self.collect_metrics() is not None
         except Exception as e:
@@ -75,41 +188,177 @@ class MonitoringManager(BaseMonitoringManager):
         """
         try:
             self.logger.info("Cleaning up monitoring manager")
-            self.metrics_history.clear()
+            self.stop_sampling()
+            self.close_store()
+            with self._lock:
+                self.metrics_history.clear()
+                self.statistics.reset()
+                self._latest = None
+                self.process_history.clear()
+            self.events.close()
+            self.health.reset()
+            self.health_status = "healthy"
             return True
         except Exception as e:
             self.logger.error(f"Failed to cleanup monitoring: {e}")
             return False
 
+    def open_store(
+        self, store_dir: Union[str, Path], flush_interval: float = 5.0
+    ) -> None:
+        """Persist samples to an on-disk metrics store.
+
+        Args:
+            store_dir: Store directory
+            flush_interval: Seconds between batched writes
+        """
+        self.close_store()
+        self.store = MetricsStore(store_dir)
+        self._store_writer = MetricsStoreWriter(self.store, flush_interval)
+        self._store_writer.start()
+        self.logger.info(f"Persisting metrics to {store_dir}")
+
+    def close_store(self) -> None:
+        """Write pending samples and stop persisting to the metrics store."""
+        writer, self._store_writer = self._store_writer, None
+        if writer is not None:
+            writer.close()
+
+    @property
+    def is_sampling(self) -> bool:
+        """True while the background sampler thread is running."""
+        return self._sampler is not None and self._sampler.is_alive()
+
+    def start_sampling(self) -> None:
+        """Start the background sampler thread if it is not already running."""
+        if self.is_sampling:
+            return
+        self._stop_sampling.clear()
+        self._first_sample.clear()
+        self._sampler = threading.Thread(
+            target=self._sampling_loop, name="metrics-sampler", daemon=True
+        )
+        self._sampler.start()
+        self.logger.info(
+            f"Started metrics sampler (interval={self.sampling_interval}s)"
+        )
+
+    def stop_sampling(self, timeout: float = 5.0) -> None:
+        """Stop the background sampler thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the thread to exit
+        """
+        sampler, self._sampler = self._sampler, None
+        if sampler is None:
+            return
+        self._stop_sampling.set()
+        sampler.join(timeout)
+
+    def _sampling_loop(self) -> None:
+        """Sampler thread body: record a sample every sampling interval."""
+        # The first non-blocking call only sets this thread's CPU baseline
+        psutil.cpu_percent(interval=None)
+        delay = min(self.sampling_interval, self.WARMUP_SECONDS)
+        while not self._stop_sampling.wait(delay):
+            metrics = self._take_sample(cpu_interval=None)
+            if metrics is not None:
+                self._record(metrics)
+                self._first_sample.set()
+            delay = self.sampling_interval
+
     def collect_metrics(self) -> Optional[SystemMetrics]:
         """Collect current system metrics.
 
+        While the background sampler runs, this returns its latest sample
+        without blocking (waiting only once for the very first sample).
+        Otherwise a sample is taken synchronously, which blocks for one
+        second to measure CPU usage.
+
         Returns:
             SystemMetrics: Current system metrics if successful, None otherwise
         """
+        if self.is_sampling:
+            if self._first_sample.wait(self.sampling_interval + self.WARMUP_SECONDS):
+                return self._latest
+        metrics = self._take_sample(cpu_interval=1)
+        if metrics is not None:
+            self._record(metrics)
+        return metrics
+
+    def _record(self, metrics: SystemMetrics) -> None:
+        """Store a sample as the latest one and append it to the history.
+
+        Args:
+            metrics: Sample to record
+        """
+        with self._lock:
+            self._latest = metrics
+        timestamp = metrics.timestamp.timestamp()
+        # Only aggregate deltas are kept, so history cost per sample is constant
+        deltas = {name: metrics.io_deltas.get(name, 0) for name in DELTA_COLUMNS}
+        disk_percent = {
+            mount: usage["percent"] for mount, usage in metrics.disk_usage.items()
+        }
+        self.metrics_history.append(
+            timestamp,
+            metrics.cpu_percent,
+            metrics.memory_percent,
+            disk_percent,
+            **deltas,
+        )
+        self.statistics.observe(
+            timestamp, metrics.cpu_percent, metrics.memory_percent, deltas
+        )
+        writer = self._store_writer
+        if writer is not None:
+            writer.submit(
+                {
+                    "timestamp": timestamp,
+                    "cpu_percent": metrics.cpu_percent,
+                    "memory_percent": metrics.memory_percent,
+                    "disk_percent": disk_percent,
+                    **deltas,
+                }
+            )
+        self._update_health_status(metrics, disk_percent)
+        if self.events.has_subscribers(SAMPLE):
+            self.events.publish(SAMPLE, self._metrics_payload(metrics), timestamp)
+
+    def _take_sample(self, cpu_interval: Optional[float]) -> Optional[SystemMetrics]:
+        """Read CPU, memory, disk and network counters.
+
+        Args:
+            cpu_interval: Seconds to block measuring CPU usage, or None to
+                          measure since the previous call in this thread
+
+        Returns:
+            SystemMetrics: The sample if successful, None otherwise
+        """
         try:
             # Collect CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = psutil.cpu_percent(interval=cpu_interval)
 
             # Collect memory usage
             memory = psutil.virtual_memory()
             memory_percent = memory.percent
 
-            # Collect disk usage for all mounted partitions
+            # Collect disk usage for all mounted partitions, in parallel
             disk_usage = {}
-            for partition in psutil.disk_partitions():
-                try:
-                    usage = psutil.disk_usage(partition.mountpoint)
-                    disk_usage[partition.mountpoint] = {
-                        "total": usage.total,
-                        "used": usage.used,
-                        "free": usage.free,
-                        "percent": usage.percent,
-                    }
-                except Exception as e:
+            for mountpoint, usage in self.partitions.probe_usage().items():
+                if isinstance(usage, MountProbeTimeout):
+                    continue  # Logged by the registry when the mount hangs
+                if isinstance(usage, BaseException):
                     self.logger.warning(
-                        f"Failed to get disk usage for {partition.mountpoint}: {e}"
+                        f"Failed to get disk usage for {mountpoint}: {usage}"
                     )
+                    continue
+                disk_usage[mountpoint] = {
+                    "total": usage.total,
+                    "used": usage.used,
+                    "free": usage.free,
+                    "percent": usage.percent,
+                }
 
             # Collect network I/O statistics
             net_io = psutil.net_io_counters()
@@ -118,27 +367,79 @@ class MonitoringManager(BaseMonitoringManager):
                 "bytes_recv": net_io.bytes_recv,
             }
 
+            # Collect disk I/O statistics (not reported on every platform)
+            try:
+                disk_io_total = psutil.disk_io_counters()
+                per_disk = psutil.disk_io_counters(perdisk=True)
+            except (OSError, RuntimeError) as e:
+                self.logger.debug(f"Disk I/O counters unavailable: {e}")
+                disk_io_total, per_disk = None, None
+            disk_io = (
+                {name: getattr(disk_io_total, name) for name in DISK_FIELDS}
+                if disk_io_total
+                else {}
+            )
+
+            # Turn the cumulative counters into per-interval deltas and rates
+            now = time.monotonic()
+            net_delta = self._net_totals.update({"total": net_io}, now)
+            disk_delta = self._disk_totals.update(
+                {"total": disk_io_total} if disk_io_total else {}, now
+            )
+            net_delta = net_delta.get("total", {})
+            disk_delta = disk_delta.get("total", {})
+            io_deltas = {
+                "bytes_sent": net_delta.get("bytes_sent", 0),
+                "bytes_recv": net_delta.get("bytes_recv", 0),
+                "disk_read_bytes": disk_delta.get("read_bytes", 0),
+                "disk_write_bytes": disk_delta.get("write_bytes", 0),
+            }
+            nic_delta = self._nic_counters.update(
+                psutil.net_io_counters(pernic=True), now
+            )
+            network_rates = to_rates(nic_delta, self._nic_counters.elapsed)
+            per_disk_delta = self._disk_counters.update(per_disk, now)
+            disk_io_rates = to_rates(per_disk_delta, self._disk_counters.elapsed)
+
             # Create metrics object
-            metrics = SystemMetrics(
+            return SystemMetrics(
                 cpu_percent=cpu_percent,
                 memory_percent=memory_percent,
                 disk_usage=disk_usage,
                 network_io=network_io,
                 timestamp=datetime.now(),
+                disk_io=disk_io,
+                io_deltas=io_deltas,
+                network_rates=network_rates,
+                disk_io_rates=disk_io_rates,
+                top_processes=self._sample_processes(),
             )
 
-            # Add to history and maintain size limit
-            self.metrics_history.append(metrics)
-            if len(self.metrics_history) > self.metrics_history_size:
-                self.metrics_history.pop(0)
-
-            self._update_health_status(metrics)
-            return metrics
-
         except Exception as e:
             self.logger.error(f"Failed to collect system metrics: {e}")
             return None
 
+    def _sample_processes(self) -> Optional[Dict[str, Any]]:
+        """Scan processes if a scan is due and return the latest scan.
+
+        Returns:
+            Dict containing the latest process ranking, None if disabled
+        """
+        if self.process_sampling_interval <= 0:
+            return None
+        now = time.monotonic()
+        if now >= self._process_scan_due:
+            self._process_scan_due = now + self.process_sampling_interval
+            try:
+                snapshot = self.processes.sample()
+            except Exception as e:
+                self.logger.warning(f"Failed to sample processes: {e}")
+                return None
+            with self._lock:
+                self.process_history.append(snapshot)
+            return snapshot
+        return self.processes.latest()
+
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get current system metrics.
 
@@ -150,79 +451,185 @@ class MonitoringManager(BaseMonitoringManager):
             if not metrics:
                 return {"success": False, "error": "Failed to collect metrics"}
 
-            return {
-                "success": True,
-                "cpu_percent": metrics.cpu_percent,
-                "memory_percent": metrics.memory_percent,
-                "disk_usage": metrics.disk_usage,
-                "network_io": metrics.network_io,
-                "timestamp": metrics.timestamp.isoformat(),
-                "health_status": self.health_status,
-            }
+            return self._metrics_payload(metrics)
         except Exception as e:
             self.logger.error(f"Failed to get system metrics: {e}")
             return {"success": False, "error": str(e)}
 
-    def get_performance_history(self) -> Dict[str, Any]:
+    def _metrics_payload(self, metrics: SystemMetrics) -> Dict[str, Any]:
+        """Convert a sample to the dictionary returned by get_system_metrics.
+
+        Args:
+            metrics: Sample to convert
+
+        Returns:
+            Dict containing system metrics
+        """
+        return {
+            "success": True,
+            "cpu_percent": metrics.cpu_percent,
+            "memory_percent": metrics.memory_percent,
+            "disk_usage": metrics.disk_usage,
+            "network_io": metrics.network_io,
+            "disk_io": metrics.disk_io,
+            "network_rates": metrics.network_rates,
+            "disk_io_rates": metrics.disk_io_rates,
+            "timestamp": metrics.timestamp.isoformat(),
+            "health_status": self.health_status,
+            "top_processes": metrics.top_processes,
+        }
+
+    def subscribe(self, **kwargs: Any) -> Subscription:
+        """Receive new samples and health transitions as they happen.
+
+        Sample events carry the same dictionary as get_system_metrics;
+        health events carry HealthEvent.to_dict(). Delivery never blocks
+        the sampler.
+
+        Args:
+            **kwargs: Arguments of MetricsPublisher.subscribe, e.g.
+                      ``callback``, ``queue``, ``topics`` and ``min_interval``
+
+        Returns:
+            Subscription: Handle whose cancel() stops delivery
+        """
+        subscription = self.events.subscribe(**kwargs)
+        if SAMPLE in subscription.topics and not self.is_sampling:
+            self.logger.warning("Subscribed to samples while sampling is stopped")
+        return subscription
+
+    def _publish_health(self, event: HealthEvent) -> None:
+        """Forward a health transition to subscribers.
+
+        Raised CPU and memory levels carry the processes using the most of
+        that resource, so the cause is visible where the transition is.
+        """
+        payload = event.to_dict()
+        ranking = {"cpu_percent": "top_cpu", "memory_percent": "top_memory"}.get(
+            event.metric
+        )
+        latest = self.processes.latest() if self.process_sampling_interval > 0 else None
+        if ranking and latest and event.current != "healthy":
+            payload["top_processes"] = latest[ranking]
+            self.logger.warning(
+                f"Top {event.metric} consumers: {format_top(latest[ranking])}"
+            )
+        self.events.publish(HEALTH, payload, event.timestamp)
+
+    def get_performance_history(
+        self,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        columnar: bool = False,
+        since: Optional[Union[datetime, float]] = None,
+        until: Optional[Union[datetime, float]] = None,
+        resolution: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """Get historical performance data.
 
+        In history entries, ``disk_usage`` maps each mount point to its usage
+        percentage and ``network_io`` holds the bytes sent and received since
+        the previous sample. With ``since``, the data is read from the on-disk
+        metrics store instead of the in-memory history, so earlier runs can
+        be compared.
+
+        Args:
+            start: First sample position, oldest first (negative counts from
+                   the newest sample)
+            stop: End sample position, exclusive
+            columnar: Return ``columns`` (one list per metric, timestamps in
+                      epoch seconds) instead of one dict per sample
+            since: Start of a stored time range (datetime or epoch seconds)
+            until: End of the stored time range; defaults to now
+            resolution: Store tier ("raw", "1m" or "1h"); chosen from the
+                        range length when omitted
+
         Returns:
             Dict containing performance history
         """
         try:
-            history = [
-                {
-                    "cpu_percent": m.cpu_percent,
-                    "memory_percent": m.memory_percent,
-                    "disk_usage": m.disk_usage,
-                    "network_io": m.network_io,
-                    "timestamp": m.timestamp.isoformat(),
-                }
-                for m in self.metrics_history
-            ]
+            result: Dict[str, Any] = {"success": True}
+            if since is not None:
+                if self.store is None:
+                    return {"success": False, "error": "No metrics store configured"}
+                if self._store_writer is not None:
+                    self._store_writer.flush()
+                columns = self.store.query(
+                    _epoch(since),
+                    None if until is None else _epoch(until),
+                    resolution,
+                )
+                result["resolution"] = columns.pop("resolution")
+            else:
+                columns = self.metrics_history.export(start, stop)
+                result["max_history_size"] = self.metrics_history_size
+            result["history_size"] = len(columns["timestamp"])
+            if columnar:
+                result["columns"] = columns
+            else:
+                result["history"] = [
+                    {
+                        "cpu_percent": sample.cpu_percent,
+                        "memory_percent": sample.memory_percent,
+                        "disk_usage": sample.disk_usage,
+                        "network_io": sample.network_io,
+                        "timestamp": sample.timestamp.isoformat(),
+                    }
+                    for sample in self._samples_from_columns(columns)
+                ]
+            return result
+        except Exception as e:
+            self.logger.error(f"Failed to get performance history: {e}")
+            return {"success": False, "error": str(e)}
+
+    def get_statistics(
+        self, windows: Optional[List[Optional[float]]] = None
+    ) -> Dict[str, Any]:
+        """Get rolling statistics over the metrics history.
 
+        Results are cached until the next sample, so polling this more often
+        than the sampling interval is cheap.
+
+        Args:
+            windows: Window lengths in seconds (None for the whole history);
+                     defaults to the configured ``statistics_windows``
+
+        Returns:
+            Dict containing per-window mean, min, max and percentiles of each
+            metric, network rates, and the moving averages
+        """
+        try:
+            summary = self.statistics.summary(
+                self.statistics_windows if windows is None else windows
+            )
             return {
                 "success": True,
-                "history": history,
-                "history_size": len(history),
-                "max_history_size": self.metrics_history_size,
+                "history_size": len(self.metrics_history),
+                **summary,
             }
         except Exception as e:
-            self.logger.error(f"Failed to get performance history: {e}")
+            self.logger.error(f"Failed to compute metrics statistics: {e}")
             return {"success": False, "error": str(e)}
 
-    def _update_health_status(self, metrics: SystemMetrics) -> None:
-        """Update system health status based on metrics.
+    def _update_health_status(
+        self, metrics: SystemMetrics, disk_percent: Dict[str, float]
+    ) -> None:
+        """Evaluate the health rules against a new sample.
 
         Args:
             metrics: Current system metrics
+            disk_percent: Usage percentage per mount point
         """
         try:
-            # Define thresholds for health status
-            cpu_threshold = 90.0
-            memory_threshold = 90.0
-            disk_threshold = 90.0
-
-            # Check CPU usage
-            if metrics.cpu_percent > cpu_threshold:
-                self.health_status = "warning"
-                self.logger.warning(f"High CPU usage: {metrics.cpu_percent}%")
-
-            # Check memory usage
-            if metrics.memory_percent > memory_threshold:
-                self.health_status = "warning"
-                self.logger.warning(f"High memory usage: {metrics.memory_percent}%")
-
-            # Check disk usage
-            for mount_point, usage in metrics.disk_usage.items():
-                if usage > disk_threshold:
-                    self.health_status = "warning"
-                    self.logger.warning(f"High disk usage on {mount_point}: {usage}%")
-
-            # If no warnings, set status to healthy
-            if self.health_status != "warning":
-                self.health_status = "healthy"
-
+            self.health.evaluate(
+                {
+                    "cpu_percent": metrics.cpu_percent,
+                    "memory_percent": metrics.memory_percent,
+                    "disk_percent": disk_percent,
+                },
+                metrics.timestamp.timestamp(),
+            )
+            self.health_status = self.health.status
         except Exception as e:
             self.logger.error(f"Failed to update health status: {e}")
             self.health_status = "error"
@@ -233,41 +640,114 @@ class MonitoringManager(BaseMonitoringManager):
         Returns:
             SystemMetrics: Most recent metrics if available, None otherwise
         """
-        return self.metrics_history[-1] if self.metrics_history else None
+        return self._latest
 
     def get_metrics_history(self) -> List[SystemMetrics]:
         """Get historical metrics data.
 
+        The samples are rebuilt from the history buffer: ``disk_usage`` holds
+        usage percentages and ``network_io`` per-sample deltas.
+
         Returns:
             List[SystemMetrics]: List of historical metrics
         """
-        return self.metrics_history
+        return self._samples_from_columns(self.metrics_history.export())
+
+    @staticmethod
+    def _samples_from_columns(columns: Dict[str, Any]) -> List[SystemMetrics]:
+        """Rebuild SystemMetrics objects from exported history columns.
+
+        Args:
+            columns: Output of MetricsRingBuffer.export()
+
+        Returns:
+            List[SystemMetrics]: One object per sample, oldest first
+        """
+        disk = columns["disk_percent"]
+        return [
+            SystemMetrics(
+                cpu_percent=columns["cpu_percent"][i],
+                memory_percent=columns["memory_percent"][i],
+                disk_usage={
+                    mount: values[i]
+                    for mount, values in disk.items()
+                    if values[i] is not None
+                },
+                network_io={
+                    "bytes_sent": columns["bytes_sent"][i],
+                    "bytes_recv": columns["bytes_recv"][i],
+                },
+                timestamp=datetime.fromtimestamp(timestamp),
+            )
+            for i, timestamp in enumerate(columns["timestamp"])
+        ]
 
     def get_health_status(self) -> str:
         """Get current system health status.
 
         Returns:
-            str: Current health status (healthy, warning, or error)
+            str: Current health status (healthy, warning, critical, or error)
         """
         return self.health_status
 
+    def get_process_history(self, ranking: Optional[str] = None) -> Dict[str, Any]:
+        """Get the retained per-process scans, oldest first.
+
+        Args:
+            ranking: Optional ranking to return instead of every ranking:
+                     "top_cpu", "top_memory" or "top_io"
+
+        Returns:
+            Dict containing the scans
+        """
+        try:
+            if ranking is not None and ranking not in RANKINGS:
+                raise ValueError(f"Unknown process ranking: {ranking}")
+            with self._lock:
+                snapshots = list(self.process_history)
+            if ranking is not None:
+                snapshots = [
+                    {
+                        "timestamp": snapshot["timestamp"],
+                        "process_count": snapshot["process_count"],
+                        ranking: snapshot[ranking],
+                    }
+                    for snapshot in snapshots
+                ]
+            return {
+                "success": True,
+                "snapshots": snapshots,
+                "history_size": len(snapshots),
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to get process history: {e}")
+            return {"success": False, "error": str(e)}
+
+    def get_health_details(self) -> Dict[str, Any]:
+        """Get the health level of every monitored metric.
+
+        Returns:
+            Dict containing the overall status and one entry per metric
+        """
+        try:
+            return {"success": True, **self.health.snapshot()}
+        except Exception as e:
+            self.logger.error(f"Failed to get health details: {e}")
+            return {"success": False, "error": str(e)}
+
     def get_performance_summary(self) -> Dict[str, float]:
         """Get summary of system performance metrics.
 
         Returns:
             Dict[str, float]: Summary of average performance metrics
         """
-        if not self.metrics_history:
+        if not len(self.metrics_history):
             return {}
 
         try:
-            # Calculate averages from history
-            cpu_avg = sum(m.cpu_percent for m in self.metrics_history) / len(
-                self.metrics_history
-            )
-            memory_avg = sum(m.memory_percent for m in self.metrics_history) / len(
-                self.metrics_history
-            )
+            # Averages over the whole history, cached until the next sample
+            cpu_avg = self.statistics.window("cpu_percent")["mean"]
+            memory_avg = self.statistics.window("memory_percent")["mean"]
 
             return {
                 "avg_cpu_usage": round(cpu_avg, 2),
@@ -0,0 +1,273 @@
+"""
+Shared, cached view of the mounted partitions for SentinelPC.
+
+Enumerating partitions and probing the usage of every mount dominates
+metrics sampling on hosts with many bind mounts and overlay layers, and a
+single hung network mount can stall ``statvfs`` indefinitely. The
+PartitionRegistry keeps the filtered mount table until the kernel reports a
+change, and probes usage in parallel with a per-mount timeout.
+"""
+
+import logging
+import os
+import select
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import psutil
+
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+
+# Filesystems that never hold user data worth monitoring
+PSEUDO_FSTYPES = frozenset(
+    {
+        "autofs",
+        "binfmt_misc",
+        "bpf",
+        "cgroup",
+        "cgroup2",
+        "configfs",
+        "debugfs",
+        "devpts",
+        "devtmpfs",
+        "efivarfs",
+        "fusectl",
+        "hugetlbfs",
+        "mqueue",
+        "nsfs",
+        "overlay",
+        "proc",
+        "pstore",
+        "ramfs",
+        "rpc_pipefs",
+        "securityfs",
+        "selinuxfs",
+        "squashfs",
+        "sysfs",
+        "tmpfs",
+        "tracefs",
+    }
+)
+
+
+class MountProbeTimeout(TimeoutError):
+    """Reported for a mount whose usage could not be read in time."""
+
+    def __init__(self, mountpoint: str, hung: bool = False):
+        reason = "still hung from an earlier probe" if hung else "timed out"
+        super().__init__(f"Disk usage probe for {mountpoint} {reason}")
+        self.mountpoint = mountpoint
+        self.hung = hung
+
+
+class _MountTableWatcher:
+    """
+    Detects mount table changes by polling ``/proc/self/mountinfo``.
+
+    The kernel flags the open file with POLLPRI whenever a filesystem is
+    mounted or unmounted. Where the file does not exist (non-Linux
+    platforms), ``available`` is False and callers fall back to a TTL.
+    """
+
+    def __init__(self, path: str = MOUNTINFO_PATH):
+        self._file = None
+        self._poller = None
+        try:
+            self._file = open(path, "rb")
+            self._poller = select.poll()
+            self._poller.register(self._file.fileno(), select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError):
+            self.close()
+
+    @property
+    def available(self) -> bool:
+        return self._poller is not None
+
+    def changed(self) -> bool:
+        """True if the mount table changed since the previous call."""
+        if self._poller is None:
+            return False
+        return bool(self._poller.poll(0))
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._poller = None
+
+
+class _Probe:
+    """One in-flight usage probe running on a daemon thread."""
+
+    def __init__(self, mountpoint: str):
+        self.mountpoint = mountpoint
+        self.result: Union[Any, BaseException, None] = None
+        self.done = threading.Event()
+
+
+class PartitionRegistry:
+    """
+    Cached, filtered mount table with parallel, time-limited usage probes.
+
+    The partition list is rebuilt only when the mount table changes (or,
+    without mountinfo polling, after ``ttl_seconds``). Pseudo filesystems,
+    mounts without a filesystem type (e.g. empty CD-ROM drives) and bind
+    mounts of an already listed device are dropped when the list is built.
+
+    Each usage probe runs on its own daemon thread, so a mount that never
+    answers costs one parked thread instead of a stalled caller, and a new
+    probe is not started for it until the previous one returns.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, probe_timeout: float = 2.0):
+        """
+        Initializes the registry.
+
+        Args:
+            ttl_seconds: Maximum age of the cached mount table when mount
+                         changes cannot be detected.
+            probe_timeout: Default seconds to wait for each usage probe.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.probe_timeout = probe_timeout
+        self.logger = logging.getLogger(__name__)
+        self._watcher = _MountTableWatcher()
+        self._partitions: Optional[List[Any]] = None
+        self._loaded_at = 0.0
+        self._in_flight: Dict[str, _Probe] = {}
+        self._hung: set = set()
+        self._lock = threading.Lock()
+        self.refreshes = 0
+
+    def invalidate(self) -> None:
+        """Drop the cached mount table."""
+        with self._lock:
+            self._partitions = None
+
+    def _is_stale(self) -> bool:
+        """Called under the lock."""
+        if self._partitions is None:
+            return True
+        if self._watcher.available:
+            return self._watcher.changed()
+        return time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    @staticmethod
+    def _filter(partitions: Iterable[Any]) -> List[Any]:
+        """Drop pseudo filesystems, typeless mounts and bind-mount duplicates."""
+        kept: Dict[str, Any] = {}
+        for partition in partitions:
+            if partition.mountpoint != os.sep:
+                if not partition.fstype or partition.fstype in PSEUDO_FSTYPES:
+                    continue
+                if "cdrom" in partition.opts:
+                    continue
+            # Bind mounts repeat their device; keep the shortest mount point
+            key = partition.device or partition.mountpoint
+            current = kept.get(key)
+            if current is None or len(partition.mountpoint) < len(current.mountpoint):
+                kept[key] = partition
+        return sorted(kept.values(), key=lambda partition: partition.mountpoint)
+
+    def partitions(self) -> List[Any]:
+        """
+        Return the filtered partitions, re-reading the mount table if it changed.
+
+        Returns:
+            List[Any]: ``psutil`` partition tuples (device, mountpoint,
+            fstype, opts), sorted by mount point.
+        """
+        with self._lock:
+            if self._is_stale():
+                self._partitions = self._filter(psutil.disk_partitions(all=True))
+                self._loaded_at = time.monotonic()
+                self.refreshes += 1
+            return list(self._partitions)
+
+    def _run_probe(self, probe: _Probe) -> None:
+        """Probe thread body."""
+        try:
+            probe.result = psutil.disk_usage(probe.mountpoint)
+        except Exception as e:
+            probe.result = e
+        finally:
+            with self._lock:
+                self._in_flight.pop(probe.mountpoint, None)
+                recovered = probe.mountpoint in self._hung
+                self._hung.discard(probe.mountpoint)
+            if recovered:
+                self.logger.info(f"Mount {probe.mountpoint} responds again")
+            probe.done.set()
+
+    def probe_usage(
+        self,
+        mountpoints: Optional[Iterable[str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Read the disk usage of several mounts in parallel.
+
+        Args:
+            mountpoints: Mounts to probe; defaults to every partition.
+            timeout: Seconds to wait overall; defaults to ``probe_timeout``.
+
+        Returns:
+            Dict[str, Any]: ``psutil.disk_usage`` result per mount point, in
+            input order, or the exception that prevented reading it
+            (MountProbeTimeout if it did not answer in time).
+        """
+        if mountpoints is None:
+            mountpoints = [partition.mountpoint for partition in self.partitions()]
+        mountpoints = list(dict.fromkeys(mountpoints))
+        timeout = self.probe_timeout if timeout is None else timeout
+        results: Dict[str, Any] = {}
+        started: List[_Probe] = []
+        with self._lock:
+            for mountpoint in mountpoints:
+                if mountpoint in self._in_flight:
+                    results[mountpoint] = MountProbeTimeout(mountpoint, hung=True)
+                    continue
+                probe = _Probe(mountpoint)
+                self._in_flight[mountpoint] = probe
+                started.append(probe)
+        for probe in started:
+            threading.Thread(
+                target=self._run_probe,
+                args=(probe,),
+                name="disk-usage-probe",
+                daemon=True,
+            ).start()
+        deadline = time.monotonic() + timeout
+        for probe in started:
+            if probe.done.wait(max(0.0, deadline - time.monotonic())):
+                results[probe.mountpoint] = probe.result
+                continue
+            results[probe.mountpoint] = MountProbeTimeout(probe.mountpoint)
+            with self._lock:
+                newly_hung = probe.mountpoint not in self._hung
+                self._hung.add(probe.mountpoint)
+            if newly_hung:
+                self.logger.warning(
+                    f"Disk usage probe for {probe.mountpoint} timed out after "
+                    f"{timeout}s; skipping it until it responds"
+                )
+        return {mountpoint: results[mountpoint] for mountpoint in mountpoints}
+
+
+_default_registry: Optional[PartitionRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_partition_registry() -> PartitionRegistry:
+    """
+    Return the process-wide registry shared by monitoring and optimization.
+
+    Returns:
+        PartitionRegistry: The shared instance, created on first use.
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = PartitionRegistry()
+        return _default_registry
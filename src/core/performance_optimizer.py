@@ -1,14 +1,15 @@
 # c:\Users\johnw\OneDrive\Desktop\SentinelPC\src\core\performance_optimizer.py
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Callable
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-import concurrent.futures
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple
+import inspect
+from concurrent.futures import ThreadPoolExecutor
 import multiprocessing
 import psutil
 import platform
 import os
-import shutil
 import datetime
+import json
+import threading
 import time
 
 import configparser
@@ -22,6 +23,50 @@ except ImportError:
     _HAS_WINREG = False
 
 from .base_manager import BasePerformanceOptimizer
+from .cleanup_engine import (
+    ByteBudget,
+    CleanupMatcher,
+    DeletionPlanWriter,
+    ParallelDirectoryScanner,
+    PlanEntry,
+    PlanExecutionResult,
+    ScanIndex,
+    ScanStats,
+    execute_plan,
+    group_by_mount,
+    read_plan,
+    read_plan_header,
+    SCAN_DELETE,
+    SCAN_DESCEND,
+    SCAN_PRESERVE,
+)
+
+from .io_throttle import IOThrottle
+from .partition_registry import get_partition_registry
+from .process_sampler import format_top, get_process_sampler
+from .run_history import RunHistory, RunHistoryWriter
+from .system_snapshot import SystemSnapshotService
+from .task_estimates import TaskDurationModel
+from .task_impact import TaskImpactMeter
+from .task_plan import PROFILE_SECTION_PREFIX, TaskPlan, compile_task_plan
+from .task_runtime import (
+    CancellationToken,
+    EXECUTOR_INLINE,
+    EXECUTOR_PROCESS,
+    InlineExecutor,
+    IsolatedTaskError,
+    TaskCancelledError,
+    run_cancellable_process,
+    run_in_subprocess,
+)
+from .task_scheduler import (
+    DagScheduler,
+    RESOURCE_CPU,
+    RESOURCE_DISK_IO,
+    RESOURCE_REGISTRY,
+    SchedulingError,
+    TaskGraph,
+)
 
 # Using ConfigManager for consistency with SentinelCore
 from .config_manager import ConfigManager
@@ -86,6 +131,19 @@ class StartupManagementError(OptimizationError):
         super().__init__(f"Startup Management Error: {message}", details)
 
 
+# Errors tasks raise to report a failure; the result names the error class
+TASK_ERRORS = (
+    OptimizationError,
+    ConfigurationError,
+    TaskExecutionError,
+    MemoryOptimizationError,
+    FileCleanupError,
+    DiskOperationError,
+    StartupManagementError,
+)
+TASK_ERROR_NAMES = frozenset(error.__name__ for error in TASK_ERRORS)
+
+
 # --- Performance Optimizer Class ---
 
 
@@ -105,6 +163,8 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             "critical": True,
             "timeout": 300,
             "enabled": True,
+            "depends_on": [],
+            "resources": [RESOURCE_CPU],
         },
         "temp_cleanup": {
             "function": "clean_temp_files",
@@ -112,6 +172,9 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             "critical": False,
             "timeout": 600,
             "enabled": True,
+            # Sizes its worker pools from the max_threads memory_optimization sets
+            "depends_on": ["memory_optimization"],
+            "resources": [RESOURCE_DISK_IO],
         },
         "disk_defrag": {  # Example: Added disk defrag task (Windows only)
             "function": "defragment_disk",
@@ -120,6 +183,10 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             "timeout": 3600,
             "enabled": True,
             "os": "Windows",
+            "depends_on": ["temp_cleanup"],
+            "resources": [RESOURCE_DISK_IO],
+            # Run in a child process that can be killed when the timeout hits
+            "executor": EXECUTOR_PROCESS,
         },
         "windows_theme_perf": {  # Example: Windows theme adjustment task
             "function": "adjust_windows_theme_performance",
@@ -129,6 +196,8 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             "enabled": True,
             "os": "Windows",
             "params": {"optimize_for_performance": True},
+            "depends_on": [],
+            "resources": [RESOURCE_REGISTRY],
         },
     }
 
@@ -150,6 +219,8 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
         "clear_cache_warning": True,
         "clear_cache_normal": False,
     }
+    # Maximum age in seconds of a reused process scan in memory decisions
+    PROCESS_SNAPSHOT_MAX_AGE = 10.0
 
     # Define default temp file cleanup settings
     DEFAULT_CLEANUP_CONFIG = {
@@ -169,6 +240,17 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
         },
         # Prefixes to skip during cleanup
         "skip_prefixes": ["sys", "config", "important"],  # Example prefixes to skip
+        # Levels of subdirectories the scanner may descend into (0 = top level only)
+        "max_scan_depth": 4,
+        # Stop once this many bytes have been freed (0 = no limit)
+        "max_bytes_to_free": 0,
+        # Reuse listings of directories whose mtime has not changed since the last scan
+        "use_scan_index": True,
+        # I/O throttling of deletions (0 = unlimited); rates back off while the
+        # disks are busier than throttle_busy_percent (0 = no adaptive backoff)
+        "throttle_ops_per_second": 0,
+        "throttle_bytes_per_second": 0,
+        "throttle_busy_percent": 0,
     }
 
     def __init__(self, config_manager: Optional[ConfigManager] = None):
@@ -186,6 +268,16 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
         self._current_task: Optional[str] = None
         self._theme_settings: Dict[str, Any] = {}
         self._executor: Optional[ThreadPoolExecutor] = None
+        self._last_schedule: Optional[Dict[str, Any]] = None
+        self._scheduler: Optional[DagScheduler] = None
+        self._snapshots = SystemSnapshotService()
+        self.history: Optional[RunHistory] = None
+        self._history_writer: Optional[RunHistoryWriter] = None
+        self.task_model: Optional[TaskDurationModel] = None
+        # Compiled task plans by profile, valid for the configuration in _plan_key
+        self._plans: Dict[str, TaskPlan] = {}
+        self._plan_key: Optional[Tuple[str, frozenset]] = None
+        self._plan_lock = threading.Lock()
         self._tasks: Dict[str, Callable] = self._map_task_functions()
 
     def _map_task_functions(self) -> Dict[str, Callable]:
@@ -224,6 +316,22 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             if platform.system() == "Windows" and _HAS_WINREG:
                 self._init_windows_theme_performance()
 
+            if self.config.getboolean(
+                "Performance", "record_run_history", fallback=True
+            ):
+                try:
+                    self.open_history(self._history_path())
+                except Exception as e:
+                    # Optimizing works without the history
+                    self.logger.warning(f"Run history unavailable: {e}")
+            if self.config.getboolean(
+                "Performance", "adaptive_timeouts", fallback=True
+            ):
+                try:
+                    self.task_model = self._load_task_model()
+                except ValueError as e:
+                    self.logger.warning(f"Adaptive task timeouts disabled: {e}")
+
             self._status = "idle"
             self.logger.info("Performance optimizer initialized successfully.")
             return True
@@ -395,6 +503,10 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
         """
         Execute system optimization tasks based on a profile using parallel processing.
 
+        Every run, including one that raises, is queued for the run history
+        when it is open (see open_history()). Tasks with enough recorded
+        durations run with timeouts and estimates learned by the task model.
+
         Args:
             profile: Optional optimization profile name (defined in config). Uses default if None.
 
@@ -412,6 +524,11 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
         self._status = "running"
         self._current_task = "initializing"
         start_time = time.monotonic()
+        started_at = time.time()
+        profile_name = profile or self.config.get(
+            "Profiles", "default", fallback="default"
+        )
+        results: Optional[List[Dict[str, Any]]] = None
 
         try:
             self.logger.info(
@@ -425,9 +542,10 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
                     "No optimization tasks found or enabled for this profile."
                 )
                 self._status = "completed"
-                return {
+                report = {
                     "success": True,
                     "message": "No tasks to execute for the selected profile.",
+                    "profile": profile_name,
                     "tasks_completed": 0,
                     "tasks_failed": 0,
                     "failed_tasks_details": [],
@@ -435,16 +553,42 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
                     "duration_seconds": time.monotonic() - start_time,
                     "timestamp": datetime.datetime.now().isoformat(),
                 }
+                self._record_run(report, profile_name, started_at)
+                return report
+
+            if self.task_model is not None:
+                tasks_config = self.task_model.apply(tasks_config)
+            learned_timeouts = {
+                task["name"]: {
+                    "timeout": task["timeout"],
+                    "configured_timeout": task["configured_timeout"],
+                    "estimated_seconds": task["estimated_seconds"],
+                }
+                for task in tasks_config
+                if "configured_timeout" in task
+            }
+            if learned_timeouts:
+                self.logger.info(f"Using learned task timeouts: {learned_timeouts}")
 
             max_workers = self._get_thread_count()
             self.logger.info(f"Using {max_workers} worker threads for optimization.")
-            with ThreadPoolExecutor(max_workers=max_workers) as self._executor:
-                results = self._execute_tasks(self._executor, tasks_config)
-
-            self._executor = None  # Clear executor reference after use
-            report = self._generate_optimization_report(results)
+            self._executor = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                results = self._execute_tasks(
+                    self._executor, tasks_config, max_parallel=max_workers
+                )
+            finally:
+                # Do not wait for abandoned tasks; they were already cancelled
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None  # Clear executor reference after use
+            self._learn_durations(results, started_at)
+            report = self._generate_optimization_report(results, self._last_schedule)
+            report["profile"] = profile_name
+            if learned_timeouts:
+                report["learned_timeouts"] = learned_timeouts
             report["duration_seconds"] = round(time.monotonic() - start_time, 2)
             self._last_run_result = report
+            self._record_run(report, profile_name, started_at)
             self._status = "completed" if report["success"] else "failed"
             self.logger.info(
                 f"Optimization finished. Success: {report['success']}. "
@@ -459,17 +603,154 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
                 "success": False,
                 "error": str(opt_err),
                 "details": opt_err.details,
+                "duration_seconds": round(time.monotonic() - start_time, 2),
             }
+            if results is not None:
+                # Critical task failures still count in the task statistics
+                self._last_run_result["task_results"] = results
+            self._record_run(self._last_run_result, profile_name, started_at)
             raise  # Re-raise the specific optimization error
         except Exception as error:
             error_msg = f"Unexpected error during optimization: {error}"
             self.logger.error(error_msg, exc_info=True)
             self._status = "failed"
-            self._last_run_result = {"success": False, "error": error_msg}
+            self._last_run_result = {
+                "success": False,
+                "error": error_msg,
+                "duration_seconds": round(time.monotonic() - start_time, 2),
+            }
+            self._record_run(self._last_run_result, profile_name, started_at)
             raise OptimizationError(error_msg, {"error_type": "unexpected"}) from error
         finally:
             self._current_task = None  # Reset current task when done or failed
 
+    def _load_task_model(self) -> TaskDurationModel:
+        """Load the learned task durations stored next to the configuration."""
+        return TaskDurationModel.load(
+            self.config_manager.config_dir / "task_model.json",
+            half_life_seconds=self.config.getfloat(
+                "Performance", "estimate_half_life_days", fallback=14.0
+            )
+            * 86400,
+            safety_factor=self.config.getfloat(
+                "Performance", "timeout_safety_factor", fallback=3.0
+            ),
+            min_samples=self.config.getint(
+                "Performance", "adaptive_min_samples", fallback=5
+            ),
+            min_timeout=self.config.getfloat(
+                "Performance", "adaptive_min_timeout", fallback=30.0
+            ),
+            min_timeout_ratio=self.config.getfloat(
+                "Performance", "adaptive_min_timeout_ratio", fallback=0.5
+            ),
+        )
+
+    def _learn_durations(
+        self, results: List[Dict[str, Any]], started_at: float
+    ) -> None:
+        """Feed task durations into the task model and persist it."""
+        if self.task_model is None:
+            return
+        if self.task_model.observe_results(results, started_at):
+            try:
+                self.task_model.save()
+            except OSError as e:
+                self.logger.warning(f"Failed to save learned task durations: {e}")
+
+    def _history_path(self) -> Path:
+        """Return the run history database, by default under the output directory."""
+        configured = self.config.get("Performance", "run_history_path", fallback="")
+        if configured:
+            return Path(configured)
+        return self.config_manager.get_output_dir() / "history" / "optimization_runs.db"
+
+    def open_history(self, path: Any) -> None:
+        """
+        Record every optimization report in a run history database.
+
+        Args:
+            path: Database file, created if missing.
+        """
+        self.close_history()
+        self.history = RunHistory(path)
+        self._history_writer = RunHistoryWriter(self.history)
+        self._history_writer.start()
+        self.logger.info(f"Recording optimization runs to {path}")
+
+    def close_history(self) -> None:
+        """Record pending reports and close the run history."""
+        writer, self._history_writer = self._history_writer, None
+        if writer is not None:
+            writer.close()
+        history, self.history = self.history, None
+        if history is not None:
+            history.close()
+
+    def _record_run(
+        self, report: Dict[str, Any], profile_name: str, started_at: float
+    ) -> None:
+        """Queue a report for the run history; never blocks the optimization."""
+        writer = self._history_writer
+        if writer is not None and not writer.submit(report, profile_name, started_at):
+            self.logger.warning("Run history queue is full; report not recorded.")
+
+    def get_run_history(
+        self,
+        limit: int = 20,
+        profile: Optional[str] = None,
+        outcome: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        List recorded optimization runs, newest first.
+
+        Args:
+            limit: Maximum number of runs.
+            profile: Only runs of this profile.
+            outcome: Only runs with this outcome ("success", "failed" or "error").
+
+        Returns:
+            Dict containing success and the run summaries.
+        """
+        if self.history is None:
+            return {"success": False, "error": "Run history is not enabled"}
+        try:
+            self._history_writer.flush()
+            runs = self.history.runs(limit, profile=profile, outcome=outcome)
+            return {"success": True, "runs": runs, "total_runs": self.history.count()}
+        except Exception as e:
+            self.logger.error(f"Failed to read run history: {e}")
+            return {"success": False, "error": str(e)}
+
+    def get_task_statistics(
+        self, days: float = 30, profile: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Summarize recorded task runs: counts, failure rate and durations.
+
+        Args:
+            days: Only runs from the last ``days`` days.
+            profile: Only runs of this profile.
+
+        Returns:
+            Dict containing success and, per task, the run statistics with
+            ``p95_duration`` added.
+        """
+        if self.history is None:
+            return {"success": False, "error": "Run history is not enabled"}
+        try:
+            self._history_writer.flush()
+            since = time.time() - days * 86400
+            tasks = self.history.task_stats(since, profile)
+            for task_name, stats in tasks.items():
+                stats["p95_duration"] = self.history.duration_percentile(
+                    task_name, 95, since=since, profile=profile
+                )
+            return {"success": True, "days": days, "tasks": tasks}
+        except Exception as e:
+            self.logger.error(f"Failed to read run history: {e}")
+            return {"success": False, "error": str(e)}
+
     def _validate_optimization_ready(self) -> None:
         """Verify system meets basic requirements before starting optimization."""
         self.logger.debug("Validating optimization readiness.")
@@ -534,8 +815,13 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
         try:
             cpu_count = multiprocessing.cpu_count()
             # Get max_threads from config, default to cpu_count - 1 (or 1 if single core)
-            config_max_threads = self.config.getint(
-                "Performance", "max_threads", fallback=max(1, cpu_count - 1)
+            default_threads = max(1, cpu_count - 1)
+            configured = self.config.get("Performance", "max_threads", fallback="auto")
+            # ConfigManager seeds max_threads with "auto"
+            config_max_threads = (
+                default_threads
+                if str(configured).strip().lower() == "auto"
+                else int(configured)
             )
 
             # Simple logic: use the configured value, capped by CPU count.
@@ -552,14 +838,69 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             )
             return 1
 
+    def _get_task_plan(self, profile: Optional[str] = None) -> TaskPlan:
+        """
+        Return the compiled task plan of a profile.
+
+        Plans are compiled once and reused until the configuration content
+        or the set of task functions changes.
+
+        Args:
+            profile: The name of the optimization profile. Uses the default if None.
+
+        Returns:
+            TaskPlan: The compiled, immutable plan.
+        """
+        profile_name = profile or self.config.get(
+            "Profiles", "default", fallback="default"
+        )
+        key = (self.config_manager.content_hash(), frozenset(self._tasks))
+        with self._plan_lock:
+            if key != self._plan_key:
+                self._plans = {}
+                self._plan_key = key
+            plan = self._plans.get(profile_name)
+            if plan is None:
+                plan = self._compile_task_plan(profile_name, key[0])
+                self._plans[profile_name] = plan
+            return plan
+
+    def _compile_task_plan(self, profile_name: str, config_hash: str) -> TaskPlan:
+        """Compile a profile and log its problems once."""
+        section_name = f"{PROFILE_SECTION_PREFIX}{profile_name}"
+        section = (
+            dict(self.config.items(section_name))
+            if self.config.has_section(section_name)
+            else None
+        )
+        plan = compile_task_plan(
+            profile_name,
+            section,
+            self.DEFAULT_TASKS_CONFIG,
+            self._tasks,
+            platform.system(),
+            config_hash,
+        )
+        for warning in plan.warnings:
+            self.logger.warning(warning)
+        for error in plan.errors:
+            self.logger.error(error)
+        self.logger.info(
+            f"Compiled task plan for profile '{profile_name}': "
+            f"{', '.join(task.name for task in plan.tasks) or 'no tasks'}"
+        )
+        return plan
+
     def _get_tasks_for_profile(
         self, profile: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Get list of optimization task configurations for a given profile.
 
-        Loads tasks from the configuration file based on the profile.
-        Falls back to default tasks if profile is not found or invalid.
+        The configurations come from the profile's cached task plan (see
+        _get_task_plan()); each call returns fresh copies. Falls back to
+        default tasks if the profile section is not found, and to a task's
+        defaults if its line in the profile is malformed.
 
         Args:
             profile: The name of the optimization profile.
@@ -570,195 +911,206 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
         Raises:
             ConfigurationError: If the profile definition is fundamentally broken.
         """
-        profile_name = profile or self.config.get(
-            "Profiles", "default", fallback="default"
-        )
-        self.logger.info(f"Loading tasks for profile: '{profile_name}'")
-        profile_section = f"OptimizationProfile:{profile_name}"
-
-        tasks_to_run = []
-
-        if self.config.has_section(profile_section):
-            self.logger.debug(f"Found profile section: {profile_section}")
-            profile_tasks = self.config.items(profile_section)
-            defined_tasks = dict(profile_tasks)
-
-            # Iterate through default tasks to maintain structure and defaults
-            for task_name, default_config in self.DEFAULT_TASKS_CONFIG.items():
-                task_config = default_config.copy()  # Start with default
-
-                # Check if task is defined and enabled in the profile
-                profile_setting = defined_tasks.get(
-                    task_name.lower()
-                )  # Config keys are lowercased
-                if profile_setting is not None:
-                    try:
-                        # Profile can override 'enabled', 'priority', 'timeout', 'params'
-                        parts = [p.strip() for p in profile_setting.split(";")]
-                        task_config["enabled"] = parts[0].lower() == "true"
-                        if len(parts) > 1:
-                            task_config["priority"] = int(parts[1])
-                        if len(parts) > 2:
-                            task_config["timeout"] = int(parts[2])
-                        if len(parts) > 3:  # Parse simple key=value params
-                            params = {}
-                            for kv in parts[3:]:
-                                if "=" in kv:
-                                    k, v = kv.split("=", 1)
-                                    # Attempt basic type conversion
-                                    if v.lower() == "true":
-                                        params[k.strip()] = True
-                                    elif v.lower() == "false":
-                                        params[k.strip()] = False
-                                    elif v.isdigit():
-                                        params[k.strip()] = int(v)
-                                    elif v.replace(".", "", 1).isdigit():
-                                        params[k.strip()] = float(v)
-                                    else:
-                                        params[k.strip()] = v
-                            task_config["params"] = params
-
-                    except (ValueError, IndexError) as e:
-                        self.logger.warning(
-                            f"Invalid format for task '{task_name}' in profile "
-                            f"'{profile_name}': '{profile_setting}'. Using defaults. Error: {e}"
-                        )
-                        # Keep default enabled/priority/timeout if parsing fails
-                        task_config["enabled"] = default_config.get(
-                            "enabled", False
-                        )  # Revert to default enabled state
-                else:
-                    # Task not mentioned in profile, use default enabled state
-                    task_config["enabled"] = default_config.get("enabled", False)
-
-                # Add task if enabled and meets OS requirement
-                os_match = (
-                    "os" not in task_config or task_config["os"] == platform.system()
-                )
-                if task_config.get("enabled", False) and os_match:
-                    task_config["name"] = task_name
-                    if task_config["function"] not in self._tasks:
-                        self.logger.error(
-                            f"Task function '{task_config['function']}' for "
-                            f"task '{task_name}' is not implemented."
-                        )
-                        continue  # Skip unimplemented tasks
-                    tasks_to_run.append(task_config)
-                    self.logger.debug(
-                        f"Added task '{task_name}' from profile '{profile_name}' with config: {task_config}"
-                    )
-
-        else:
-            self.logger.warning(
-                f"Profile section '{profile_section}' not found. Using default tasks."
+        plan = self._get_task_plan(profile)
+        if plan.errors:
+            raise ConfigurationError(
+                f"Invalid task plan for profile '{plan.profile}': "
+                f"{'; '.join(plan.errors)}",
+                {"profile": plan.profile, "errors": list(plan.errors)},
             )
-            # Fallback to default tasks if profile section doesn't exist
-            for task_name, default_config in self.DEFAULT_TASKS_CONFIG.items():
-                task_config = default_config.copy()
-                os_match = (
-                    "os" not in task_config or task_config["os"] == platform.system()
-                )
-                if task_config.get("enabled", False) and os_match:
-                    task_config["name"] = task_name
-                    if task_config["function"] not in self._tasks:
-                        self.logger.error(
-                            f"Task function '{task_config['function']}' for task '{task_name}' is not implemented."
-                        )
-                        continue
-                    tasks_to_run.append(task_config)
-                    self.logger.debug(
-                        f"Added default task '{task_name}' with config: {task_config}"
-                    )
+        return plan.task_configs()
 
-        # Validate and sort tasks
-        valid_tasks = []
-        for task in tasks_to_run:
-            if not all(k in task for k in ("name", "function", "priority")):
-                self.logger.error(
-                    f"Invalid task configuration structure for {task.get('name', 'unknown')}: Missing required keys. Skipping."
-                )
-                continue
-            valid_tasks.append(task)
+    def validate_profiles(self) -> Dict[str, Any]:
+        """
+        Compile the default and every configured profile and report their problems.
 
-        return sorted(valid_tasks, key=lambda x: x["priority"])
+        Returns:
+            Dict containing success (no profile has errors) and, per profile,
+            its tasks, warnings and errors.
+        """
+        names = [self.config.get("Profiles", "default", fallback="default")]
+        for section in self.config.sections():
+            if section.startswith(PROFILE_SECTION_PREFIX):
+                name = section[len(PROFILE_SECTION_PREFIX) :]
+                if name not in names:
+                    names.append(name)
+        profiles = {}
+        for name in names:
+            plan = self._get_task_plan(name)
+            profiles[name] = {
+                "source": plan.source,
+                "tasks": [task.name for task in plan.tasks],
+                "warnings": list(plan.warnings),
+                "errors": list(plan.errors),
+            }
+        return {
+            "success": not any(info["errors"] for info in profiles.values()),
+            "profiles": profiles,
+        }
 
     def _execute_tasks(
-        self, executor: ThreadPoolExecutor, tasks: List[Dict[str, Any]]
+        self,
+        executor: ThreadPoolExecutor,
+        tasks: List[Dict[str, Any]],
+        max_parallel: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Execute optimization tasks in parallel using the provided executor.
+        Execute optimization tasks on the provided executor in dependency order.
+
+        Tasks run in parallel unless one ``depends_on`` another or they share
+        a resource class (e.g. ``disk-io``); startable tasks heading the
+        longest chain of remaining work go first. The resulting schedule,
+        including its critical path, is kept in ``self._last_schedule``.
+
+        Each task's ``timeout`` is enforced: its cancellation token is
+        cancelled at the deadline, and a task that does not stop within
+        ``Performance.task_cancel_grace_seconds`` is abandoned.
+
+        Each task picks an executor backend with its ``executor`` setting:
+        ``thread`` (default) runs on ``executor``; ``process`` runs in a
+        spawned child process, supervised from a pool thread and killed on
+        cancellation, so Python-heavy tasks use another core; ``inline``
+        runs in the scheduling thread itself.
+
+        Unless ``Performance.measure_task_impact`` is off, each task is
+        wrapped in a TaskImpactMeter: free memory, free disk space per
+        mount, the process count and the load are measured before the task
+        and ``Performance.impact_settle_seconds`` after it, and the changes
+        are stored in the task's result under ``impact``.
 
         Args:
             executor: ThreadPoolExecutor instance.
             tasks: List of task configurations to execute.
+            max_parallel: Maximum number of tasks running at once. Defaults to
+                          the number of tasks.
 
         Returns:
             List[Dict[str, Any]]: Results of task execution, including success, details, and errors.
-        """
-        futures: Dict[concurrent.futures.Future, Dict[str, Any]] = {}
-        results = []
 
+        Raises:
+            ConfigurationError: If the task dependencies are invalid or cyclic.
+        """
         self.logger.info(f"Executing {len(tasks)} optimization tasks...")
+        try:
+            graph = TaskGraph(tasks, known_tasks=self.DEFAULT_TASKS_CONFIG)
+        except SchedulingError as e:
+            raise ConfigurationError(f"Invalid task schedule: {e}", e.details) from e
+        for task_name, dropped in graph.dropped_dependencies.items():
+            self.logger.debug(
+                f"Task '{task_name}' dependencies not part of this run: {dropped}"
+            )
+        meter = self._build_impact_meter()
 
-        for task_config in tasks:
+        def run_task(
+            task_config: Dict[str, Any], cancel_token: CancellationToken
+        ) -> Dict[str, Any]:
             task_name = task_config["name"]
-            task_func = self._tasks[task_config["function"]]
             task_params = task_config.get("params", {})
-            task_timeout = task_config.get("timeout", 300)  # Default 5 min timeout
-
             self.logger.debug(
-                f"Submitting task: {task_name} with params: {task_params}, timeout: {task_timeout}s"
+                f"Starting task: {task_name} with params: {task_params}, "
+                f"resources: {task_config.get('resources', [])}, "
+                f"timeout: {task_config.get('timeout')}s"
             )
-            future = executor.submit(
-                self._optimize_task_wrapper, task_name, task_func, task_params
+            task_func = self._tasks[task_config["function"]]
+            if task_config.get("executor") == EXECUTOR_PROCESS:
+                function_name = task_config["function"]
+                # Taken now so the child sees changes made by earlier tasks
+                config_snapshot = self._config_snapshot()
+
+                def task_func(**params: Any) -> Any:
+                    # Killed together with its subprocesses on cancellation
+                    return run_in_subprocess(
+                        _run_isolated_task,
+                        (function_name, params, config_snapshot),
+                        cancel_token,
+                    )
+
+            probe = None
+            if meter is not None:
+                try:
+                    probe = meter.start(task_name)
+                except Exception as e:
+                    self.logger.warning(
+                        f"Could not measure the impact of task '{task_name}': {e}"
+                    )
+            result = self._optimize_task_wrapper(
+                task_name, task_func, task_params, cancel_token
+            )
+            if probe is not None:
+                try:
+                    result["impact"] = meter.finish(probe, cancel_token)
+                except Exception as e:
+                    self.logger.warning(
+                        f"Could not measure the impact of task '{task_name}': {e}"
+                    )
+            self.logger.info(
+                f"Task '{task_name}' completed. Success: {result.get('success')}"
             )
-            futures[future] = task_config  # Store full config for context
+            return result
 
-        for future in concurrent.futures.as_completed(futures.keys()):
-            task_config = futures[future]
+        def task_failed(
+            task_config: Dict[str, Any], error: Exception
+        ) -> Dict[str, Any]:
             task_name = task_config["name"]
-            task_timeout = task_config.get("timeout", 300)
-
-            try:
-                # Use the task-specific timeout if available
-                result = future.result(timeout=task_timeout)
-                results.append(result)
-                self.logger.info(
-                    f"Task '{task_name}' completed. Success: {result.get('success')}"
-                )
-            except FuturesTimeoutError:
-                error_msg = (
-                    f"Task '{task_name}' timed out after " f"{task_timeout} seconds."
-                )
-                self.logger.error(error_msg)
-                results.append(
-                    {
-                        "name": task_name,
-                        "success": False,
-                        "error": "timeout",
-                        "details": error_msg,
-                        "critical": task_config.get("critical", False),
-                    }
-                )
-                # Optionally attempt to cancel the future if needed, though result() already waited
-                # future.cancel()
-            except Exception as e:
-                error_msg = f"Task '{task_name}' failed with an unexpected error: {e}"
-                self.logger.error(error_msg, exc_info=True)
-                results.append(
-                    {
-                        "name": task_name,
-                        "success": False,
-                        "error": str(e),
-                        "details": error_msg,
-                        "critical": task_config.get("critical", False),
-                    }
-                )
+            error_msg = f"Task '{task_name}' failed with an unexpected error: {error}"
+            self.logger.error(error_msg, exc_info=True)
+            return {
+                "name": task_name,
+                "success": False,
+                "error": str(error),
+                "details": error_msg,
+                "critical": task_config.get("critical", False),
+            }
 
+        self._scheduler = DagScheduler(
+            max_parallel or len(tasks),
+            cancel_grace_seconds=self.config.getfloat(
+                "Performance", "task_cancel_grace_seconds", fallback=5.0
+            ),
+        )
+        try:
+            results, self._last_schedule = self._scheduler.run(
+                executor,
+                graph,
+                run_task,
+                on_error=task_failed,
+                executors={EXECUTOR_INLINE: InlineExecutor()},
+            )
+        finally:
+            self._scheduler = None
+        self.logger.info(
+            f"Critical path: {' -> '.join(self._last_schedule['critical_path'])} "
+            f"({self._last_schedule['critical_path_seconds']}s of "
+            f"{self._last_schedule['makespan_seconds']}s)."
+        )
         return results
 
+    def _build_impact_meter(self) -> Optional[TaskImpactMeter]:
+        """Return the impact meter for a run, or None if measuring is disabled."""
+        if not self.config.getboolean(
+            "Performance", "measure_task_impact", fallback=True
+        ):
+            return None
+        settle_seconds = self.config.getfloat(
+            "Performance",
+            "impact_settle_seconds",
+            fallback=TaskImpactMeter.DEFAULT_SETTLE_SECONDS,
+        )
+        return TaskImpactMeter(self._snapshots, max(0.0, settle_seconds))
+
+    def _config_snapshot(self) -> Dict[str, Dict[str, str]]:
+        """Return the raw configuration as plain dicts that can be sent to a child process."""
+        return {
+            section: dict(self.config.items(section, raw=True))
+            for section in self.config.sections()
+        }
+
     def _optimize_task_wrapper(
-        self, task_name: str, task_func: Callable, params: Dict[str, Any]
+        self,
+        task_name: str,
+        task_func: Callable,
+        params: Dict[str, Any],
+        cancel_token: Optional[CancellationToken] = None,
     ) -> Dict[str, Any]:
         """
         Wrapper to execute a single task, handle its state, and capture results/errors.
@@ -767,6 +1119,8 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             task_name: Name of the task.
             task_func: The actual task function to call.
             params: Dictionary of parameters to pass to the task function.
+            cancel_token: Optional cancellation token, passed on to task
+                          functions that accept a ``cancel_token`` argument.
 
         Returns:
             Dict[str, Any]: Result dictionary including name, success, details, error.
@@ -775,6 +1129,11 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
         self.logger.info(f"Starting task: {task_name}")
         start_time = time.monotonic()
         try:
+            if (
+                cancel_token is not None
+                and "cancel_token" in inspect.signature(task_func).parameters
+            ):
+                params = {**params, "cancel_token": cancel_token}
             # Execute the task function with its parameters
             task_result = task_func(**params)
 
@@ -803,15 +1162,43 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             )
             return result_dict
 
-        except (
-            OptimizationError,
-            ConfigurationError,
-            TaskExecutionError,
-            MemoryOptimizationError,
-            FileCleanupError,
-            DiskOperationError,
-            StartupManagementError,
-        ) as opt_err:
+        except TaskCancelledError as cancelled:
+            duration = round(time.monotonic() - start_time, 2)
+            self.logger.warning(
+                f"Task '{task_name}' stopped after {duration:.2f}s: {cancelled}"
+            )
+            return {
+                "name": task_name,
+                "success": False,
+                "error": "cancelled",
+                "details": str(cancelled),
+                "duration_seconds": duration,
+            }
+        except IsolatedTaskError as isolated:
+            duration = round(time.monotonic() - start_time, 2)
+            if isolated.error_type not in TASK_ERROR_NAMES:
+                error_msg = f"Task '{task_name}' encountered an unexpected error after {duration:.2f}s: {isolated}"
+                self.logger.error(error_msg)
+                return {
+                    "name": task_name,
+                    "success": False,
+                    "error": "unexpected",
+                    "details": error_msg,
+                    "duration_seconds": duration,
+                }
+            # Classified like the same error raised on the thread backend
+            self.logger.error(
+                f"Task '{task_name}' failed after {duration:.2f}s: "
+                f"{isolated.error_message}"
+            )
+            return {
+                "name": task_name,
+                "success": False,
+                "error": isolated.error_type,
+                "details": isolated.error_message,
+                "duration_seconds": duration,
+            }
+        except TASK_ERRORS as opt_err:
             # Catch specific optimization errors raised by tasks
             duration = round(time.monotonic() - start_time, 2)
             error_msg = f"Task '{task_name}' failed after {duration:.2f}s: {opt_err}"
@@ -839,13 +1226,20 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             self._current_task = None  # Clear current task after execution
 
     def _generate_optimization_report(
-        self, results: List[Dict[str, Any]]
+        self,
+        results: List[Dict[str, Any]],
+        schedule: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Generate a summary report from the results of individual tasks.
 
+        The measured impact of each task is collected under
+        ``task_impact``, keyed by task name.
+
         Args:
             results: List of task execution result dictionaries.
+            schedule: Optional schedule summary from the task scheduler
+                      (critical path, makespan and timeline).
 
         Returns:
             Dict[str, Any]: Detailed optimization report.
@@ -863,6 +1257,15 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             "task_results": results,  # Include individual results
             "timestamp": datetime.datetime.now().isoformat(),
         }
+        if schedule is not None:
+            report["schedule"] = schedule
+        task_impact = {
+            result.get("name", "unknown_task"): result["impact"]
+            for result in results
+            if "impact" in result
+        }
+        if task_impact:
+            report["task_impact"] = task_impact
         critical_failures = []
 
         for result in results:
@@ -922,6 +1325,26 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             "timestamp": datetime.datetime.now().isoformat(),
         }
 
+    def cancel_optimization(self, reason: str = "cancelled by user") -> bool:
+        """
+        Cancel a running optimize_system() call.
+
+        Running tasks are asked to stop through their cancellation tokens
+        (isolated tasks are killed) and no further tasks are started.
+
+        Args:
+            reason: Reason recorded in the results of the affected tasks.
+
+        Returns:
+            bool: True if an optimization was running.
+        """
+        scheduler = self._scheduler
+        if scheduler is None:
+            return False
+        self.logger.warning(f"Cancelling optimization: {reason}")
+        scheduler.cancel(reason)
+        return True
+
     # --- Specific Optimization Task Implementations ---
 
     def adjust_memory_usage(self) -> Dict[str, Any]:
@@ -988,16 +1411,35 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
                 f"Memory state: {current_state} (Available: {available_gb:.2f}GB, Usage: {usage_percent:.1f}%)"
             )
 
+            # Under memory pressure, report which processes hold the memory
+            if current_state != "normal":
+                try:
+                    processes = get_process_sampler().snapshot(
+                        self.PROCESS_SNAPSHOT_MAX_AGE
+                    )
+                    top_memory = processes["top_memory"][:5]
+                    result["top_memory_processes"] = top_memory
+                    self.logger.info(
+                        f"Largest memory consumers: {format_top(top_memory, 5)}"
+                    )
+                except Exception as e:
+                    self.logger.warning(f"Failed to rank processes by memory: {e}")
+
             # Apply optimizations based on state
             state_max_threads = mem_cfg[f"{current_state}_max_threads"]
             state_priority_str = mem_cfg[f"{current_state}_priority"]
-            state_clear_cache = mem_cfg[f"{current_state}_clear_cache"]
+            state_clear_cache = mem_cfg[f"clear_cache_{current_state}"]
 
             # 1. Update thread configuration (if different from current Performance setting)
             # Note: This modifies the main config, potentially affecting other operations.
             # Consider if this should be temporary or persistent.
-            current_max_threads = self.config.getint(
-                "Performance", "max_threads", fallback=multiprocessing.cpu_count()
+            configured_threads = self.config.get(
+                "Performance", "max_threads", fallback="auto"
+            )
+            current_max_threads = (
+                multiprocessing.cpu_count()
+                if configured_threads == "auto"
+                else int(configured_threads)
             )
             if current_max_threads != state_max_threads:
                 try:
@@ -1192,20 +1634,298 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
 
         return result
 
-    def clean_temp_files(self) -> Dict[str, Any]:
+    def _load_cleanup_config(self) -> Dict[str, Any]:
         """
-        Clean temporary files based on age, patterns, and disk usage thresholds from config.
+        Load the temp file cleanup settings, falling back to the defaults.
 
         Returns:
-            Dict[str, Any]: Cleanup operation results including success status,
-                          files removed count, space freed (approx), and any errors.
+            Dict[str, Any]: Cleanup configuration.
 
         Raises:
-            FileCleanupError: If cleanup process encounters critical errors.
-            ConfigurationError: If cleanup configuration is invalid.
+            configparser.Error: If a configured value cannot be parsed.
         """
-        self.logger.info("Starting temporary file cleanup.")
-        result = {
+        config_section = "TempFileCleanup"
+        cleanup_cfg = self.DEFAULT_CLEANUP_CONFIG.copy()
+        if not self.config.has_section(config_section):
+            self.logger.warning(
+                f"Configuration section '[{config_section}]' not found. Using default cleanup settings."
+            )
+            return cleanup_cfg
+
+        for cfg_key in (
+            "critical_disk_usage_percent",
+            "high_disk_usage_percent",
+            "throttle_ops_per_second",
+            "throttle_bytes_per_second",
+            "throttle_busy_percent",
+        ):
+            cleanup_cfg[cfg_key] = self.config.getfloat(
+                config_section, cfg_key, fallback=cleanup_cfg[cfg_key]
+            )
+        for cfg_key in (
+            "critical_age_threshold_days",
+            "high_age_threshold_days",
+            "normal_age_threshold_days",
+            "max_scan_depth",
+            "max_bytes_to_free",
+        ):
+            cleanup_cfg[cfg_key] = self.config.getint(
+                config_section, cfg_key, fallback=cleanup_cfg[cfg_key]
+            )
+        cleanup_cfg["use_scan_index"] = self.config.getboolean(
+            config_section,
+            "use_scan_index",
+            fallback=cleanup_cfg["use_scan_index"],
+        )
+
+        # Load patterns (assuming JSON or comma-separated in config)
+        try:
+            patterns_str = self.config.get(
+                config_section,
+                "patterns",
+                fallback=str(cleanup_cfg["patterns"]),
+            )
+            # Basic parsing assuming dict-like string or JSON string
+            try:
+                cleanup_cfg["patterns"] = json.loads(patterns_str.replace("'", '"'))
+            except json.JSONDecodeError:
+                self.logger.warning(
+                    f"Could not parse patterns from config string: {patterns_str}. Using defaults."
+                )
+                cleanup_cfg["patterns"] = self.DEFAULT_CLEANUP_CONFIG["patterns"]
+        except Exception as pattern_err:
+            self.logger.warning(
+                f"Error loading patterns from config: {pattern_err}. Using defaults."
+            )
+            cleanup_cfg["patterns"] = self.DEFAULT_CLEANUP_CONFIG["patterns"]
+
+        # Load skip prefixes
+        skip_prefixes_str = self.config.get(
+            config_section,
+            "skip_prefixes",
+            fallback=",".join(cleanup_cfg["skip_prefixes"]),
+        )
+        cleanup_cfg["skip_prefixes"] = [
+            p.strip() for p in skip_prefixes_str.split(",") if p.strip()
+        ]
+        return cleanup_cfg
+
+    def _get_temp_directories(self) -> List[Path]:
+        """
+        Identify the standard temporary directories for this OS.
+
+        Returns:
+            List[Path]: Existing temporary directories, without duplicates.
+        """
+        temp_dirs = []
+        env_vars = ["TEMP", "TMP"]
+        if platform.system() == "Windows":
+            env_vars.extend(
+                ["LOCALAPPDATA", "USERPROFILE"]
+            )  # Look in AppData\Local\Temp too
+        elif platform.system() == "Linux":
+            temp_dirs.append(Path("/tmp"))
+            temp_dirs.append(Path("/var/tmp"))
+        elif platform.system() == "Darwin":
+            temp_dirs.append(Path("/private/var/tmp"))
+            # Add user cache dir? Path.home() / "Library/Caches" - BE CAREFUL HERE
+
+        for var in env_vars:
+            if path_str := os.environ.get(var):
+                path = Path(path_str)
+                if (
+                    var in ["LOCALAPPDATA", "USERPROFILE"]
+                    and platform.system() == "Windows"
+                ):
+                    path = path / "AppData" / "Local" / "Temp"  # Common location
+                if path.is_dir() and path not in temp_dirs:
+                    temp_dirs.append(path)
+
+        return [d for d in temp_dirs if d.is_dir()]
+
+    def _select_cleanup_level(
+        self, cleanup_cfg: Dict[str, Any], used_percent: float
+    ) -> Tuple[str, int]:
+        """
+        Pick the cleanup level for a filesystem from its usage.
+
+        Args:
+            cleanup_cfg: Cleanup configuration from _load_cleanup_config().
+            used_percent: Disk usage of the filesystem in percent.
+
+        Returns:
+            Tuple[str, int]: Cleanup level and the matching age threshold in days.
+        """
+        if used_percent > cleanup_cfg["critical_disk_usage_percent"]:
+            return "aggressive", cleanup_cfg["critical_age_threshold_days"]
+        if used_percent > cleanup_cfg["high_disk_usage_percent"]:
+            return "standard", cleanup_cfg["high_age_threshold_days"]
+        return "conservative", cleanup_cfg["normal_age_threshold_days"]
+
+    def _probe_mount_usage(self, mount_points: List[str]) -> Dict[str, float]:
+        """
+        Read the disk usage of each mount point once.
+
+        Args:
+            mount_points: Mount points to probe.
+
+        Returns:
+            Dict[str, float]: Used percent per mount point; 0 if it could not be read.
+        """
+        usage_by_mount = {}
+        probes = get_partition_registry().probe_usage(mount_points)
+        for mount_point, usage in probes.items():
+            if isinstance(usage, BaseException):
+                self.logger.warning(
+                    f"Could not get disk usage for {mount_point}: {usage}. Using normal age threshold."
+                )
+                usage_by_mount[mount_point] = 0  # Assume normal usage
+            else:
+                usage_by_mount[mount_point] = usage.percent
+        return usage_by_mount
+
+    def _scan_temp_cleanup(
+        self, cleanup_cfg: Dict[str, Any], temp_dirs: List[Path]
+    ) -> Dict[str, Any]:
+        """
+        Prepare the scan phase of a temp cleanup.
+
+        Temp directories are grouped by mount point and the usage of each
+        mount is probed once, so every filesystem gets its own cleanup level.
+        Each mount gets a ParallelDirectoryScanner with its share of
+        ``Performance.max_threads`` workers. Unless ``use_scan_index`` is off,
+        the scanners replay unchanged directories from the shared scan index,
+        which is saved by _finish_temp_scan().
+
+        Args:
+            cleanup_cfg: Cleanup configuration from _load_cleanup_config().
+            temp_dirs: Temporary directories to scan.
+
+        Returns:
+            Dict[str, Any]: ``mounts``, one entry per mount point holding its
+                            roots, scanner, lazy ``entries`` iterator of
+                            PlanEntry objects and chosen cleanup level; and
+                            the shared ``index``.
+        """
+        groups = group_by_mount(temp_dirs)
+        usage_by_mount = self._probe_mount_usage(list(groups))
+        matcher = CleanupMatcher(
+            cleanup_cfg.get("patterns"), cleanup_cfg["skip_prefixes"]
+        )
+        index = (
+            ScanIndex.load(self._scan_index_path())
+            if cleanup_cfg.get("use_scan_index")
+            else None
+        )
+        workers_per_mount = max(1, self._get_thread_count() // len(groups))
+        current_time = time.time()
+
+        def make_classifier(age_threshold_secs: float) -> Callable[..., str]:
+            def classify(entry: os.DirEntry, st: os.stat_result, depth: int) -> str:
+                # Check skip prefixes (protects the whole subtree)
+                if matcher.is_skipped(entry.name):
+                    return SCAN_PRESERVE
+
+                # Check age; recently modified items may be in use (e.g. an
+                # unpacking build tree), so they are kept whole
+                if current_time - st.st_mtime < age_threshold_secs:
+                    return SCAN_PRESERVE
+
+                # Check patterns (apply only if configured, otherwise delete old items);
+                # old directories that do not match may still hold matching files
+                if matcher.match(entry.name, entry.path) is None:
+                    return SCAN_DESCEND
+                return SCAN_DELETE
+
+            return classify
+
+        def entries(
+            scanner: ParallelDirectoryScanner, roots: List[Path]
+        ) -> Iterator[PlanEntry]:
+            scan = scanner.scan(roots)
+            try:
+                for candidate in scan:
+                    category = matcher.match(candidate.name, candidate.path)
+                    yield PlanEntry.from_candidate(candidate, category)
+            finally:
+                scan.close()
+
+        mounts = []
+        for mount_point, roots in groups.items():
+            used_percent = usage_by_mount[mount_point]
+            cleanup_level, age_threshold_days = self._select_cleanup_level(
+                cleanup_cfg, used_percent
+            )
+            scanner = ParallelDirectoryScanner(
+                make_classifier(age_threshold_days * 24 * 3600),
+                max_workers=workers_per_mount,
+                max_depth=cleanup_cfg["max_scan_depth"],
+                index=index,
+            )
+            self.logger.info(
+                f"Mount {mount_point}: disk usage at {used_percent:.1f}%. "
+                f"Applying '{cleanup_level}' cleanup (Age > {age_threshold_days} days) "
+                f"to {[str(r) for r in roots]}."
+            )
+            mounts.append(
+                {
+                    "mount_point": mount_point,
+                    "roots": roots,
+                    "scanner": scanner,
+                    "entries": entries(scanner, roots),
+                    "cleanup_level": cleanup_level,
+                    "age_threshold_days": age_threshold_days,
+                    "disk_usage_percent": used_percent,
+                }
+            )
+        self.logger.info(
+            f"Scanning {len(mounts)} mount(s) with {workers_per_mount} worker(s) each, "
+            f"max depth {cleanup_cfg['max_scan_depth']}"
+            f"{f', {len(index)} indexed dirs' if index is not None else ''}."
+        )
+        return {"mounts": mounts, "index": index}
+
+    def _finish_temp_scan(self, scan: Dict[str, Any]) -> None:
+        """Close the scans started by _scan_temp_cleanup() and save the scan index."""
+        for mount in scan["mounts"]:
+            mount["entries"].close()
+        index = scan["index"]
+        if index is None:
+            return
+        # Directories of roots that were never walked must keep their records
+        complete = all(
+            m["scanner"].stats.completed
+            and m["scanner"].stats.roots_scanned == len(m["roots"])
+            for m in scan["mounts"]
+        )
+        try:
+            index.save(complete=complete)
+        except OSError as e:
+            self.logger.warning(f"Could not save temp scan index: {e}")
+
+    @staticmethod
+    def _describe_cleanup_levels(mounts: List[Dict[str, Any]]) -> str:
+        """Summarize the per-mount cleanup levels for result details."""
+        levels = "; ".join(
+            f"{m['mount_point']}: {m['cleanup_level']} (Age > {m['age_threshold_days']} days)"
+            for m in mounts
+        )
+        return f"Cleanup level: {levels}."
+
+    @staticmethod
+    def _mount_summary(mount: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the report-friendly description of one scanned mount."""
+        return {
+            "roots": [str(r) for r in mount["roots"]],
+            "cleanup_level": mount["cleanup_level"],
+            "age_threshold_days": mount["age_threshold_days"],
+            "disk_usage_percent": mount["disk_usage_percent"],
+            "scan_stats": mount["scanner"].stats.to_dict(),
+        }
+
+    def _new_cleanup_result(self) -> Dict[str, Any]:
+        """Return an empty temp cleanup result dictionary."""
+        return {
             "success": False,
             "files_removed": 0,
             "dirs_removed": 0,
@@ -1214,97 +1934,289 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             "errors": [],
             "details": "",
         }
-        temp_dirs_to_clean = []
+
+    def _apply_plan_execution(
+        self,
+        result: Dict[str, Any],
+        execution: PlanExecutionResult,
+        budget: ByteBudget,
+    ) -> None:
+        """Copy the outcome of execute_plan() into a cleanup result dictionary."""
+        removal = execution.removal
+        for item_error in removal.errors:
+            self.logger.debug(
+                f"Failed to remove {item_error['path']}: {item_error['error']}"
+            )
+        if removal.budget_exhausted:
+            self.logger.info(
+                f"Byte budget of {budget.limit} bytes reached. Stopping cleanup."
+            )
+            result["details"] += f" Byte budget of {budget.limit} bytes reached."
+
+        result["files_removed"] = removal.files_removed
+        result["dirs_removed"] = removal.dirs_removed
+        result["space_freed_bytes"] = removal.bytes_freed
+        result["budget_exhausted"] = removal.budget_exhausted
+        result["freed_by_category"] = execution.freed_by_category
+        result["skipped_changed"] = execution.skipped
+        result["errors"].extend(removal.errors)
+
+    def _build_cleanup_throttle(
+        self, cleanup_cfg: Dict[str, Any]
+    ) -> Optional[IOThrottle]:
+        """
+        Create the deletion throttle configured in ``[TempFileCleanup]``.
+
+        Args:
+            cleanup_cfg: Cleanup configuration from _load_cleanup_config().
+
+        Returns:
+            Optional[IOThrottle]: The throttle, or None if no rate limit is set.
+        """
+        throttle = IOThrottle(
+            ops_per_second=cleanup_cfg["throttle_ops_per_second"],
+            bytes_per_second=cleanup_cfg["throttle_bytes_per_second"],
+            busy_threshold_percent=cleanup_cfg["throttle_busy_percent"],
+        )
+        if not throttle.enabled:
+            return None
+        self.logger.info(
+            f"Throttling deletions to {throttle.ops_per_second or 'unlimited'} ops/s "
+            f"and {throttle.bytes_per_second or 'unlimited'} bytes/s."
+        )
+        return throttle
+
+    def _apply_throttle_stats(
+        self, result: Dict[str, Any], throttle: Optional[IOThrottle]
+    ) -> None:
+        """Copy the achieved rates of a deletion throttle into a cleanup result."""
+        if throttle is None:
+            return
+        stats = throttle.snapshot()
+        result["throttle"] = stats
+        result["details"] += (
+            f" Throttled for {stats['throttled_seconds']:.1f}s "
+            f"({stats['ops_per_second']:.0f} ops/s achieved)."
+        )
+
+    def _scan_index_path(self) -> Path:
+        """Return the location of the temp scan index under the output cache directory."""
+        return self.config_manager.get_output_dir() / "cache" / "temp_scan_index.json"
+
+    def _default_plan_path(self) -> Path:
+        """Return a timestamped plan file path under the output directory."""
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        return (
+            self.config_manager.get_output_dir()
+            / "plans"
+            / f"temp_cleanup_{timestamp}.jsonl"
+        )
+
+    def plan_temp_cleanup(self, plan_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Scan the temp directories and write a deletion plan without deleting anything.
+
+        The plan is a JSON-lines file (one header line, then one line per
+        entry with path, size, mtime and matched category) that is streamed
+        to disk as the scan runs, so large plans never sit in memory. It can
+        be executed later with execute_cleanup_plan().
+
+        Args:
+            plan_path: Where to write the plan. Defaults to a timestamped file
+                       under ``<output_dir>/plans``.
+
+        Returns:
+            Dict[str, Any]: Preview including plan path, planned entry count,
+                          planned bytes (total and per category) and scan statistics.
+
+        Raises:
+            FileCleanupError: If the plan cannot be produced.
+            ConfigurationError: If cleanup configuration is invalid.
+        """
+        self.logger.info("Planning temporary file cleanup (dry run).")
         config_section = "TempFileCleanup"
+        try:
+            cleanup_cfg = self._load_cleanup_config()
+            temp_dirs = self._get_temp_directories()
+            plan_file = Path(plan_path) if plan_path else self._default_plan_path()
+            result = {
+                "success": False,
+                "plan_path": str(plan_file),
+                "planned_entries": 0,
+                "planned_bytes": 0,
+                "planned_by_category": {},
+                "errors": [],
+                "details": "",
+            }
+            if not temp_dirs:
+                result["plan_path"] = None
+                result["success"] = True
+                result["details"] = "No standard temporary directories found to clean."
+                self.logger.warning(result["details"])
+                return result
+
+            scan = self._scan_temp_cleanup(cleanup_cfg, temp_dirs)
+            mounts = scan["mounts"]
+            cleanup_levels = self._describe_cleanup_levels(mounts)
+            metadata = {
+                "roots": [str(d) for d in temp_dirs],
+                "cleanup_level": cleanup_levels,
+                "mounts": {
+                    m["mount_point"]: {
+                        "cleanup_level": m["cleanup_level"],
+                        "age_threshold_days": m["age_threshold_days"],
+                    }
+                    for m in mounts
+                },
+            }
+            try:
+                with DeletionPlanWriter(plan_file, metadata) as writer:
+                    for mount in mounts:
+                        for entry in mount["entries"]:
+                            writer.write(entry)
+            finally:
+                self._finish_temp_scan(scan)
+
+            scan_stats = ScanStats.combine(m["scanner"].stats for m in mounts)
+            result["planned_entries"] = writer.entries
+            result["planned_bytes"] = writer.total_bytes
+            result["planned_by_category"] = writer.bytes_by_category
+            result["cleanup_level"] = cleanup_levels
+            result["mounts"] = {
+                m["mount_point"]: self._mount_summary(m) for m in mounts
+            }
+            result["files_preserved"] = scan_stats.preserved
+            result["scan_stats"] = scan_stats.to_dict()
+            result["errors"].extend(scan_stats.errors)
+            result["success"] = True
+            result["details"] = (
+                f"{cleanup_levels} "
+                f"Planned {writer.entries} deletions, "
+                f"approx {writer.total_bytes / (1024 * 1024):.2f} MB in files. "
+                f"Plan written to {plan_file}."
+            )
+            self.logger.info(f"Temp cleanup plan ready. {result['details']}")
+            return result
+
+        except configparser.Error as e:
+            error_msg = f"Invalid cleanup configuration: {e}"
+            self.logger.error(error_msg, exc_info=True)
+            raise ConfigurationError(error_msg, {"section": config_section}) from e
+        except Exception as e:
+            error_msg = f"Failed to plan temporary file cleanup: {e}"
+            self.logger.error(error_msg, exc_info=True)
+            raise FileCleanupError(error_msg) from e
+
+    def execute_cleanup_plan(
+        self, plan_path: str, max_bytes_to_free: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a deletion plan written by plan_temp_cleanup().
+
+        The plan is streamed from disk and deleted on a worker pool sized from
+        ``Performance.max_threads``. Entries that vanished or whose mtime
+        changed since planning are skipped.
 
+        Args:
+            plan_path: Plan file to execute.
+            max_bytes_to_free: Stop once this many bytes have been freed.
+                               Defaults to ``TempFileCleanup.max_bytes_to_free``.
+
+        Returns:
+            Dict[str, Any]: Cleanup results in the same shape as clean_temp_files().
+
+        Raises:
+            FileCleanupError: If the plan is missing, invalid, or execution fails.
+        """
+        self.logger.info(f"Executing temp cleanup plan: {plan_path}")
+        result = self._new_cleanup_result()
+        result["plan_path"] = str(plan_path)
         try:
-            # Load cleanup config with defaults
-            cleanup_cfg = self.DEFAULT_CLEANUP_CONFIG.copy()
-            if self.config.has_section(config_section):
-                cfg_key = "critical_disk_usage_percent"
-                cleanup_cfg[cfg_key] = self.config.getfloat(
-                    config_section, cfg_key, fallback=cleanup_cfg[cfg_key]
-                )
-                cfg_key = "high_disk_usage_percent"
-                cleanup_cfg[cfg_key] = self.config.getfloat(
-                    config_section, cfg_key, fallback=cleanup_cfg[cfg_key]
-                )
-                cfg_key = "critical_age_threshold_days"
-                cleanup_cfg[cfg_key] = self.config.getint(
-                    config_section, cfg_key, fallback=cleanup_cfg[cfg_key]
-                )
-                cfg_key = "high_age_threshold_days"
-                cleanup_cfg[cfg_key] = self.config.getint(
-                    config_section, cfg_key, fallback=cleanup_cfg[cfg_key]
-                )
-                cfg_key = "normal_age_threshold_days"
-                cleanup_cfg[cfg_key] = self.config.getint(
-                    config_section, cfg_key, fallback=cleanup_cfg[cfg_key]
-                )
-                # Load patterns (assuming JSON or comma-separated in config)
-                try:
-                    patterns_str = self.config.get(
-                        config_section,
-                        "patterns",
-                        fallback=str(cleanup_cfg["patterns"]),
-                    )
-                    # Basic parsing assuming dict-like string or JSON string
-                    import json
+            header = read_plan_header(plan_path)
+            cleanup_cfg = self._load_cleanup_config()
+            if max_bytes_to_free is None:
+                max_bytes_to_free = cleanup_cfg["max_bytes_to_free"]
+            budget = ByteBudget(max_bytes_to_free)
+            result["details"] = (
+                f"Cleanup level: {header.get('cleanup_level', 'unknown')} "
+                f"(planned {header.get('created', 'unknown')})."
+            )
 
-                    try:
-                        cleanup_cfg["patterns"] = json.loads(
-                            patterns_str.replace("'", '"')
-                        )
-                    except json.JSONDecodeError:
-                        self.logger.warning(
-                            f"Could not parse patterns from config string: {patterns_str}. Using defaults."
-                        )
-                        cleanup_cfg["patterns"] = self.DEFAULT_CLEANUP_CONFIG[
-                            "patterns"
-                        ]
-                except Exception as pattern_err:
-                    self.logger.warning(
-                        f"Error loading patterns from config: {pattern_err}. Using defaults."
-                    )
-                    cleanup_cfg["patterns"] = self.DEFAULT_CLEANUP_CONFIG["patterns"]
+            throttle = self._build_cleanup_throttle(cleanup_cfg)
 
-                # Load skip prefixes
-                skip_prefixes_str = self.config.get(
-                    config_section,
-                    "skip_prefixes",
-                    fallback=",".join(cleanup_cfg["skip_prefixes"]),
-                )
-                cleanup_cfg["skip_prefixes"] = [
-                    p.strip() for p in skip_prefixes_str.split(",") if p.strip()
-                ]
-            else:
-                self.logger.warning(
-                    f"Configuration section '[{config_section}]' not found. Using default cleanup settings."
-                )
+            execution = execute_plan(
+                read_plan(plan_path),
+                max_workers=self._get_thread_count(),
+                budget=budget,
+                verify=True,
+                throttle=throttle,
+            )
+            self._apply_plan_execution(result, execution, budget)
 
-            # Identify temporary directories
-            env_vars = ["TEMP", "TMP"]
-            if platform.system() == "Windows":
-                env_vars.extend(
-                    ["LOCALAPPDATA", "USERPROFILE"]
-                )  # Look in AppData\Local\Temp too
-            elif platform.system() == "Linux":
-                temp_dirs_to_clean.append(Path("/tmp"))
-                temp_dirs_to_clean.append(Path("/var/tmp"))
-            elif platform.system() == "Darwin":
-                temp_dirs_to_clean.append(Path("/private/var/tmp"))
-                # Add user cache dir? Path.home() / "Library/Caches" - BE CAREFUL HERE
-
-            for var in env_vars:
-                if path_str := os.environ.get(var):
-                    path = Path(path_str)
-                    if (
-                        var in ["LOCALAPPDATA", "USERPROFILE"]
-                        and platform.system() == "Windows"
-                    ):
-                        path = path / "AppData" / "Local" / "Temp"  # Common location
-                    if path.is_dir() and path not in temp_dirs_to_clean:
-                        temp_dirs_to_clean.append(path)
+            result["success"] = not result["errors"]
+            result["details"] += (
+                f" Removed {result['files_removed']} files, {result['dirs_removed']} dirs. "
+                f"Freed approx {result['space_freed_bytes'] / (1024 * 1024):.2f} MB. "
+                f"{execution.skipped} entries skipped as changed. "
+                f"{len(result['errors'])} errors."
+            )
+            self._apply_throttle_stats(result, throttle)
+            self.logger.info(f"Temp cleanup plan executed. {result['details']}")
+            return result
+
+        except (OSError, ValueError) as e:
+            error_msg = f"Failed to read cleanup plan {plan_path}: {e}"
+            self.logger.error(error_msg, exc_info=True)
+            raise FileCleanupError(error_msg, {"plan_path": str(plan_path)}) from e
+        except Exception as e:
+            error_msg = f"Failed to execute cleanup plan: {e}"
+            self.logger.error(error_msg, exc_info=True)
+            raise FileCleanupError(error_msg, {"plan_path": str(plan_path)}) from e
+
+    def clean_temp_files(
+        self,
+        max_bytes_to_free: Optional[int] = None,
+        dry_run: bool = False,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, Any]:
+        """
+        Clean temporary files based on age, patterns, and disk usage thresholds from config.
+
+        Temp directories are grouped by mount point and each filesystem gets
+        its own cleanup level from its disk usage. Mounts are cleaned
+        concurrently; within a mount, candidates from the ParallelDirectoryScanner
+        are streamed straight into the delete workers without writing a plan.
+        Directories are measured and removed in a single pass. When
+        ``throttle_ops_per_second`` or ``throttle_bytes_per_second`` is set,
+        deletions are paced by a shared IOThrottle.
+
+        Args:
+            max_bytes_to_free: Stop once this many bytes have been freed.
+                               Defaults to ``TempFileCleanup.max_bytes_to_free``
+                               (0 means no limit).
+            dry_run: Only plan the cleanup (see plan_temp_cleanup()).
+            cancel_token: Optional cancellation token; once cancelled, no
+                          new deletions are started and the scan is stopped.
+
+        Returns:
+            Dict[str, Any]: Cleanup operation results including success status,
+                          files removed count, space freed (approx), scan
+                          statistics, and any errors.
+
+        Raises:
+            FileCleanupError: If cleanup process encounters critical errors.
+            ConfigurationError: If cleanup configuration is invalid.
+        """
+        if dry_run:
+            return self.plan_temp_cleanup()
+
+        self.logger.info("Starting temporary file cleanup.")
+        result = self._new_cleanup_result()
+        config_section = "TempFileCleanup"
+
+        try:
+            cleanup_cfg = self._load_cleanup_config()
+            temp_dirs_to_clean = self._get_temp_directories()
 
             if not temp_dirs_to_clean:
                 result["details"] = "No standard temporary directories found to clean."
@@ -1316,149 +2228,76 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
                 f"Identified temp directories to scan: {[str(d) for d in temp_dirs_to_clean]}"
             )
 
-            # Determine age threshold based on disk usage of the *first* temp dir found
-            # A more robust approach might check usage for each mount point involved.
-            try:
-                usage = psutil.disk_usage(str(temp_dirs_to_clean[0]))
-                used_percent = usage.percent
-            except (FileNotFoundError, psutil.Error) as e:
-                self.logger.warning(
-                    f"Could not get disk usage for {temp_dirs_to_clean[0]}: {e}. Using normal age threshold."
+            scan = self._scan_temp_cleanup(cleanup_cfg, temp_dirs_to_clean)
+            mounts = scan["mounts"]
+            result["details"] = self._describe_cleanup_levels(mounts)
+
+            if max_bytes_to_free is None:
+                max_bytes_to_free = cleanup_cfg["max_bytes_to_free"]
+            budget = ByteBudget(max_bytes_to_free)
+            # One throttle for all mounts keeps the host-wide rate within limits
+            throttle = self._build_cleanup_throttle(cleanup_cfg)
+
+            def clean_mount(mount: Dict[str, Any]) -> PlanExecutionResult:
+                scanner = mount["scanner"]
+                return execute_plan(
+                    mount["entries"],
+                    max_workers=scanner.max_workers,
+                    budget=budget,
+                    # Freshly listed entries were stat'ed moments ago, but stats
+                    # replayed from the scan index may be stale
+                    verify=scanner.index is not None,
+                    throttle=throttle,
+                    should_stop=(
+                        (lambda: cancel_token.cancelled) if cancel_token else None
+                    ),
                 )
-                used_percent = 0  # Assume normal usage
-
-            if used_percent > cleanup_cfg["critical_disk_usage_percent"]:
-                age_threshold_days = cleanup_cfg["critical_age_threshold_days"]
-                cleanup_level = "aggressive"
-            elif used_percent > cleanup_cfg["high_disk_usage_percent"]:
-                age_threshold_days = cleanup_cfg["high_age_threshold_days"]
-                cleanup_level = "standard"
-            else:
-                age_threshold_days = cleanup_cfg["normal_age_threshold_days"]
-                cleanup_level = "conservative"
 
-            self.logger.info(
-                f"Disk usage at {used_percent:.1f}%. Applying '{cleanup_level}' cleanup (Age > {age_threshold_days} days)."
-            )
-            result["details"] = (
-                f"Cleanup level: {cleanup_level} (Age > {age_threshold_days} days)."
-            )
-
-            current_time = time.time()
-            age_threshold_secs = age_threshold_days * 24 * 3600
-
-            # Iterate and clean
-            for temp_dir in temp_dirs_to_clean:
-                if not temp_dir.is_dir():
-                    self.logger.debug(f"Skipping non-existent directory: {temp_dir}")
-                    continue
+            execution = PlanExecutionResult()
+            try:
+                if len(mounts) == 1:
+                    executions = [clean_mount(mounts[0])]
+                else:
+                    # Each filesystem is scanned and cleaned independently
+                    with ThreadPoolExecutor(
+                        max_workers=len(mounts), thread_name_prefix="temp-mount"
+                    ) as executor:
+                        executions = list(executor.map(clean_mount, mounts))
+            finally:
+                self._finish_temp_scan(scan)
+            result["mounts"] = {}
+            for mount, mount_execution in zip(mounts, executions):
+                execution.merge(mount_execution)
+                summary = self._mount_summary(mount)
+                summary["files_removed"] = mount_execution.removal.files_removed
+                summary["dirs_removed"] = mount_execution.removal.dirs_removed
+                summary["space_freed_bytes"] = mount_execution.removal.bytes_freed
+                result["mounts"][mount["mount_point"]] = summary
+            self._apply_plan_execution(result, execution, budget)
+            if execution.stopped:
+                result["cancelled"] = True
+                result["details"] += " Cleanup was cancelled before completion."
+
+            scan_stats = ScanStats.combine(m["scanner"].stats for m in mounts)
+            for scan_error in scan_stats.errors:
+                self.logger.debug(
+                    f"Scan error for {scan_error['path']}: {scan_error['error']}"
+                )
+            result["errors"].extend(scan_stats.errors)
+            result["files_preserved"] = scan_stats.preserved
+            result["scan_stats"] = scan_stats.to_dict()
 
-                self.logger.info(f"Cleaning directory: {temp_dir}")
-                # Use scandir for potentially better performance
-                try:
-                    for item in os.scandir(temp_dir):
-                        try:
-                            item_path = Path(item.path)
-                            # Check skip prefixes
-                            if any(
-                                item.name.lower().startswith(p)
-                                for p in cleanup_cfg["skip_prefixes"]
-                            ):
-                                self.logger.debug(
-                                    f"Skipping '{item.name}' due to skip prefix."
-                                )
-                                result["files_preserved"] += 1
-                                continue
-
-                            # Check age
-                            item_mtime = item.stat().st_mtime
-                            item_age_secs = current_time - item_mtime
-                            if item_age_secs < age_threshold_secs:
-                                result["files_preserved"] += 1
-                                continue  # Skip recent items
-
-                            # Check patterns (apply only if configured, otherwise delete old items)
-                            matches_pattern = False
-                            if cleanup_cfg.get("patterns"):
-                                for patterns in cleanup_cfg["patterns"].values():
-                                    if any(item_path.match(p) for p in patterns):
-                                        matches_pattern = True
-                                        break
-                            else:
-                                matches_pattern = True  # Delete if no patterns specified and old enough
-
-                            if not matches_pattern:
-                                result["files_preserved"] += 1
-                                continue  # Skip if patterns defined but item doesn't match
-
-                            # Delete item
-                            item_size = item.stat().st_size
-                            if item.is_file() or item.is_symlink():
-                                item_path.unlink(missing_ok=True)
-                                result["files_removed"] += 1
-                                result["space_freed_bytes"] += item_size
-                                self.logger.debug(f"Removed file: {item_path}")
-                            elif item.is_dir():
-                                dir_size = sum(
-                                    f.stat().st_size
-                                    for f in item_path.glob("**/*")
-                                    if f.is_file()
-                                )  # Approx size
-                                shutil.rmtree(item_path, ignore_errors=True)
-                                result["dirs_removed"] += 1
-                                result[
-                                    "space_freed_bytes"
-                                ] += dir_size  # Add estimated dir size
-                                self.logger.debug(f"Removed directory: {item_path}")
-
-                        except PermissionError as pe:
-                            result["errors"].append(
-                                {"path": item.path, "error": f"Permission denied: {pe}"}
-                            )
-                            self.logger.debug(
-                                f"Permission denied for {item.path}: {pe}"
-                            )
-                        except OSError as oe:
-                            result["errors"].append(
-                                {"path": item.path, "error": f"OS error: {oe}"}
-                            )
-                            self.logger.warning(f"Failed to process {item.path}: {oe}")
-                        except Exception as item_err:
-                            result["errors"].append(
-                                {
-                                    "path": item.path,
-                                    "error": f"Unexpected error: {item_err}",
-                                }
-                            )
-                            self.logger.warning(
-                                f"Unexpected error processing {item.path}: {item_err}",
-                                exc_info=True,
-                            )
-
-                except PermissionError as dir_pe:
-                    result["errors"].append(
-                        {
-                            "path": str(temp_dir),
-                            "error": f"Permission denied accessing dir: {dir_pe}",
-                        }
-                    )
-                    self.logger.warning(
-                        f"Permission denied accessing directory {temp_dir}: {dir_pe}"
-                    )
-                except Exception as dir_err:
-                    error_msg = f"Critical error while cleaning {temp_dir}: {dir_err}"
-                    self.logger.error(error_msg, exc_info=True)
-                    result["errors"].append({"path": str(temp_dir), "error": error_msg})
-                    # Decide if this is critical enough to stop the whole task
-                    # raise FileCleanupError(error_msg, {"directory": str(temp_dir)})
-
-            result["success"] = not result["errors"]  # Success if no errors occurred
+            # Success if no errors occurred and the cleanup ran to completion
+            result["success"] = not result["errors"] and not execution.stopped
             space_freed_mb = result["space_freed_bytes"] / (1024 * 1024)
             result["details"] += (
                 f" Removed {result['files_removed']} files, {result['dirs_removed']} dirs. "
                 f"Freed approx {space_freed_mb:.2f} MB. "
-                f"{result['files_preserved']} items preserved. {len(result['errors'])} errors."
+                f"{result['files_preserved']} items preserved. {len(result['errors'])} errors. "
+                f"Scanned {scan_stats.entries_scanned} entries "
+                f"({scan_stats.entries_per_second:.0f} entries/s)."
             )
+            self._apply_throttle_stats(result, throttle)
             self.logger.info(f"Temp file cleanup finished. {result['details']}")
             return result
 
@@ -1471,12 +2310,18 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             self.logger.error(error_msg, exc_info=True)
             raise FileCleanupError(error_msg) from e
 
-    def defragment_disk(self, drive_letter: Optional[str] = None) -> Dict[str, Any]:
+    def defragment_disk(
+        self,
+        drive_letter: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, Any]:
         """
         Initiates disk defragmentation on Windows for a specific drive or the system drive.
 
         Args:
             drive_letter: The drive letter to defragment (e.g., "C"). If None, uses the system drive.
+            cancel_token: Optional cancellation token; cancelling it kills the
+                          running defrag.exe process tree.
 
         Returns:
             Dict[str, Any]: Result dictionary with success status and details.
@@ -1505,6 +2350,16 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             # Requires Administrator privileges
             import subprocess
 
+            # Stoppable counterpart of subprocess.run for the defrag commands
+            def run_defrag(cmd: List[str], timeout: int) -> subprocess.CompletedProcess:
+                return run_cancellable_process(
+                    cmd,
+                    cancel_token,
+                    timeout=timeout,
+                    check=True,
+                    creationflags=subprocess.CREATE_NO_WINDOW,
+                )
+
             # Step 1: Analyze the drive
             analyze_cmd = ["defrag", f"{target_drive}:", "/A", "/U", "/V"]
             self.logger.debug(f"Running command: {' '.join(analyze_cmd)}")
@@ -1512,14 +2367,7 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
                 # Run with admin rights if possible, or inform user
                 # Note: Running requires elevation which isn't directly handled here.
                 # This will likely fail without admin rights.
-                analysis_output = subprocess.run(
-                    analyze_cmd,
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=300,
-                    creationflags=subprocess.CREATE_NO_WINDOW,
-                )
+                analysis_output = run_defrag(analyze_cmd, timeout=300)
                 self.logger.info(
                     f"Defrag analysis output for {target_drive}:\n{analysis_output.stdout}"
                 )
@@ -1540,14 +2388,7 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
                     f"Starting defragmentation for drive {target_drive}: (requires admin)"
                 )
                 self.logger.debug(f"Running command: {' '.join(defrag_cmd)}")
-                defrag_output = subprocess.run(
-                    defrag_cmd,
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=3600,
-                    creationflags=subprocess.CREATE_NO_WINDOW,
-                )  # Longer timeout
+                defrag_output = run_defrag(defrag_cmd, timeout=3600)  # Longer timeout
                 self.logger.info(
                     f"Defrag execution output for {target_drive}:\n{defrag_output.stdout}"
                 )
@@ -1576,6 +2417,9 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
 
             return result
 
+        except TaskCancelledError:
+            self.logger.warning(f"Defragmentation of {result['drive']} was cancelled.")
+            raise
         except Exception as e:
             error_msg = f"Failed to perform disk defragmentation: {e}"
             self.logger.error(error_msg, exc_info=True)
@@ -1599,9 +2443,13 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
         success = False
 
         try:
-            # all=False attempts to exclude virtual/pseudo filesystems
-            # opts='rw' ensures we only look at read-write mounts
-            partitions = psutil.disk_partitions(all=False)
+            # The shared registry caches the mount table without pseudo
+            # filesystems and probes every mount in parallel with a timeout
+            registry = get_partition_registry()
+            partitions = registry.partitions()
+            probes = registry.probe_usage(
+                partition.mountpoint for partition in partitions
+            )
 
             for partition in partitions:
                 # Skip potentially problematic types or removable media more explicitly
@@ -1618,7 +2466,9 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
                     continue
 
                 try:
-                    usage = psutil.disk_usage(partition.mountpoint)
+                    usage = probes[partition.mountpoint]
+                    if isinstance(usage, BaseException):
+                        raise usage
                     usage_percent = usage.percent
                     status = "healthy"
                     if usage_percent >= 95:
@@ -1930,7 +2780,10 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             self.logger.warning("Task cleanup failed or had issues.")
             all_ok = False
 
-        # 3. Restore Windows theme settings if they were modified by a task
+        # 3. Record pending run reports
+        self.close_history()
+
+        # 4. Restore Windows theme settings if they were modified by a task
         # Check if the 'adjust_windows_theme_performance' task ran with optimize=True
         # This requires tracking task execution details or checking the last run result.
         # Simplified: Always try to restore if original settings exist.
@@ -1947,7 +2800,7 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
                 )
                 # Don't mark overall cleanup as failed just for theme restore failure
 
-        # 4. Config saving is handled by ConfigManager externally or on app exit
+        # 5. Config saving is handled by ConfigManager externally or on app exit
 
         self._status = "shutdown"
         if all_ok:
@@ -1958,3 +2811,29 @@ class PerformanceOptimizer(BasePerformanceOptimizer):
             )
 
         return all_ok
+
+
+def _run_isolated_task(
+    function_name: str,
+    params: Dict[str, Any],
+    config: Optional[Dict[str, Dict[str, str]]] = None,
+) -> Any:
+    """
+    Picklable entry point for optimization tasks run on the process backend.
+
+    Builds a fresh PerformanceOptimizer in the child process, applies the
+    parent's configuration snapshot on top of the saved configuration, and
+    calls the named task function on it.
+
+    Args:
+        function_name: Name of the task function (see _map_task_functions()).
+        params: Keyword arguments for the task function.
+        config: Optional configuration snapshot from _config_snapshot().
+
+    Returns:
+        Any: The task function's (picklable) result.
+    """
+    optimizer = PerformanceOptimizer()
+    if config:
+        optimizer.config.read_dict(config)
+    return optimizer._tasks[function_name](**params)
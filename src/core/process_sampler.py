@@ -0,0 +1,191 @@
+"""
+Per-process resource sampling for SentinelPC.
+
+System totals do not show which process is responsible for high CPU or
+memory usage. ProcessSampler scans all processes with a fixed attribute
+list, derives CPU and I/O rates from the difference to the previous scan
+and keeps the top N processes by CPU, resident memory and I/O rate.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+# Attributes read per process; process_iter reads them in one oneshot() pass
+PROCESS_ATTRS = ["name", "cpu_times", "memory_info", "io_counters"]
+RANKINGS = {
+    "top_cpu": "cpu_percent",
+    "top_memory": "rss",
+    "top_io": "io_bytes_per_second",
+}
+
+
+class _Previous:
+    """Counters of one process at the previous scan."""
+
+    __slots__ = ("process", "cpu_seconds", "io_bytes")
+
+    def __init__(self, process: psutil.Process, cpu_seconds: float, io_bytes):
+        self.process = process
+        self.cpu_seconds = cpu_seconds
+        self.io_bytes = io_bytes
+
+
+class ProcessSampler:
+    """
+    Tracks the processes using the most CPU, memory and I/O.
+
+    ``psutil.process_iter`` hands back the same Process objects across
+    scans while their PIDs stay alive, and the previous CPU time and I/O
+    counters are kept per process, so each scan reads every process once
+    and computes rates without sleeping. A PID that was reused by a new
+    process gets a new Process object and starts without a rate.
+    Thread-safe.
+    """
+
+    def __init__(self, top_n: int = 10):
+        """
+        Initializes the sampler.
+
+        Args:
+            top_n: Number of processes kept per ranking.
+
+        Raises:
+            ValueError: If top_n is not positive.
+        """
+        if top_n <= 0:
+            raise ValueError("Process top-N size must be positive")
+        self.top_n = top_n
+        self.logger = logging.getLogger(__name__)
+        self._previous: Dict[int, _Previous] = {}
+        self._previous_at: Optional[float] = None
+        self._latest: Optional[Dict[str, Any]] = None
+        self._latest_at = 0.0
+        self._lock = threading.Lock()
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Scan all processes and rank them.
+
+        Returns:
+            Dict[str, Any]: ``timestamp``, ``process_count``, ``scan_seconds``
+            and one list per RANKINGS key with up to ``top_n`` entries (pid,
+            name, cpu_percent, rss, io_bytes_per_second), highest first.
+            Rates are None for processes first seen in this scan.
+        """
+        with self._lock:
+            started = time.perf_counter()
+            now = time.monotonic()
+            elapsed = None if self._previous_at is None else now - self._previous_at
+            current: Dict[int, _Previous] = {}
+            entries: List[Dict[str, Any]] = []
+            for process in psutil.process_iter(PROCESS_ATTRS):
+                info = process.info
+                cpu_times = info["cpu_times"]
+                memory = info["memory_info"]
+                io = info["io_counters"]
+                cpu_seconds = cpu_times.user + cpu_times.system if cpu_times else None
+                io_bytes = io.read_bytes + io.write_bytes if io else None
+                current[process.pid] = _Previous(process, cpu_seconds, io_bytes)
+                entries.append(
+                    {
+                        "pid": process.pid,
+                        "name": info["name"],
+                        "cpu_percent": None,
+                        "rss": memory.rss if memory else 0,
+                        "io_bytes_per_second": None,
+                    }
+                )
+                previous = self._previous.get(process.pid)
+                if previous is None or previous.process is not process or not elapsed:
+                    continue
+                entry = entries[-1]
+                if cpu_seconds is not None and previous.cpu_seconds is not None:
+                    entry["cpu_percent"] = (
+                        max(0.0, cpu_seconds - previous.cpu_seconds) / elapsed * 100
+                    )
+                if io_bytes is not None and previous.io_bytes is not None:
+                    entry["io_bytes_per_second"] = (
+                        max(0, io_bytes - previous.io_bytes) / elapsed
+                    )
+            self._previous = current
+            self._previous_at = now
+            snapshot: Dict[str, Any] = {
+                "timestamp": time.time(),
+                "process_count": len(entries),
+            }
+            for ranking, key in RANKINGS.items():
+                snapshot[ranking] = heapq.nlargest(
+                    self.top_n, entries, key=lambda entry: entry[key] or 0
+                )
+            snapshot["scan_seconds"] = time.perf_counter() - started
+            self._latest = snapshot
+            self._latest_at = now
+            return snapshot
+
+    def latest(self, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the most recent scan.
+
+        Args:
+            max_age: Maximum age in seconds; None accepts any age.
+
+        Returns:
+            Optional[Dict[str, Any]]: Output of sample(), or None if there
+            is no scan recent enough.
+        """
+        with self._lock:
+            if self._latest is None:
+                return None
+            if max_age is not None and time.monotonic() - self._latest_at > max_age:
+                return None
+            return self._latest
+
+    def snapshot(self, max_age: float) -> Dict[str, Any]:
+        """
+        Return a recent scan, scanning now if the latest one is too old.
+
+        Args:
+            max_age: Maximum age in seconds of a reused scan.
+
+        Returns:
+            Dict[str, Any]: Output of sample().
+        """
+        latest = self.latest(max_age)
+        return latest if latest is not None else self.sample()
+
+
+def format_top(entries: List[Dict[str, Any]], count: int = 3) -> str:
+    """
+    Short description of the leading entries of a ranking, for log messages.
+
+    Args:
+        entries: A ranking list from ProcessSampler.sample().
+        count: Number of entries to describe.
+
+    Returns:
+        str: "name (pid)" per entry, comma-separated.
+    """
+    return ", ".join(f"{entry['name']} ({entry['pid']})" for entry in entries[:count])
+
+
+_default_sampler: Optional[ProcessSampler] = None
+_default_sampler_lock = threading.Lock()
+
+
+def get_process_sampler() -> ProcessSampler:
+    """
+    Return the process-wide sampler shared by monitoring and optimization.
+
+    Returns:
+        ProcessSampler: The shared instance, created on first use.
+    """
+    global _default_sampler
+    with _default_sampler_lock:
+        if _default_sampler is None:
+            _default_sampler = ProcessSampler()
+        return _default_sampler
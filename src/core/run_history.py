@@ -0,0 +1,504 @@
+"""
+Persistent history of SentinelPC optimization runs.
+
+Every optimization report is stored in an SQLite database: one row per run
+with the full report, and one row per task with its outcome and duration.
+Indexes on profile, task name, timestamp and outcome keep questions like
+"p95 duration of temp_cleanup over the last 30 days" or "failure rate per
+task" fast with hundreds of thousands of runs. A background writer keeps
+the database out of the optimization thread.
+"""
+
+import json
+import logging
+import math
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_FAILED = "failed"
+OUTCOME_CANCELLED = "cancelled"
+# A run that raised instead of producing a report
+OUTCOME_ERROR = "error"
+OUTCOMES = (OUTCOME_SUCCESS, OUTCOME_FAILED, OUTCOME_CANCELLED, OUTCOME_ERROR)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    profile TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL,
+    tasks_completed INTEGER NOT NULL,
+    tasks_failed INTEGER NOT NULL,
+    report TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (timestamp);
+CREATE INDEX IF NOT EXISTS runs_by_profile ON runs (profile, timestamp);
+CREATE INDEX IF NOT EXISTS runs_by_outcome ON runs (outcome, timestamp);
+CREATE TABLE IF NOT EXISTS task_runs (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    task TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS task_runs_by_run ON task_runs (run_id);
+CREATE INDEX IF NOT EXISTS task_runs_by_time
+    ON task_runs (task, timestamp, outcome, duration);
+CREATE INDEX IF NOT EXISTS task_runs_by_duration
+    ON task_runs (task, duration, timestamp, outcome);
+CREATE INDEX IF NOT EXISTS task_runs_by_profile
+    ON task_runs (profile, task, timestamp);
+CREATE INDEX IF NOT EXISTS task_runs_by_outcome ON task_runs (outcome, timestamp);
+"""
+
+
+def run_outcome(report: Dict[str, Any]) -> str:
+    """
+    Outcome of an optimization run.
+
+    Args:
+        report: Report returned by optimize_system(), or the error result
+                kept when it raised.
+
+    Returns:
+        str: One of OUTCOMES.
+    """
+    if report.get("success"):
+        return OUTCOME_SUCCESS
+    if "error" in report and "task_results" not in report:
+        return OUTCOME_ERROR
+    return OUTCOME_FAILED
+
+
+def task_outcome(result: Dict[str, Any]) -> str:
+    """
+    Outcome of a single task.
+
+    Args:
+        result: Task result from an optimization report.
+
+    Returns:
+        str: OUTCOME_SUCCESS, OUTCOME_CANCELLED or OUTCOME_FAILED.
+    """
+    if result.get("success"):
+        return OUTCOME_SUCCESS
+    if result.get("error") == "cancelled":
+        return OUTCOME_CANCELLED
+    return OUTCOME_FAILED
+
+
+class RunHistory:
+    """
+    SQLite store of optimization reports.
+
+    record() writes synchronously; use a RunHistoryWriter to keep writes off
+    the calling thread. Queries accept ``since`` as epoch seconds and
+    ``profile``/``outcome`` filters. Thread-safe.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Opens or creates the database.
+
+        Args:
+            path: Database file; ":memory:" for a private in-memory database.
+        """
+        self.path = path if path == ":memory:" else Path(path)
+        if isinstance(self.path, Path):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            if self.path != ":memory:":
+                # Readers do not wait for the writer
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA foreign_keys=ON")
+            self._db.executescript(SCHEMA)
+            self._db.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+    def record(
+        self,
+        report: Dict[str, Any],
+        profile: str,
+        timestamp: Optional[float] = None,
+    ) -> int:
+        """
+        Store an optimization report and its task results.
+
+        Args:
+            report: Report returned by optimize_system().
+            profile: Name of the profile the run used.
+            timestamp: Epoch seconds the run started; now if None.
+
+        Returns:
+            int: ID of the stored run.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        task_rows = [
+            (
+                result.get("name", "unknown_task"),
+                profile,
+                timestamp,
+                task_outcome(result),
+                result.get("duration_seconds"),
+                None if result.get("success") else str(result.get("error", "")),
+            )
+            for result in report.get("task_results", [])
+        ]
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO runs (timestamp, profile, outcome, duration,"
+                " tasks_completed, tasks_failed, report)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    timestamp,
+                    profile,
+                    run_outcome(report),
+                    report.get("duration_seconds"),
+                    report.get("tasks_completed", 0),
+                    report.get("tasks_failed", 0),
+                    json.dumps(report, default=str),
+                ),
+            )
+            run_id = cursor.lastrowid
+            self._db.executemany(
+                "INSERT INTO task_runs (run_id, task, profile, timestamp, outcome,"
+                " duration, error) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, *row) for row in task_rows],
+            )
+        return run_id
+
+    @staticmethod
+    def _filters(
+        since: Optional[float] = None,
+        profile: Optional[str] = None,
+        outcome: Optional[str] = None,
+        task: Optional[str] = None,
+    ) -> Tuple[str, List[Any]]:
+        """WHERE clause and parameters for the given filters."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (("task", task), ("profile", profile)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if outcome is not None:
+            if outcome not in OUTCOMES:
+                raise ValueError(f"Unknown outcome: {outcome}")
+            clauses.append("outcome = ?")
+            params.append(outcome)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _query(self, sql: str, params: List[Any]) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def duration_percentile(
+        self,
+        task: str,
+        percentile: float = 95.0,
+        since: Optional[float] = None,
+        profile: Optional[str] = None,
+        outcome: Optional[str] = None,
+    ) -> Optional[float]:
+        """
+        Nearest-rank percentile of a task's duration.
+
+        Args:
+            task: Task name.
+            percentile: Percentile between 0 and 100.
+            since: Only runs at or after this epoch time.
+            profile: Only runs of this profile.
+            outcome: Only task runs with this outcome.
+
+        Returns:
+            Optional[float]: Duration in seconds, or None without matching runs.
+
+        Raises:
+            ValueError: If percentile is out of range or outcome is unknown.
+        """
+        if not 0 <= percentile <= 100:
+            raise ValueError("percentile must be between 0 and 100")
+        where, params = self._filters(since, profile, outcome, task)
+        where += " AND duration IS NOT NULL"
+        count = self._query(f"SELECT COUNT(*) FROM task_runs{where}", params)[0][0]
+        if not count:
+            return None
+        rank = max(1, math.ceil(percentile / 100 * count))
+        rows = self._query(
+            f"SELECT duration FROM task_runs{where}"
+            " ORDER BY duration LIMIT 1 OFFSET ?",
+            params + [rank - 1],
+        )
+        return rows[0][0] if rows else None
+
+    def task_stats(
+        self,
+        since: Optional[float] = None,
+        profile: Optional[str] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Run counts, failure rate and duration summary per task.
+
+        Args:
+            since: Only runs at or after this epoch time.
+            profile: Only runs of this profile.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: ``runs``, ``failures``, ``cancelled``,
+            ``failure_rate`` (failed or cancelled runs / runs),
+            ``mean_duration`` and ``max_duration`` per task name.
+        """
+        where, params = self._filters(since, profile)
+        rows = self._query(
+            "SELECT task, COUNT(*) AS runs,"
+            f" SUM(outcome = '{OUTCOME_FAILED}') AS failures,"
+            f" SUM(outcome = '{OUTCOME_CANCELLED}') AS cancelled,"
+            " AVG(duration) AS mean_duration, MAX(duration) AS max_duration"
+            f" FROM task_runs{where} GROUP BY task ORDER BY task",
+            params,
+        )
+        return {
+            row["task"]: {
+                "runs": row["runs"],
+                "failures": row["failures"],
+                "cancelled": row["cancelled"],
+                "failure_rate": round(
+                    (row["failures"] + row["cancelled"]) / row["runs"], 4
+                ),
+                "mean_duration": row["mean_duration"],
+                "max_duration": row["max_duration"],
+            }
+            for row in rows
+        }
+
+    def failure_rates(
+        self,
+        since: Optional[float] = None,
+        profile: Optional[str] = None,
+    ) -> Dict[str, float]:
+        """
+        Share of failed or cancelled runs per task.
+
+        Args:
+            since: Only runs at or after this epoch time.
+            profile: Only runs of this profile.
+
+        Returns:
+            Dict[str, float]: Failure rate between 0 and 1 per task name.
+        """
+        return {
+            task: stats["failure_rate"]
+            for task, stats in self.task_stats(since, profile).items()
+        }
+
+    def runs(
+        self,
+        limit: int = 50,
+        since: Optional[float] = None,
+        profile: Optional[str] = None,
+        outcome: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Summaries of the most recent runs, newest first.
+
+        Args:
+            limit: Maximum number of runs.
+            since: Only runs at or after this epoch time.
+            profile: Only runs of this profile.
+            outcome: Only runs with this outcome.
+
+        Returns:
+            List[Dict[str, Any]]: ``id``, ``timestamp``, ``profile``,
+            ``outcome``, ``duration``, ``tasks_completed`` and
+            ``tasks_failed`` of each run.
+        """
+        where, params = self._filters(since, profile, outcome)
+        rows = self._query(
+            "SELECT id, timestamp, profile, outcome, duration, tasks_completed,"
+            f" tasks_failed FROM runs{where} ORDER BY timestamp DESC, id DESC LIMIT ?",
+            params + [limit],
+        )
+        return [dict(row) for row in rows]
+
+    def report(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Full report of a stored run.
+
+        Args:
+            run_id: ID returned by record() or listed by runs().
+
+        Returns:
+            Optional[Dict[str, Any]]: The report, or None if the run is unknown.
+        """
+        rows = self._query("SELECT report FROM runs WHERE id = ?", [run_id])
+        return json.loads(rows[0][0]) if rows else None
+
+    def count(self) -> int:
+        """Number of stored runs."""
+        return self._query("SELECT COUNT(*) FROM runs", [])[0][0]
+
+    def prune(self, before: float) -> int:
+        """
+        Delete runs older than a point in time.
+
+        Args:
+            before: Epoch seconds; earlier runs are deleted.
+
+        Returns:
+            int: Number of deleted runs.
+        """
+        with self._lock, self._db:
+            return self._db.execute(
+                "DELETE FROM runs WHERE timestamp < ?", (before,)
+            ).rowcount
+
+
+class RunHistoryWriter:
+    """
+    Background thread that records reports into a RunHistory.
+
+    submit() only puts the report on a bounded queue, so the optimization
+    thread never waits for the database; when the queue is full the report
+    is dropped and counted.
+    """
+
+    def __init__(self, history: RunHistory, max_pending: int = 100):
+        self.history = history
+        self.logger = logging.getLogger(__name__)
+        self._queue: "queue.Queue[Optional[Tuple[Dict[str, Any], str, float]]]" = (
+            queue.Queue(max_pending)
+        )
+        # Reports queued but not yet recorded; flush() waits for zero while
+        # the thread runs, so reports are only ever written in order
+        self._unrecorded = 0
+        self._recorded = threading.Condition()
+        # Serializes flush() calls that record the queue themselves
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        """Start the writer thread if it is not already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="run-history", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        report: Dict[str, Any],
+        profile: str,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """
+        Queue a report for recording.
+
+        Args:
+            report: Report returned by optimize_system().
+            profile: Name of the profile the run used.
+            timestamp: Epoch seconds the run started; now if None.
+
+        Returns:
+            bool: False if the queue was full and the report was dropped.
+        """
+        item = (report, profile, time.time() if timestamp is None else timestamp)
+        with self._recorded:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+                return False
+            self._unrecorded += 1
+        return True
+
+    def _write(self, report: Dict[str, Any], profile: str, timestamp: float) -> None:
+        try:
+            self.history.record(report, profile, timestamp)
+            self.written += 1
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            self.errors += 1
+            self.logger.error(f"Failed to record optimization run: {e}")
+        finally:
+            with self._recorded:
+                self._unrecorded -= 1
+                self._recorded.notify_all()
+
+    def flush(self, timeout: float = 10.0) -> int:
+        """
+        Make sure all queued reports are recorded.
+
+        While the writer thread runs, this waits for it to drain the queue;
+        otherwise the reports are recorded here.
+
+        Args:
+            timeout: Maximum seconds to wait for the writer thread.
+
+        Returns:
+            int: Number of reports recorded (or failed) during the call.
+        """
+        handled = self.written + self.errors
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            with self._recorded:
+                self._recorded.wait_for(lambda: self._unrecorded == 0, timeout)
+            return self.written + self.errors - handled
+        with self._flush_lock:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Stop marker from close(); leave it for the thread
+                    self._queue.put(None)
+                    break
+                self._write(*item)
+        return self.written + self.errors - handled
+
+    def _run(self) -> None:
+        """Writer thread body; the only writer while it runs."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._write(*item)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Stop the thread after recording the queued reports.
+
+        Args:
+            timeout: Maximum seconds to wait for the thread.
+        """
+        thread = self._thread
+        if thread is not None:
+            self._queue.put(None, timeout=timeout)
+            # Kept until it has stopped, so concurrent flush() calls wait for it
+            thread.join(timeout)
+            self._thread = None
+        else:
+            self.flush()
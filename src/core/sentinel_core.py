@@ -4,12 +4,15 @@ This module serves as the central core component of the SentinelPC application,
 managing and coordinating all optimization operations.
 """
 
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, Callable
 from queue import Queue
 from .config_manager import ConfigManager
 from .performance_optimizer import PerformanceOptimizer
 from .environment_manager import EnvironmentManager
 from .monitoring_manager import MonitoringManager
+from .metrics_events import MetricsEvent, Subscription
+from .system_snapshot import SystemSnapshotService, diff_snapshots
 from .logging_manager import LoggingManager
 
 
@@ -29,6 +32,7 @@ class SentinelCore:
         self.optimizer = PerformanceOptimizer()
         self.env_manager = EnvironmentManager()
         self.monitoring = MonitoringManager()
+        self.snapshots = SystemSnapshotService(self.monitoring)
         self.version = "1.0.0"
         self._message_queue = Queue()
 
@@ -69,7 +73,8 @@ class SentinelCore:
                 raise
 
             try:
-                if not self.monitoring.initialize():
+                store_dir = self.config.get_output_dir() / "metrics"
+                if not self.monitoring.initialize({"store_dir": str(store_dir)}):
                     raise RuntimeError("Failed to initialize monitoring manager")
             except Exception as e:
                 self.logger.error("Failed to initialize monitoring manager: %s", str(e))
@@ -96,9 +101,8 @@ class SentinelCore:
                 f" with profile: {profile}" if profile else "",
             )
 
-            # Get system state before optimization
-            initial_state = self.env_manager.get_system_state()
-            initial_metrics = self.monitoring.get_system_metrics()
+            # Get system state before optimization (reused if recent)
+            initial_state = self.snapshots.capture()
 
             # Run optimization
             try:
@@ -109,16 +113,13 @@ class SentinelCore:
                 self.logger.error("Optimization failed: %s", str(e))
                 return {"success": False, "error": str(e)}
 
-            # Get system state after optimization
-            final_state = self.env_manager.get_system_state()
-            final_metrics = self.monitoring.get_system_metrics()
+            # Get system state after optimization; only what changed is reported
+            final_state = self.snapshots.capture(not_before=time.time())
 
             return {
                 "success": True,
-                "initial_state": initial_state,
-                "initial_metrics": initial_metrics,
-                "final_state": final_state,
-                "final_metrics": final_metrics,
+                "initial_state": initial_state.to_dict(),
+                "state_changes": diff_snapshots(initial_state, final_state),
                 "optimizations": optimization_result,
             }
 
@@ -144,7 +145,7 @@ class SentinelCore:
                 self.logger.error("Failed to get system metrics: %s", str(e))
                 return {"success": False, "error": str(e)}
             try:
-                system_state = self.env_manager.get_system_state()
+                system_state = self.snapshots.capture().to_dict()
             except Exception as e:
                 self.logger.error("Failed to get system state: %s", str(e))
                 return {"success": False, "error": str(e)}
@@ -184,7 +185,7 @@ class SentinelCore:
         try:
             try:
                 metrics = self.monitoring.get_system_metrics()
-                history = self.monitoring.get_performance_history()
+                history = self.monitoring.get_performance_history(columnar=True)
             except Exception as e:
                 self.logger.error("Failed to get system metrics: %s", str(e))
                 return {"success": False, "error": str(e)}
@@ -193,6 +194,21 @@ class SentinelCore:
             self.logger.error("Failed to get system metrics: %s", str(e))
             return {"success": False, "error": str(e)}
 
+    def subscribe_metrics(
+        self, callback: Callable[[MetricsEvent], Any], min_interval: float = 0.0
+    ) -> Subscription:
+        """Receive system metrics and health transitions as they are sampled.
+
+        Args:
+            callback: Function called with each MetricsEvent on a delivery
+                      thread owned by the subscription
+            min_interval: Minimum seconds between two delivered samples
+
+        Returns:
+            Subscription: Handle whose cancel() stops delivery
+        """
+        return self.monitoring.subscribe(callback=callback, min_interval=min_interval)
+
     def update_config(self, config_updates: Dict[str, Any]) -> bool:
         """Update configuration settings.
 
@@ -224,6 +240,7 @@ class SentinelCore:
                 self.logger.info("Shutting down SentinelPC Core")
                 self.optimizer.cleanup()
                 self.env_manager.cleanup()
+                self.monitoring.cleanup()
                 self.config.save_config()
             except Exception as e:
                 self.logger.error("Error during shutdown: %s", str(e))
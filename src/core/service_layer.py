@@ -5,7 +5,9 @@ a clean separation between business logic and infrastructure concerns.
 """
 
 from typing import Dict, Any, Optional, List
+import asyncio
 from dataclasses import dataclass
+from .async_core import AsyncSentinelCore
 from .feature_flags import FeatureFlags
 from .sentinel_core import SentinelCore
 from .config_manager import ConfigManager
@@ -35,13 +37,15 @@ class SystemService:
     Service for system-related operations.
 
     This service provides methods for performing system optimization
-    and managing system state.
+    and managing system state. Core calls go through an AsyncSentinelCore,
+    so they never block the event loop.
     """
 
     def __init__(self, core: SentinelCore, feature_flags: FeatureFlags):
         self.core = core
         self.feature_flags = feature_flags
         self.optimizer = PerformanceOptimizer()
+        self.async_core = AsyncSentinelCore(core)
 
     async def optimize_system(
         self, profile: Optional[str] = None
@@ -63,8 +67,8 @@ class SystemService:
                 ai_config = self.feature_flags.get_feature_config("ai_auto_tune")
                 profile = await self._get_ai_optimized_profile(profile, ai_config)
 
-            # Run core optimization
-            result = self.core.run_optimization(profile)
+            # Run core optimization off the event loop
+            result = await self.async_core.optimize_system(profile)
 
             # Handle real-time stats if enabled
             if self.feature_flags.is_enabled("real_time_stats"):
@@ -160,8 +164,9 @@ class ServiceLayer:
             bool: True if initialization successful
         """
         try:
-            # Initialize core components
-            if not self.core.initialize():
+            # Initialize core components; this probes the system and blocks
+            loop = asyncio.get_running_loop()
+            if not await loop.run_in_executor(None, self.core.initialize):
                 return False
 
             # Initialize feature-dependent services
@@ -172,3 +177,9 @@ class ServiceLayer:
             return True
         except Exception:
             return False
+
+    async def shutdown(self) -> None:
+        """Stop the services and shut the core down without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.system_service.async_core.close)
+        await loop.run_in_executor(None, self.core.shutdown)
@@ -0,0 +1,216 @@
+"""
+Cached, flat snapshots of the system state for SentinelPC.
+
+Optimization reports compare the system before and after a run. Taking a
+full metrics sample for each side blocked for a second in ``cpu_percent``
+and copied every metric twice. SystemSnapshotService captures CPU, memory,
+swap, per-mount disk space and the process count in one probe, reuses the
+background sampler when its latest sample is fresh, caches the result for
+a short TTL and shares a capture between concurrent callers.
+diff_snapshots() reduces two snapshots to the values that changed.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import psutil
+
+from .partition_registry import get_partition_registry
+
+
+@dataclass(frozen=True)
+class SystemSnapshot:
+    """
+    Flat system state at one point in time.
+
+    ``values`` maps a metric name to a number; per-mount values are keyed
+    like ``disk_free:/home``. ``source`` is "sampler" when CPU and disk
+    values were taken from the background sampler, "probe" otherwise.
+    """
+
+    timestamp: float
+    source: str
+    values: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
+            "source": self.source,
+            **self.values,
+        }
+
+
+def diff_snapshots(
+    before: SystemSnapshot, after: SystemSnapshot
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Values that differ between two snapshots.
+
+    Args:
+        before: Earlier snapshot.
+        after: Later snapshot.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: ``before``, ``after`` and ``delta`` per
+        changed value; ``delta`` is None unless both values are numbers.
+        Values missing on one side are None there.
+    """
+    changes: Dict[str, Dict[str, Any]] = {}
+    for key in before.values.keys() | after.values.keys():
+        old = before.values.get(key)
+        new = after.values.get(key)
+        if old == new:
+            continue
+        numeric = isinstance(old, (int, float)) and isinstance(new, (int, float))
+        changes[key] = {
+            "before": old,
+            "after": new,
+            "delta": new - old if numeric else None,
+        }
+    return dict(sorted(changes.items()))
+
+
+def cpu_percent_between(previous: Any, current: Any) -> Optional[float]:
+    """
+    System-wide CPU usage between two ``psutil.cpu_times()`` readings.
+
+    Args:
+        previous: Earlier reading.
+        current: Later reading.
+
+    Returns:
+        Optional[float]: Busy percentage, or None if no CPU time elapsed.
+    """
+    total = sum(current) - sum(previous)
+    idle = (current.idle + getattr(current, "iowait", 0.0)) - (
+        previous.idle + getattr(previous, "iowait", 0.0)
+    )
+    if total <= 0:
+        return None
+    return round(max(0.0, min(100.0, (total - idle) / total * 100)), 1)
+
+
+class SystemSnapshotService:
+    """
+    Captures SystemSnapshots, reusing recent data wherever possible.
+
+    A capture reuses the cached snapshot while it is younger than
+    ``ttl_seconds``, and the monitoring sampler's latest sample while it is
+    younger than ``sample_max_age``. Otherwise CPU usage is measured since
+    the previous capture (never by sleeping) and disk usage is probed in
+    parallel through the shared PartitionRegistry. Concurrent captures wait
+    for the one in progress and share its result. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        monitoring: Optional[Any] = None,
+        ttl_seconds: float = 5.0,
+        sample_max_age: float = 2.0,
+    ):
+        """
+        Initializes the service.
+
+        Args:
+            monitoring: MonitoringManager whose latest sample may be reused.
+            ttl_seconds: How long a captured snapshot is reused.
+            sample_max_age: Maximum age in seconds of a reused sampler sample.
+        """
+        self.monitoring = monitoring
+        self.ttl_seconds = ttl_seconds
+        self.sample_max_age = sample_max_age
+        self.partitions = get_partition_registry()
+        self._cached: Optional[SystemSnapshot] = None
+        self._cpu_times = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot."""
+        with self._lock:
+            self._cached = None
+
+    def capture(self, not_before: Optional[float] = None) -> SystemSnapshot:
+        """
+        Return a snapshot of the current system state.
+
+        Args:
+            not_before: Epoch seconds; cached snapshots and sampler samples
+                        taken earlier are not reused, e.g. the end of an
+                        optimization run for the snapshot after it.
+
+        Returns:
+            SystemSnapshot: A fresh or reused snapshot.
+        """
+        with self._lock:
+            now = time.time()
+            oldest = now - self.ttl_seconds
+            if not_before is not None:
+                oldest = max(oldest, not_before)
+            cached = self._cached
+            if cached is not None and cached.timestamp >= oldest:
+                return cached
+            snapshot = self._probe(now, not_before)
+            self._cached = snapshot
+            return snapshot
+
+    def _fresh_sample(self, now: float, not_before: Optional[float]) -> Optional[Any]:
+        """Latest sampler sample if it is recent enough. Called under the lock."""
+        if self.monitoring is None or not self.monitoring.is_sampling:
+            return None
+        metrics = self.monitoring.get_current_metrics()
+        if metrics is None:
+            return None
+        taken = metrics.timestamp.timestamp()
+        if now - taken > self.sample_max_age:
+            return None
+        if not_before is not None and taken < not_before:
+            return None
+        return metrics
+
+    def _cpu_since_last_capture(self) -> Optional[float]:
+        """CPU usage since the previous probe. Called under the lock."""
+        current = psutil.cpu_times()
+        previous, self._cpu_times = self._cpu_times, current
+        if previous is None:
+            return None
+        return cpu_percent_between(previous, current)
+
+    def _probe(self, now: float, not_before: Optional[float]) -> SystemSnapshot:
+        """Read the system state. Called under the lock."""
+        memory = psutil.virtual_memory()
+        values: Dict[str, Any] = {
+            "memory_percent": memory.percent,
+            "memory_available": memory.available,
+            "swap_percent": psutil.swap_memory().percent,
+            "process_count": len(psutil.pids()),
+        }
+        if hasattr(os, "getloadavg"):
+            values["load_1m"] = round(os.getloadavg()[0], 2)
+
+        # Always advance the CPU baseline, so the next probe covers the
+        # time since this snapshot
+        cpu_percent = self._cpu_since_last_capture()
+        metrics = self._fresh_sample(now, not_before)
+        if metrics is not None:
+            source = "sampler"
+            values["cpu_percent"] = metrics.cpu_percent
+            disk = {
+                mount: (usage["free"], usage["percent"])
+                for mount, usage in metrics.disk_usage.items()
+            }
+        else:
+            source = "probe"
+            values["cpu_percent"] = cpu_percent
+            disk = {}
+            for mount, usage in self.partitions.probe_usage().items():
+                if isinstance(usage, BaseException):
+                    continue  # Hung or unreadable mounts are left out
+                disk[mount] = (usage.free, usage.percent)
+        for mount, (free, percent) in disk.items():
+            values[f"disk_free:{mount}"] = free
+            values[f"disk_percent:{mount}"] = percent
+        return SystemSnapshot(now, source, values)
@@ -0,0 +1,293 @@
+"""
+Learned duration estimates for SentinelPC optimization tasks.
+
+The timeouts in the task defaults are guesses. TaskDurationModel records
+how long each task actually takes on this machine and derives a timeout
+(a high percentile times a safety factor) and an expected duration, which
+the scheduler uses to start the longest chains of work first. Samples are
+weighted by age with an exponential half-life, so stale measurements fade
+and a task without enough recent samples falls back to its configured
+timeout. The model is saved as JSON and survives restarts.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Results whose duration is recorded: completed runs and timeouts, whose
+# duration is a lower bound that lets a too-short timeout grow again
+LEARNED_OUTCOMES = ("success", "timeout")
+
+
+class TaskDurationModel:
+    """
+    Age-weighted duration samples per task.
+
+    A sample's weight halves every ``half_life_seconds``; samples whose
+    weight drops below ``MIN_WEIGHT`` are discarded, and each task keeps at
+    most ``max_samples`` of its newest samples. Estimates are only made for
+    tasks with ``min_samples`` samples younger than one half-life.
+    Thread-safe.
+    """
+
+    VERSION = 1
+    MIN_WEIGHT = 0.01
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        half_life_seconds: float = 14 * 86400,
+        safety_factor: float = 3.0,
+        timeout_percentile: float = 99.0,
+        min_samples: int = 5,
+        min_timeout: float = 30.0,
+        max_timeout: float = 6 * 3600.0,
+        max_samples: int = 200,
+        min_timeout_ratio: float = 0.5,
+    ):
+        """
+        Initializes an empty model.
+
+        Args:
+            path: File the model is saved to; None keeps it in memory.
+            half_life_seconds: Age at which a sample counts half.
+            safety_factor: Multiplier applied to the timeout percentile.
+            timeout_percentile: Duration percentile the timeout is based on.
+            min_samples: Samples younger than one half-life needed before
+                         estimates are made.
+            min_timeout: Lower bound of learned timeouts in seconds.
+            max_timeout: Upper bound of learned timeouts in seconds.
+            max_samples: Samples kept per task.
+            min_timeout_ratio: Share of a task's configured timeout that a
+                               learned timeout may not go below; 1 lets
+                               learning only raise timeouts.
+
+        Raises:
+            ValueError: If a setting is out of range.
+        """
+        if half_life_seconds <= 0:
+            raise ValueError("half_life_seconds must be positive")
+        if safety_factor < 1:
+            raise ValueError("safety_factor must be at least 1")
+        if not 0 < timeout_percentile <= 100:
+            raise ValueError("timeout_percentile must be in (0, 100]")
+        if not 0 < min_timeout <= max_timeout:
+            raise ValueError("min_timeout must be positive and at most max_timeout")
+        if max_samples <= 0:
+            raise ValueError("max_samples must be positive")
+        if not 0 <= min_timeout_ratio <= 1:
+            raise ValueError("min_timeout_ratio must be in [0, 1]")
+        self.path = Path(path) if path else None
+        self.half_life_seconds = half_life_seconds
+        self.safety_factor = safety_factor
+        self.timeout_percentile = timeout_percentile
+        self.min_samples = min_samples
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.max_samples = max_samples
+        self.min_timeout_ratio = min_timeout_ratio
+        self._samples: Dict[str, List[Tuple[float, float]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Union[str, Path], **settings: Any) -> "TaskDurationModel":
+        """
+        Load a model from disk; a missing or unreadable file yields an empty model.
+
+        Args:
+            path: Model file location.
+            **settings: Constructor settings (half-life, safety factor, ...).
+
+        Returns:
+            TaskDurationModel: The loaded model.
+        """
+        model = cls(path, **settings)
+        try:
+            with open(path, "r", encoding="utf-8") as model_file:
+                data = json.load(model_file)
+            if data.get("version") == cls.VERSION:
+                model._samples = {
+                    task: [(float(ts), float(duration)) for ts, duration in samples]
+                    for task, samples in data.get("tasks", {}).items()
+                }
+        except (OSError, ValueError, AttributeError, TypeError):
+            pass
+        return model
+
+    def save(self) -> None:
+        """Write the model to disk atomically; a no-op without a path."""
+        if self.path is None:
+            return
+        with self._lock:
+            tasks = {task: list(samples) for task, samples in self._samples.items()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".part")
+        with open(tmp_path, "w", encoding="utf-8") as model_file:
+            json.dump(
+                {"version": self.VERSION, "tasks": tasks},
+                model_file,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, self.path)
+
+    def _weight(self, timestamp: float, now: float) -> float:
+        return 0.5 ** (max(0.0, now - timestamp) / self.half_life_seconds)
+
+    def observe(
+        self, task: str, duration: float, timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Record one duration of a task.
+
+        Args:
+            task: Task name.
+            duration: Duration in seconds.
+            timestamp: Epoch seconds the sample was taken; now if None.
+        """
+        if duration is None or duration < 0 or math.isnan(duration):
+            return
+        now = time.time() if timestamp is None else timestamp
+        with self._lock:
+            samples = self._samples.setdefault(task, [])
+            samples.append((now, float(duration)))
+            samples.sort()
+            del samples[: -self.max_samples]
+            # Drop samples that no longer carry weight
+            self._samples[task] = [
+                sample
+                for sample in samples
+                if self._weight(sample[0], now) >= self.MIN_WEIGHT
+            ]
+
+    def observe_results(
+        self, results: List[Dict[str, Any]], timestamp: Optional[float] = None
+    ) -> int:
+        """
+        Record the durations of finished tasks.
+
+        Args:
+            results: Task results of an optimization run.
+            timestamp: Epoch seconds of the run; now if None.
+
+        Returns:
+            int: Number of recorded samples.
+        """
+        recorded = 0
+        for result in results:
+            outcome = "success" if result.get("success") else result.get("error")
+            duration = result.get("duration_seconds")
+            if outcome in LEARNED_OUTCOMES and isinstance(duration, (int, float)):
+                self.observe(result.get("name", "unknown_task"), duration, timestamp)
+                recorded += 1
+        return recorded
+
+    def quantile(
+        self, task: str, percentile: float, now: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Age-weighted duration percentile of a task.
+
+        Args:
+            task: Task name.
+            percentile: Percentile between 0 and 100.
+            now: Epoch seconds the weights are computed for; now if None.
+
+        Returns:
+            Optional[float]: Duration in seconds, or None while the task has
+            fewer than ``min_samples`` recent samples.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            samples = list(self._samples.get(task, ()))
+        recent = sum(1 for ts, _ in samples if now - ts <= self.half_life_seconds)
+        if not samples or recent < self.min_samples:
+            return None
+        weighted = sorted((duration, self._weight(ts, now)) for ts, duration in samples)
+        total = sum(weight for _, weight in weighted)
+        target = percentile / 100 * total
+        cumulative = 0.0
+        for duration, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return duration
+        return weighted[-1][0]
+
+    def estimate(self, task: str, now: Optional[float] = None) -> Optional[float]:
+        """Expected (median) duration of a task, or None without enough samples."""
+        return self.quantile(task, 50, now)
+
+    def timeout(self, task: str, now: Optional[float] = None) -> Optional[float]:
+        """Learned timeout of a task, or None without enough samples."""
+        high = self.quantile(task, self.timeout_percentile, now)
+        if high is None:
+            return None
+        return round(
+            min(self.max_timeout, max(self.min_timeout, high * self.safety_factor)), 1
+        )
+
+    def apply(
+        self, tasks: List[Dict[str, Any]], now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return copies of task configurations with learned estimates applied.
+
+        Tasks with enough samples get ``estimated_seconds``, a learned
+        ``timeout`` and ``configured_timeout`` holding the one they replace;
+        the others are returned unchanged. A learned timeout is never set
+        below ``min_timeout_ratio`` of the configured one, so a run of fast
+        samples cannot cut it short for the next large job.
+
+        Args:
+            tasks: Task configurations as passed to the scheduler.
+            now: Epoch seconds the weights are computed for; now if None.
+
+        Returns:
+            List[Dict[str, Any]]: The adjusted task configurations.
+        """
+        now = time.time() if now is None else now
+        adjusted = []
+        for task in tasks:
+            timeout = self.timeout(task["name"], now)
+            if timeout is not None:
+                configured = task.get("timeout")
+                if configured:
+                    timeout = max(
+                        timeout, round(configured * self.min_timeout_ratio, 1)
+                    )
+                task = {
+                    **task,
+                    # The scheduler treats an estimate of 0 as missing
+                    "estimated_seconds": max(self.estimate(task["name"], now), 0.01),
+                    "configured_timeout": task.get("timeout"),
+                    "timeout": timeout,
+                }
+            adjusted.append(task)
+        return adjusted
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Current estimates of every known task.
+
+        Args:
+            now: Epoch seconds the weights are computed for; now if None.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: ``samples``, ``weight``,
+            ``estimated_seconds`` and ``timeout`` per task name.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            tasks = {task: list(samples) for task, samples in self._samples.items()}
+        return {
+            task: {
+                "samples": len(samples),
+                "weight": round(sum(self._weight(ts, now) for ts, _ in samples), 2),
+                "estimated_seconds": self.estimate(task, now),
+                "timeout": self.timeout(task, now),
+            }
+            for task, samples in sorted(tasks.items())
+        }
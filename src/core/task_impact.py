@@ -0,0 +1,138 @@
+"""
+Before/after impact measurement for SentinelPC optimization tasks.
+
+A task reporting success says nothing about whether it helped. The
+TaskImpactMeter snapshots free memory, free disk space per mount, the
+process count and the load average when a task starts, waits a short
+settling window after it ends so freed resources show up, snapshots again
+and keeps the values that changed, together with the CPU usage while the
+task ran. Tasks run in parallel, so each measurement also names the tasks
+that overlapped it; their effects are included in its deltas.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+import psutil
+
+from .system_snapshot import (
+    SystemSnapshot,
+    SystemSnapshotService,
+    cpu_percent_between,
+    diff_snapshots,
+)
+
+# Snapshot values compared around a task; per-mount values share a prefix
+IMPACT_VALUES = ("memory_available", "process_count", "load_1m")
+IMPACT_PREFIXES = ("disk_free:",)
+
+
+def _is_impact_value(key: str) -> bool:
+    return key in IMPACT_VALUES or key.startswith(IMPACT_PREFIXES)
+
+
+@dataclass
+class ImpactProbe:
+    """A measurement in progress, returned by TaskImpactMeter.start()."""
+
+    task_name: str
+    before: SystemSnapshot
+    cpu_times: Any
+    overlapping: Set[str] = field(default_factory=set)
+
+
+class TaskImpactMeter:
+    """
+    Measures how the system state changes around each task.
+
+    Snapshots are taken through a SystemSnapshotService, so tasks starting
+    or ending together share one probe. The settling window ends early when
+    the task's cancellation token is cancelled. Thread-safe.
+    """
+
+    DEFAULT_SETTLE_SECONDS = 0.5
+
+    def __init__(
+        self,
+        snapshots: Optional[SystemSnapshotService] = None,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+    ):
+        """
+        Initializes the meter.
+
+        Args:
+            snapshots: Service used for the snapshots; a new one if None.
+            settle_seconds: Seconds to wait after a task before measuring.
+
+        Raises:
+            ValueError: If settle_seconds is negative.
+        """
+        if settle_seconds < 0:
+            raise ValueError("settle_seconds must not be negative")
+        self.snapshots = snapshots or SystemSnapshotService()
+        self.settle_seconds = settle_seconds
+        self._active: List[ImpactProbe] = []
+        self._lock = threading.Lock()
+
+    def start(self, task_name: str) -> ImpactProbe:
+        """
+        Take the "before" measurement of a task that is about to run.
+
+        Args:
+            task_name: Name of the task.
+
+        Returns:
+            ImpactProbe: Handle to pass to finish().
+        """
+        before = self.snapshots.capture(not_before=time.time())
+        probe = ImpactProbe(task_name, before, psutil.cpu_times())
+        with self._lock:
+            for other in self._active:
+                other.overlapping.add(task_name)
+                probe.overlapping.add(other.task_name)
+            self._active.append(probe)
+        return probe
+
+    def finish(
+        self, probe: ImpactProbe, cancel_token: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Wait for the settling window and take the "after" measurement.
+
+        Args:
+            probe: Handle returned by start().
+            cancel_token: Optional CancellationToken that ends the settling
+                          window early.
+
+        Returns:
+            Dict[str, Any]: ``changes`` (before, after and delta of each
+            measured value that changed), ``cpu_percent`` while the task
+            ran, ``settle_seconds`` actually waited and the sorted
+            ``overlapping_tasks``.
+        """
+        cpu_percent = cpu_percent_between(probe.cpu_times, psutil.cpu_times())
+        settle_started = time.monotonic()
+        try:
+            if self.settle_seconds > 0:
+                if cancel_token is not None:
+                    cancel_token.wait(self.settle_seconds)
+                else:
+                    time.sleep(self.settle_seconds)
+        finally:
+            with self._lock:
+                self._active.remove(probe)
+        settled = time.monotonic() - settle_started
+        after = self.snapshots.capture(not_before=time.time())
+        changes = {
+            key: change
+            for key, change in diff_snapshots(probe.before, after).items()
+            if _is_impact_value(key)
+        }
+        return {
+            "changes": changes,
+            "cpu_percent": cpu_percent,
+            "settle_seconds": round(settled, 2),
+            "overlapping_tasks": sorted(probe.overlapping),
+        }
@@ -0,0 +1,259 @@
+"""
+Compiled task plans for SentinelPC optimization profiles.
+
+A profile lives in an ``OptimizationProfile:<name>`` config section with
+one line per task, ``enabled;priority;timeout;key=value;...``. Parsing it
+means splitting strings, guessing parameter types and merging the task
+defaults. compile_task_plan() does that once and returns an immutable
+TaskPlan: the resolved tasks in priority order plus every problem found,
+each naming the section, the task and the offending field. Problems that
+were always tolerated (a malformed line falls back to the task defaults)
+are warnings; problems that would stop the scheduler are errors.
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .task_scheduler import SchedulingError, TaskGraph
+
+PROFILE_SECTION_PREFIX = "OptimizationProfile:"
+# Option keys that configure the scheduling of a task rather than its params
+LIST_OPTIONS = ("depends_on", "resources")
+
+
+class TaskPlanError(ValueError):
+    """Raised when a task plan has errors that prevent running it."""
+
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.details = details or {}
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of a configuration value: dicts become mappings, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Mutable copy of a frozen value, in the shape task functions expect."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def parse_param(value: str) -> Any:
+    """
+    Convert a profile parameter to bool, int or float where it looks like one.
+
+    Args:
+        value: Raw value from the profile line.
+
+    Returns:
+        Any: The converted value, or the string itself.
+    """
+    if value.lower() == "true":
+        return True
+    if value.lower() == "false":
+        return False
+    if value.isdigit():
+        return int(value)
+    if value.replace(".", "", 1).isdigit():
+        return float(value)
+    return value
+
+
+@dataclass(frozen=True)
+class PlannedTask:
+    """
+    One resolved task of a plan.
+
+    Attributes:
+        name (str): Task name.
+        config (Mapping[str, Any]): Read-only task configuration.
+    """
+
+    name: str
+    config: Mapping[str, Any]
+
+    def to_config(self) -> Dict[str, Any]:
+        """Return a fresh, mutable task configuration for the scheduler."""
+        return _thaw(self.config)
+
+
+@dataclass(frozen=True)
+class TaskPlan:
+    """
+    Immutable result of compiling a profile.
+
+    Attributes:
+        profile (str): Profile name.
+        source (str): "profile" if the profile section exists, else "defaults".
+        tasks (Tuple[PlannedTask, ...]): Tasks to run, by priority.
+        warnings (Tuple[str, ...]): Tolerated problems.
+        errors (Tuple[str, ...]): Problems that prevent running the plan.
+        config_hash (str): Configuration hash the plan was compiled from.
+    """
+
+    profile: str
+    source: str
+    tasks: Tuple[PlannedTask, ...]
+    warnings: Tuple[str, ...] = ()
+    errors: Tuple[str, ...] = ()
+    config_hash: str = ""
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    def task_configs(self) -> List[Dict[str, Any]]:
+        """Return fresh task configurations for a run."""
+        return [task.to_config() for task in self.tasks]
+
+    def raise_for_errors(self) -> None:
+        """
+        Raise if the plan cannot be run.
+
+        Raises:
+            TaskPlanError: Listing every error of the plan.
+        """
+        if self.errors:
+            raise TaskPlanError(
+                f"Profile '{self.profile}' is invalid: {'; '.join(self.errors)}",
+                {"profile": self.profile, "errors": list(self.errors)},
+            )
+
+
+def _parse_setting(
+    where: str, setting: str, task_config: Dict[str, Any], warnings: List[str]
+) -> None:
+    """
+    Apply one ``enabled;priority;timeout;key=value;...`` line to a task config.
+
+    Raises:
+        ValueError: With a message naming the offending field.
+    """
+    parts = [part.strip() for part in setting.split(";")]
+    enabled = parts[0].lower()
+    if enabled not in ("true", "false"):
+        warnings.append(
+            f"{where}: field 1 (enabled) should be true or false, "
+            f"got {parts[0]!r}; treated as false"
+        )
+    task_config["enabled"] = enabled == "true"
+    for position, field_name in ((1, "priority"), (2, "timeout")):
+        if len(parts) > position:
+            try:
+                task_config[field_name] = int(parts[position])
+            except ValueError:
+                raise ValueError(
+                    f"field {position + 1} ({field_name}) must be an integer, "
+                    f"got {parts[position]!r}"
+                ) from None
+    params: Dict[str, Any] = {}
+    for position, option in enumerate(parts[3:], start=4):
+        key, separator, value = option.partition("=")
+        key, value = key.strip(), value.strip()
+        if not separator or not key:
+            warnings.append(
+                f"{where}: field {position} ({option!r}) is not key=value; ignored"
+            )
+            continue
+        if key in LIST_OPTIONS:
+            task_config[key] = [
+                item.strip() for item in value.split(",") if item.strip()
+            ]
+        elif key == "executor":
+            task_config["executor"] = value.lower()
+        else:
+            params[key] = parse_param(value)
+    if params:
+        task_config["params"] = params
+
+
+def compile_task_plan(
+    profile: str,
+    section: Optional[Mapping[str, str]],
+    defaults: Mapping[str, Mapping[str, Any]],
+    functions: Iterable[str],
+    system: str,
+    config_hash: str = "",
+) -> TaskPlan:
+    """
+    Resolve a profile into an immutable TaskPlan.
+
+    Args:
+        profile: Profile name.
+        section: Options of the profile's config section (keys lowercased by
+                 configparser), or None if the section does not exist, in
+                 which case the task defaults are used.
+        defaults: Default configuration of every known task.
+        functions: Names of the implemented task functions.
+        system: ``platform.system()`` value tasks with an ``os`` must match.
+        config_hash: Hash of the configuration the section was read from.
+
+    Returns:
+        TaskPlan: The compiled plan; check ``errors`` before running it.
+    """
+    section_name = f"{PROFILE_SECTION_PREFIX}{profile}"
+    functions = set(functions)
+    warnings: List[str] = []
+    errors: List[str] = []
+    settings = dict(section) if section is not None else {}
+
+    if section is None:
+        warnings.append(
+            f"Profile section [{section_name}] not found; using the default tasks"
+        )
+    known = {name.lower() for name in defaults}
+    for key in settings:
+        if key not in known:
+            warnings.append(f"[{section_name}] {key}: unknown task; ignored")
+
+    configs: List[Dict[str, Any]] = []
+    for task_name, default_config in defaults.items():
+        task_config = _thaw(default_config)
+        setting = settings.get(task_name.lower())
+        if setting is not None:
+            where = f"[{section_name}] {task_name} = {setting!r}"
+            try:
+                _parse_setting(where, setting, task_config, warnings)
+            except ValueError as e:
+                warnings.append(f"{where}: {e}; using the task defaults")
+                task_config = _thaw(default_config)
+        if not task_config.get("enabled", False):
+            continue
+        if "os" in task_config and task_config["os"] != system:
+            continue
+        task_config["name"] = task_name
+        if task_config.get("function") not in functions:
+            warnings.append(
+                f"Task '{task_name}': function '{task_config.get('function')}' "
+                f"is not implemented; skipped"
+            )
+            continue
+        if not isinstance(task_config.get("priority"), int):
+            warnings.append(f"Task '{task_name}': no integer priority; skipped")
+            continue
+        configs.append(task_config)
+
+    configs.sort(key=lambda config: config["priority"])
+    try:
+        TaskGraph(configs, known_tasks=defaults)
+    except SchedulingError as e:
+        errors.append(f"[{section_name}] {e}" if section is not None else str(e))
+
+    return TaskPlan(
+        profile=profile,
+        source="profile" if section is not None else "defaults",
+        tasks=tuple(PlannedTask(config["name"], _freeze(config)) for config in configs),
+        warnings=tuple(warnings),
+        errors=tuple(errors),
+        config_hash=config_hash,
+    )
@@ -0,0 +1,314 @@
+"""
+Runtime support for cancellable SentinelPC optimization tasks.
+
+Provides the cooperative CancellationToken handed to task functions, a
+subprocess runner whose child process tree is killed as soon as the token
+is cancelled, a helper that runs a task entry point in a separate process
+so that even a task that never checks its token can be stopped, and the
+executor backends tasks can choose from.
+"""
+
+import concurrent.futures
+import multiprocessing
+import pickle
+import subprocess
+import threading
+import time
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import psutil
+
+# Executor backends a task can select with its "executor" setting
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+EXECUTOR_INLINE = "inline"
+EXECUTOR_BACKENDS = (EXECUTOR_THREAD, EXECUTOR_PROCESS, EXECUTOR_INLINE)
+
+
+class TaskCancelledError(Exception):
+    """Raised inside a task when its cancellation token has been cancelled."""
+
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(f"Task cancelled: {reason}")
+        self.reason = reason
+
+
+class IsolatedTaskError(Exception):
+    """
+    Raised when a task running in a separate process fails or dies.
+
+    Attributes:
+        error_type (Optional[str]): Class name of the exception the task
+            raised in the child, or None if the child died without one.
+        error_message (str): Message of that exception, or why the child
+            produced no result.
+    """
+
+    def __init__(self, message: str, error_type: Optional[str] = None):
+        super().__init__(f"{error_type}: {message}" if error_type else message)
+        self.error_type = error_type
+        self.error_message = message
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation signal shared between the scheduler and a task.
+
+    Tasks poll ``cancelled`` (or call ``raise_if_cancelled()``) at convenient
+    points, or register a callback that interrupts blocking work, such as
+    killing a subprocess.
+    """
+
+    def __init__(self, deadline: Optional[float] = None):
+        """
+        Initializes the token.
+
+        Args:
+            deadline: Optional ``time.monotonic()`` value after which the task
+                      is overdue. The token does not cancel itself; the
+                      scheduler does that when the deadline passes.
+        """
+        self.deadline = deadline
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() has been called."""
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, or None without a deadline."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """
+        Cancel the task and run the registered callbacks once.
+
+        Args:
+            reason: Why the task is being cancelled (e.g. "timeout").
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass  # A failing callback must not stop the others
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Register a callback to run on cancellation; runs now if already cancelled.
+
+        Args:
+            callback: Function without arguments.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the token is cancelled or the timeout expires.
+
+        Args:
+            timeout: Maximum seconds to wait.
+
+        Returns:
+            bool: True if the token was cancelled.
+        """
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raise TaskCancelledError if the token has been cancelled.
+
+        Raises:
+            TaskCancelledError: If cancel() was called.
+        """
+        if self._event.is_set():
+            raise TaskCancelledError(self.reason or "cancelled")
+
+
+def kill_process_tree(pid: int) -> None:
+    """
+    Kill a process and all of its descendants.
+
+    Args:
+        pid: Process ID of the root of the tree.
+    """
+    try:
+        root = psutil.Process(pid)
+        processes = root.children(recursive=True) + [root]
+    except psutil.NoSuchProcess:
+        return
+    for process in processes:
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+    psutil.wait_procs(processes, timeout=5)
+
+
+def run_cancellable_process(
+    args: Sequence[str],
+    token: Optional[CancellationToken] = None,
+    timeout: Optional[float] = None,
+    check: bool = False,
+    **popen_kwargs: Any,
+) -> subprocess.CompletedProcess:
+    """
+    Run a command like ``subprocess.run(capture_output=True, text=True)``,
+    killing its whole process tree if the token is cancelled.
+
+    Args:
+        args: Command and arguments.
+        token: Optional cancellation token.
+        timeout: Optional timeout in seconds.
+        check: Raise CalledProcessError on a non-zero exit code.
+        **popen_kwargs: Extra arguments for ``subprocess.Popen``.
+
+    Returns:
+        subprocess.CompletedProcess: The finished process with captured output.
+
+    Raises:
+        TaskCancelledError: If the token was cancelled while the command ran.
+        subprocess.TimeoutExpired: If the command outlived the timeout.
+        subprocess.CalledProcessError: If ``check`` is set and the command failed.
+    """
+    if token is not None:
+        token.raise_if_cancelled()
+    process = subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        **popen_kwargs,
+    )
+    if token is not None:
+        token.add_callback(lambda: kill_process_tree(process.pid))
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_process_tree(process.pid)
+        process.communicate()
+        raise
+    if token is not None and token.cancelled:
+        raise TaskCancelledError(token.reason or "cancelled")
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(
+            process.returncode, args, output=stdout, stderr=stderr
+        )
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+
+def _isolated_main(connection: Any, target: Callable[..., Any], args: Tuple) -> None:
+    """Child process body: run the target and send back its outcome."""
+    try:
+        outcome: Tuple[str, Any] = ("ok", target(*args))
+    except BaseException as e:
+        # The type travels by name; exception classes need not be picklable
+        outcome = ("error", (type(e).__name__, str(e)))
+    try:
+        # One pickle with the highest protocol; large results travel as one buffer
+        connection.send_bytes(pickle.dumps(outcome, protocol=pickle.HIGHEST_PROTOCOL))
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        connection.send_bytes(
+            pickle.dumps(("error", (None, f"Task result could not be pickled: {e}")))
+        )
+    finally:
+        connection.close()
+
+
+def run_in_subprocess(
+    target: Callable[..., Any],
+    args: Tuple = (),
+    token: Optional[CancellationToken] = None,
+    poll_interval: float = 0.2,
+) -> Any:
+    """
+    Run a picklable, module-level callable in a separate process.
+
+    The child is started with the ``spawn`` method so it does not inherit
+    the parent's threads and locks. Cancelling the token kills the child
+    and every process it started.
+
+    Args:
+        target: Module-level function to call in the child.
+        args: Picklable positional arguments.
+        token: Optional cancellation token.
+        poll_interval: Seconds between checks of the child and the token.
+
+    Returns:
+        Any: The (picklable) return value of ``target``.
+
+    Raises:
+        TaskCancelledError: If the token was cancelled.
+        IsolatedTaskError: If the target raised or the child died; its
+                           ``error_type`` names the class of the exception
+                           raised by the target.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_isolated_main, args=(sender, target, args), daemon=True
+    )
+    process.start()
+    sender.close()
+    if token is not None:
+        token.add_callback(lambda: kill_process_tree(process.pid))
+    try:
+        while not receiver.poll(poll_interval):
+            if token is not None and token.cancelled:
+                raise TaskCancelledError(token.reason or "cancelled")
+            if not process.is_alive() and not receiver.poll(0):
+                raise IsolatedTaskError(
+                    f"Isolated task exited with code {process.exitcode}."
+                )
+        try:
+            status, payload = pickle.loads(receiver.recv_bytes())
+        except EOFError:
+            # The child went away without a result, usually because it was killed
+            if token is not None and token.cancelled:
+                raise TaskCancelledError(token.reason or "cancelled")
+            raise IsolatedTaskError(
+                f"Isolated task exited with code {process.exitcode}."
+            )
+    finally:
+        receiver.close()
+        process.join(timeout=5)
+        if process.is_alive():
+            kill_process_tree(process.pid)
+    if status == "error":
+        error_type, message = payload
+        raise IsolatedTaskError(message, error_type)
+    return payload
+
+
+class InlineExecutor(concurrent.futures.Executor):
+    """
+    Executor that runs each submitted call immediately in the calling thread.
+
+    Used for the ``inline`` backend: cheap tasks avoid the thread hand-off,
+    and debugging sees the task on the scheduler's stack. Inline tasks
+    cannot be preempted, so their timeouts only apply after they return.
+    """
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any):
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
@@ -0,0 +1,507 @@
+"""
+Dependency-aware scheduling of SentinelPC optimization tasks.
+
+Task configurations may declare ``depends_on`` (tasks that must finish
+first) and ``resources`` (resource classes such as ``disk-io``, ``cpu`` or
+``registry`` that the task uses exclusively). The scheduler runs tasks as
+soon as their dependencies have finished and none of their resources is
+held by a running task. Among the startable tasks, the one heading the
+longest remaining chain of estimated work goes first, which keeps the
+overall runtime close to the critical path.
+"""
+
+import concurrent.futures
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .task_runtime import CancellationToken, EXECUTOR_BACKENDS, EXECUTOR_THREAD
+
+# Resource classes used by the built-in tasks
+RESOURCE_DISK_IO = "disk-io"
+RESOURCE_CPU = "cpu"
+RESOURCE_REGISTRY = "registry"
+
+# Estimate used for tasks that declare neither an estimate nor a timeout
+DEFAULT_TASK_ESTIMATE_SECONDS = 60.0
+
+
+class SchedulingError(ValueError):
+    """Raised when task definitions cannot be turned into a valid schedule."""
+
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.details = details or {}
+
+
+@dataclass
+class TaskNode:
+    """
+    A task in the scheduling graph.
+
+    Attributes:
+        name (str): Task name.
+        config (Dict[str, Any]): The task configuration it was built from.
+        depends_on (Tuple[str, ...]): Tasks in the same run that must finish first.
+        resources (FrozenSet[str]): Resource classes the task holds while it runs.
+        priority (int): Configured priority; lower runs first among equals.
+        estimate (float): Expected duration in seconds.
+        executor (str): Executor backend the task runs on (thread, process or inline).
+        dependents (List[str]): Tasks waiting for this one.
+        rank (float): Estimated duration of the longest chain starting here.
+    """
+
+    name: str
+    config: Dict[str, Any]
+    depends_on: Tuple[str, ...] = ()
+    resources: FrozenSet[str] = frozenset()
+    priority: int = 0
+    estimate: float = DEFAULT_TASK_ESTIMATE_SECONDS
+    executor: str = EXECUTOR_THREAD
+    dependents: List[str] = field(default_factory=list)
+    rank: float = 0.0
+
+
+def _as_name_list(value: Any) -> List[str]:
+    """Normalize a ``depends_on``/``resources`` value to a list of names."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace("|", ",").split(",")
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+class TaskGraph:
+    """
+    Validated dependency graph of the tasks selected for one run.
+
+    Dependencies on known tasks that are not part of the run (disabled or
+    not supported on this OS) are dropped and reported in
+    ``dropped_dependencies``.
+    """
+
+    def __init__(
+        self,
+        tasks: Iterable[Dict[str, Any]],
+        known_tasks: Optional[Iterable[str]] = None,
+    ):
+        """
+        Build and validate the graph.
+
+        Args:
+            tasks: Task configurations with at least ``name``; optionally
+                   ``depends_on``, ``resources``, ``priority``,
+                   ``estimated_seconds``, ``timeout`` and ``executor``.
+            known_tasks: Every task name that may be referenced. Defaults to
+                         the names in ``tasks``.
+
+        Raises:
+            SchedulingError: On duplicate names, unknown executors, unknown
+                             dependencies or cycles.
+        """
+        self.nodes: Dict[str, TaskNode] = {}
+        self.dropped_dependencies: Dict[str, List[str]] = {}
+        for task in tasks:
+            name = task["name"]
+            if name in self.nodes:
+                raise SchedulingError(
+                    f"Task '{name}' is defined more than once.", {"task": name}
+                )
+            estimate = task.get("estimated_seconds") or task.get("timeout")
+            executor = task.get("executor") or EXECUTOR_THREAD
+            if executor not in EXECUTOR_BACKENDS:
+                raise SchedulingError(
+                    f"Task '{name}' uses unknown executor '{executor}'. "
+                    f"Expected one of: {', '.join(EXECUTOR_BACKENDS)}.",
+                    {"task": name, "executor": executor},
+                )
+            self.nodes[name] = TaskNode(
+                name=name,
+                config=task,
+                resources=frozenset(_as_name_list(task.get("resources"))),
+                priority=int(task.get("priority", 0)),
+                estimate=float(estimate or DEFAULT_TASK_ESTIMATE_SECONDS),
+                executor=executor,
+            )
+
+        known = set(known_tasks) if known_tasks is not None else set(self.nodes)
+        known.update(self.nodes)
+        for node in self.nodes.values():
+            depends_on = []
+            for dependency in _as_name_list(node.config.get("depends_on")):
+                if dependency == node.name:
+                    raise SchedulingError(
+                        f"Task '{node.name}' depends on itself.", {"task": node.name}
+                    )
+                if dependency not in known:
+                    raise SchedulingError(
+                        f"Task '{node.name}' depends on unknown task '{dependency}'.",
+                        {"task": node.name, "dependency": dependency},
+                    )
+                if dependency not in self.nodes:
+                    self.dropped_dependencies.setdefault(node.name, []).append(
+                        dependency
+                    )
+                    continue
+                depends_on.append(dependency)
+                self.nodes[dependency].dependents.append(node.name)
+            node.depends_on = tuple(depends_on)
+
+        self.topological_order = self._topological_sort()
+        for name in reversed(self.topological_order):
+            node = self.nodes[name]
+            node.rank = node.estimate + max(
+                (self.nodes[d].rank for d in node.dependents), default=0.0
+            )
+
+    def _topological_sort(self) -> List[str]:
+        """Order the tasks so every task follows its dependencies."""
+        remaining = {name: len(node.depends_on) for name, node in self.nodes.items()}
+        ready = [name for name, count in remaining.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dependent in self.nodes[name].dependents:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(self.nodes):
+            cycle = sorted(name for name, count in remaining.items() if count > 0)
+            raise SchedulingError(
+                f"Task dependencies form a cycle: {', '.join(cycle)}.",
+                {"tasks": cycle},
+            )
+        return order
+
+    def estimated_critical_path(self) -> Tuple[List[str], float]:
+        """
+        Return the longest dependency chain by estimated duration.
+
+        Returns:
+            Tuple[List[str], float]: Task names along the chain and its estimated length.
+        """
+        if not self.nodes:
+            return [], 0.0
+        current = max(self.nodes.values(), key=lambda n: (n.rank, -n.priority))
+        length = current.rank
+        path = [current.name]
+        while current.dependents:
+            current = max(
+                (self.nodes[d] for d in current.dependents), key=lambda n: n.rank
+            )
+            path.append(current.name)
+        return path, length
+
+
+class DagScheduler:
+    """
+    Runs a TaskGraph on an executor, honouring dependencies and resource conflicts.
+
+    Dependencies only order tasks: a task still runs after a dependency that
+    failed, and its result is reported as usual.
+
+    Every task gets a CancellationToken whose deadline comes from its
+    ``timeout``, counted from the moment the task starts running, not from
+    when it was submitted. When the deadline passes the token is cancelled
+    and the task is reported as timed out. A task that has not returned
+    within ``cancel_grace_seconds`` after that is abandoned: its resources
+    are released and the schedule moves on without it. An abandoned task
+    still occupies its worker, so it keeps counting against
+    ``max_parallel`` until it actually returns.
+    """
+
+    def __init__(self, max_parallel: int = 1, cancel_grace_seconds: float = 5.0):
+        """
+        Initializes the scheduler.
+
+        Args:
+            max_parallel: Maximum number of tasks running at the same time.
+            cancel_grace_seconds: How long a cancelled task may take to stop
+                                  before it is abandoned.
+        """
+        self.max_parallel = max(1, int(max_parallel))
+        self.cancel_grace_seconds = max(0.0, float(cancel_grace_seconds))
+        self._tokens: Dict[str, CancellationToken] = {}
+        self._cancelled = threading.Event()
+        self._cancel_reason = "cancelled"
+        # Completed by cancel() to interrupt the scheduler's wait
+        self._wakeup: concurrent.futures.Future = concurrent.futures.Future()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """
+        Cancel the running tasks and start no further ones.
+
+        Args:
+            reason: Reason passed to the tasks' cancellation tokens.
+        """
+        self._cancel_reason = reason
+        self._cancelled.set()
+        for token in list(self._tokens.values()):
+            token.cancel(reason)
+        if not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    @staticmethod
+    def _failure(
+        node: TaskNode, error: str, details: str, duration: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Build the result of a task the scheduler had to stop or skip."""
+        result = {
+            "name": node.name,
+            "success": False,
+            "error": error,
+            "details": details,
+            "critical": node.config.get("critical", False),
+        }
+        if duration is not None:
+            result["duration_seconds"] = round(duration, 2)
+        return result
+
+    def run(
+        self,
+        executor: concurrent.futures.Executor,
+        graph: TaskGraph,
+        run_task: Callable[[Dict[str, Any], CancellationToken], Dict[str, Any]],
+        on_error: Optional[
+            Callable[[Dict[str, Any], Exception], Dict[str, Any]]
+        ] = None,
+        executors: Optional[Dict[str, concurrent.futures.Executor]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Execute every task of the graph.
+
+        Args:
+            executor: Default executor the tasks are submitted to.
+            graph: Tasks to run.
+            run_task: Called with a task configuration and its cancellation
+                      token; returns the task's result dict.
+            on_error: Turns an exception raised by ``run_task`` into a result
+                      dict. Without it the exception propagates.
+            executors: Optional executor per backend name; tasks whose
+                       backend is not listed use ``executor``.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Dict[str, Any]]: Task results in
+                completion order, and the schedule report (see report()).
+        """
+        executors = executors or {}
+        started_at = time.monotonic()
+        pending = set(graph.nodes)
+        start_times: Dict[str, float] = {}
+        finished: Dict[str, Tuple[float, float]] = {}
+        running: Dict[concurrent.futures.Future, str] = {}
+        # Abandoned tasks whose workers have not returned yet
+        abandoned: Dict[concurrent.futures.Future, str] = {}
+        # Running tasks past their deadline -> time they get abandoned
+        overdue: Dict[str, float] = {}
+        held: Dict[str, str] = {}
+        last_holder: Dict[str, str] = {}
+        waited_on: Dict[str, Optional[str]] = {}
+        results: List[Dict[str, Any]] = []
+        max_parallelism = 0
+
+        # Completed by a worker when a task starts, so its deadline is watched
+        started_signal = [concurrent.futures.Future()]
+        signal_lock = threading.Lock()
+
+        def run_started(node: TaskNode, token: CancellationToken) -> Dict[str, Any]:
+            if token.cancelled:
+                return self._failure(
+                    node,
+                    "cancelled",
+                    f"Task '{node.name}' was not started: {token.reason}.",
+                )
+            # The deadline counts from the moment the task actually starts
+            now = time.monotonic()
+            timeout = node.config.get("timeout")
+            if timeout:
+                token.deadline = now + timeout
+            start_times[node.name] = now - started_at
+            with signal_lock:
+                if not started_signal[0].done():
+                    started_signal[0].set_result(None)
+            return run_task(node.config, token)
+
+        def startable(node: TaskNode) -> bool:
+            return all(d in finished for d in node.depends_on) and not any(
+                r in held for r in node.resources
+            )
+
+        def finish(name: str, result: Dict[str, Any]) -> None:
+            results.append(result)
+            finished[name] = (start_times[name], time.monotonic() - started_at)
+            overdue.pop(name, None)
+            self._tokens.pop(name, None)
+            for resource in graph.nodes[name].resources:
+                held.pop(resource, None)
+                last_holder[resource] = name
+
+        while pending or running:
+            if self._cancelled.is_set():
+                for name in sorted(pending):
+                    results.append(
+                        self._failure(
+                            graph.nodes[name],
+                            "cancelled",
+                            f"Task '{name}' was not started: {self._cancel_reason}.",
+                        )
+                    )
+                pending.clear()
+            for future in [f for f in abandoned if f.done()]:
+                del abandoned[future]
+            ready = sorted(
+                (graph.nodes[name] for name in pending),
+                key=lambda n: (-n.rank, n.priority, n.name),
+            )
+            for node in ready:
+                if len(running) + len(abandoned) >= self.max_parallel:
+                    break
+                if not startable(node):
+                    continue
+                # The predecessor that finished last is what this task waited for
+                gates = list(node.depends_on) + [
+                    last_holder[r] for r in node.resources if r in last_holder
+                ]
+                waited_on[node.name] = max(
+                    gates, key=lambda g: finished[g][1], default=None
+                )
+                for resource in node.resources:
+                    held[resource] = node.name
+                pending.discard(node.name)
+                # The deadline is set by run_started() once a worker picks it up
+                token = CancellationToken()
+                self._tokens[node.name] = token
+                start_times[node.name] = time.monotonic() - started_at
+                task_executor = executors.get(node.executor, executor)
+                running[task_executor.submit(run_started, node, token)] = node.name
+            max_parallelism = max(max_parallelism, len(running))
+
+            if not running:
+                if not pending:
+                    break
+                if not abandoned:
+                    raise SchedulingError(
+                        "No runnable task left; the schedule is stuck.",
+                        {"pending": sorted(pending)},
+                    )
+
+            # Sleep until a task starts or finishes, an abandoned task frees its
+            # worker, or the next deadline/grace period ends
+            with signal_lock:
+                if started_signal[0].done():
+                    started_signal[0] = concurrent.futures.Future()
+            now = time.monotonic()
+            wake_times = [
+                overdue.get(name) or self._tokens[name].deadline
+                for name in running.values()
+            ]
+            wake_times = [t for t in wake_times if t is not None]
+            wait_timeout = max(0.0, min(wake_times) - now) if wake_times else None
+            waitables = [*running, *abandoned, started_signal[0]]
+            if not self._wakeup.done():
+                waitables.append(self._wakeup)
+            done, _ = concurrent.futures.wait(
+                waitables,
+                timeout=wait_timeout,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+
+            for future in done & running.keys():
+                name = running.pop(future)
+                node = graph.nodes[name]
+                token = self._tokens[name]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    result = on_error(node.config, e)
+                if token.reason == "timeout":
+                    result = self._failure(
+                        node,
+                        "timeout",
+                        f"Task '{name}' timed out after {node.config.get('timeout')} "
+                        f"seconds and was cancelled.",
+                        time.monotonic() - started_at - start_times[name],
+                    )
+                finish(name, result)
+
+            now = time.monotonic()
+            for future, name in list(running.items()):
+                token = self._tokens[name]
+                if name in overdue:
+                    if now >= overdue[name]:
+                        # Did not react to cancellation; leave it behind
+                        del running[future]
+                        abandoned[future] = name
+                        result = self._failure(
+                            graph.nodes[name],
+                            "timeout" if token.reason == "timeout" else "cancelled",
+                            f"Task '{name}' did not stop within "
+                            f"{self.cancel_grace_seconds}s of being cancelled "
+                            f"({token.reason}) and was abandoned.",
+                            now - started_at - start_times[name],
+                        )
+                        result["abandoned"] = True
+                        finish(name, result)
+                elif token.cancelled or (
+                    token.deadline is not None and now >= token.deadline
+                ):
+                    token.cancel("timeout")
+                    overdue[name] = now + self.cancel_grace_seconds
+
+        return results, self.report(graph, finished, waited_on, max_parallelism)
+
+    @staticmethod
+    def report(
+        graph: TaskGraph,
+        finished: Dict[str, Tuple[float, float]],
+        waited_on: Dict[str, Optional[str]],
+        max_parallelism: int,
+    ) -> Dict[str, Any]:
+        """
+        Summarize an executed schedule.
+
+        The critical path is rebuilt from the run itself: starting at the
+        task that finished last, it follows the dependency or resource
+        holder each task waited for.
+
+        Returns:
+            Dict[str, Any]: Makespan, critical path, estimated critical path,
+                            peak parallelism and a per-task timeline.
+        """
+        critical_path: List[str] = []
+        if finished:
+            current: Optional[str] = max(finished, key=lambda n: finished[n][1])
+            while current is not None:
+                critical_path.append(current)
+                current = waited_on.get(current)
+            critical_path.reverse()
+        estimated_path, estimated_seconds = graph.estimated_critical_path()
+        makespan = max((end for _, end in finished.values()), default=0.0)
+        return {
+            "makespan_seconds": round(makespan, 3),
+            "critical_path": critical_path,
+            "critical_path_seconds": round(
+                sum(finished[n][1] - finished[n][0] for n in critical_path), 3
+            ),
+            "estimated_critical_path": estimated_path,
+            "estimated_critical_path_seconds": round(estimated_seconds, 3),
+            "max_parallelism": max_parallelism,
+            "dropped_dependencies": graph.dropped_dependencies,
+            "timeline": [
+                {
+                    "name": name,
+                    "start": round(start, 3),
+                    "end": round(end, 3),
+                    "resources": sorted(graph.nodes[name].resources),
+                    "executor": graph.nodes[name].executor,
+                    "waited_on": waited_on.get(name),
+                }
+                for name, (start, end) in sorted(
+                    finished.items(), key=lambda item: item[1]
+                )
+            ],
+        }
@@ -145,6 +145,15 @@ class GUIWorker:
             )
             return False
 
+    def post_result(
+        self, callback: Callable[[Optional[Any], Optional[str]], None], result: Any
+    ) -> None:
+        """Queue a result produced outside the worker for delivery on the GUI thread.
+
+        Safe to call from any thread; the callback runs from process_results.
+        """
+        self.result_queue.put((callback, result))
+
     def _process_queue(self) -> None:
         """The main loop for the worker thread, processing tasks from the queue."""
         logger.info(f"{self._thread_name}: Worker loop started.")
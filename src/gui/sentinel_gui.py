@@ -78,9 +78,12 @@ class SentinelGUI:
         # Start processing results from the worker queue
         self.worker.process_results(self.root)
 
-        # Schedule initial data loading and periodic updates
+        # Schedule initial data loading; metrics are pushed by the core
+        # when it supports subscriptions and polled otherwise
+        self._metrics_subscription = None
         self._schedule_initial_updates()
-        self._schedule_metrics_update()  # Start periodic metric updates
+        if not self._subscribe_metrics():
+            self._schedule_metrics_update()  # Start periodic metric updates
 
         logger.info("SentinelGUI initialized successfully.")
 
@@ -156,37 +159,6 @@ class SentinelGUI:
         )
         self.memory_label.pack(side=tk.LEFT)
 
-        try:
-            # Get metrics in worker thread to avoid UI freezes
-            def update_metrics():
-                try:
-                    # Check if core has the method before calling
-                    if hasattr(self.core, "get_system_metrics"):
-                        metrics = self.core.get_system_metrics()
-                        if metrics and metrics.get("success"):
-                            return metrics.get("current_metrics")
-                    else:
-                        logger.warning("Core object missing 'get_system_metrics'")
-                    return None
-                except Exception as e:
-                    logger.error(f"Error fetching metrics: {e}")
-                    return None
-
-            def handle_metrics_update(result, error):
-                if error:
-                    logger.error(f"Metrics update failed: {error}")
-                    return
-                if result:
-                    self.handle_metrics_update(result)
-
-            # Schedule the next update
-            self.worker.add_task(update_metrics, handle_metrics_update)
-            self.root.after(self.METRICS_UPDATE_INTERVAL, self._schedule_metrics_update)
-        except Exception as e:
-            logger.error(f"Failed to schedule metrics update: {e}")
-            # Retry scheduling after a delay
-            self.root.after(5000, self._schedule_metrics_update)
-
     def handle_metrics_update(self, metrics: Dict[str, Any]) -> None:
         """Handle updated system metrics data.
 
@@ -437,6 +409,32 @@ class SentinelGUI:
 
     # --- System Metrics Update ---
 
+    def _subscribe_metrics(self) -> bool:
+        """Subscribe to pushed metrics updates if the core supports them.
+
+        Returns:
+            bool: True if subscribed
+        """
+        if not hasattr(self.core, "subscribe_metrics"):
+            return False
+
+        def on_metrics_pushed(result: Dict[str, Any], error: Optional[str]) -> None:
+            self.handle_metrics_update(result)
+
+        def on_event(event) -> None:
+            # Runs on the subscription's thread; hand over to the Tk thread
+            if event.topic == "sample":
+                self.worker.post_result(on_metrics_pushed, event.payload)
+
+        try:
+            self._metrics_subscription = self.core.subscribe_metrics(
+                on_event, min_interval=self.METRICS_UPDATE_INTERVAL / 1000
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to subscribe to metrics, polling instead: {e}")
+            return False
+
     def _schedule_metrics_update(self) -> None:
         """Schedules the next system metrics update."""
         # Check if root window still exists before scheduling next update
@@ -1006,15 +1004,17 @@ class SentinelGUI:
                 task_error = task.get("error", "Unknown Error")
                 self.results_text.insert(tk.END, f"  - {task_name}: {task_error}\n")
 
-        # Display Final State (Optional)
-        if "final_state" in results and isinstance(results["final_state"], dict):
-            self.results_text.insert(tk.END, "\nFinal State:\n")
-            if not results["final_state"]:
-                self.results_text.insert(tk.END, "  (No final state data provided)\n")
+        # Display State Changes (only values that changed during the run)
+        if isinstance(results.get("state_changes"), dict):
+            self.results_text.insert(tk.END, "\nState Changes:\n")
+            if not results["state_changes"]:
+                self.results_text.insert(tk.END, "  (No state changes recorded)\n")
             else:
-                for key, value in results["final_state"].items():
+                for key, change in results["state_changes"].items():
                     self.results_text.insert(
-                        tk.END, f"  {key.replace('_', ' ').title()}: {value}\n"
+                        tk.END,
+                        f"  {key.replace('_', ' ').title()}: "
+                        f"{change['before']} -> {change['after']}\n",
                     )
 
         # Display Warnings
@@ -1055,6 +1055,8 @@ class SentinelGUI:
         except KeyboardInterrupt:
             logger.info("GUI main loop interrupted by user (KeyboardInterrupt).")
         finally:
+            if self._metrics_subscription is not None:
+                self._metrics_subscription.cancel()
             logger.info("GUI main loop finished. Stopping worker thread...")
             self.worker.stop()  # Ensure worker is stopped cleanly
             logger.info("Worker thread stopped.")
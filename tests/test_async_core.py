@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from src.core.async_core import AsyncSentinelCore
+from src.core.metrics_events import SAMPLE, MetricsPublisher
+
+
+class SlowCore:
+    """Core stand-in whose calls block and count their invocations."""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = {"info": 0, "optimize": 0}
+        self.threads = set()
+        self.running_optimizations = 0
+        self.max_parallel_optimizations = 0
+        self._lock = threading.Lock()
+        self.monitoring = MagicMock()
+
+    def get_system_info(self):
+        with self._lock:
+            self.calls["info"] += 1
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return {"success": True}
+
+    def optimize_system(self, profile=None):
+        with self._lock:
+            self.calls["optimize"] += 1
+            self.running_optimizations += 1
+            self.max_parallel_optimizations = max(
+                self.max_parallel_optimizations, self.running_optimizations
+            )
+        time.sleep(self.delay)
+        with self._lock:
+            self.running_optimizations -= 1
+        return {"success": True, "profile": profile}
+
+
+class TestAsyncSentinelCore(unittest.TestCase):
+    def setUp(self):
+        self.core = SlowCore()
+        self.facade = AsyncSentinelCore(self.core)
+        self.addCleanup(self.facade.close)
+
+    def test_concurrent_calls_share_one_request(self):
+        async def run():
+            return await asyncio.gather(
+                *(self.facade.get_system_info() for _ in range(20))
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 20)
+        self.assertEqual(self.core.calls["info"], 1)
+        self.assertEqual(self.facade.in_flight, 0)
+        self.assertTrue(
+            all(name.startswith("sentinel-async") for name in self.core.threads)
+        )
+
+    def test_event_loop_is_not_blocked(self):
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.create_task(ticker())
+            await self.facade.get_system_info()
+            task.cancel()
+            return ticks
+
+        self.assertGreater(asyncio.run(run()), 3)
+
+    def test_optimizations_never_overlap(self):
+        async def run():
+            return await asyncio.gather(
+                self.facade.optimize_system("a"),
+                self.facade.optimize_system("b"),
+                self.facade.optimize_system("a"),
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual([r["profile"] for r in results], ["a", "b", "a"])
+        self.assertEqual(self.core.calls["optimize"], 2)
+        self.assertEqual(self.core.max_parallel_optimizations, 1)
+
+    def test_cancelling_one_caller_keeps_the_shared_call(self):
+        async def run():
+            first = asyncio.create_task(self.facade.get_system_info())
+            second = asyncio.create_task(self.facade.get_system_info())
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        self.assertTrue(asyncio.run(run())["success"])
+        self.assertEqual(self.core.calls["info"], 1)
+
+    def test_closed_facade_rejects_calls(self):
+        self.facade.close()
+        with self.assertRaises(RuntimeError):
+            asyncio.run(self.facade.get_system_info())
+
+    def test_stream_metrics_yields_published_samples(self):
+        publisher = MetricsPublisher()
+        self.addCleanup(publisher.close)
+        self.core.monitoring.subscribe.side_effect = publisher.subscribe
+
+        async def run():
+            stream = self.facade.stream_metrics(topics=[SAMPLE])
+            receive = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.01)
+            publisher.publish(SAMPLE, {"cpu_percent": 1.0})
+            event = await asyncio.wait_for(receive, 1)
+            await stream.aclose()
+            return event
+
+        self.assertEqual(asyncio.run(run()).payload["cpu_percent"], 1.0)
+        self.assertFalse(publisher.has_subscribers(SAMPLE))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,406 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from src.core.io_throttle import IOThrottle
+from src.core.cleanup_engine import (
+    ByteBudget,
+    CleanupMatcher,
+    DeletionPlanWriter,
+    ParallelDirectoryScanner,
+    PlanEntry,
+    PlanExecutionResult,
+    RemovalResult,
+    SCAN_DELETE,
+    SCAN_DESCEND,
+    SCAN_PRESERVE,
+    ScanIndex,
+    ScanStats,
+    execute_plan,
+    find_mount_point,
+    group_by_mount,
+    read_plan,
+    remove_file,
+    remove_tree,
+)
+from src.core.performance_optimizer import PerformanceOptimizer
+
+
+def _touch(path: Path, size: int = 0) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+
+
+class TestParallelDirectoryScanner(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        _touch(self.root / "a.tmp", 10)
+        _touch(self.root / "keep.txt", 5)
+        _touch(self.root / "sub" / "b.tmp", 20)
+        _touch(self.root / "sub" / "deeper" / "c.tmp", 30)
+        _touch(self.root / "sysdir" / "d.tmp", 40)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    @staticmethod
+    def _classify(entry, st, depth):
+        if entry.name.startswith("sys"):
+            return SCAN_PRESERVE
+        if entry.name.endswith(".tmp"):
+            return SCAN_DELETE
+        return SCAN_DESCEND
+
+    def test_scan_streams_candidates_from_subdirectories(self):
+        scanner = ParallelDirectoryScanner(self._classify, max_workers=4, max_depth=4)
+        found = {Path(c.path).name: c for c in scanner.scan([self.root])}
+
+        self.assertEqual(set(found), {"a.tmp", "b.tmp", "c.tmp"})
+        self.assertEqual(found["c.tmp"].size, 30)
+        self.assertEqual(found["c.tmp"].depth, 2)
+        self.assertEqual(scanner.stats.candidates, 3)
+        # keep.txt and the skipped sysdir are preserved
+        self.assertEqual(scanner.stats.preserved, 2)
+        self.assertGreater(scanner.stats.to_dict()["entries_per_second"], 0)
+
+    def test_every_root_is_scanned(self):
+        roots = [self.root / f"root{i}" for i in range(4)]
+        for i, root in enumerate(roots):
+            _touch(root / f"{i}.tmp")
+        for _ in range(50):
+            scanner = ParallelDirectoryScanner(self._classify, max_workers=2)
+            names = {c.name for c in scanner.scan(roots)}
+            self.assertEqual(names, {f"{i}.tmp" for i in range(4)})
+            self.assertTrue(scanner.stats.completed)
+            self.assertEqual(scanner.stats.dirs_scanned, 4)
+
+    def test_max_depth_limits_descent(self):
+        scanner = ParallelDirectoryScanner(self._classify, max_workers=2, max_depth=0)
+        names = {c.name for c in scanner.scan([self.root])}
+        self.assertEqual(names, {"a.tmp"})
+
+    def test_unreadable_root_is_reported(self):
+        scanner = ParallelDirectoryScanner(self._classify, max_workers=2)
+        missing = self.root / "missing"
+        self.assertEqual(list(scanner.scan([missing])), [])
+        self.assertEqual(scanner.stats.errors[0]["path"], str(missing))
+
+    def test_early_close_stops_workers(self):
+        for i in range(50):
+            _touch(self.root / "many" / f"{i}.tmp")
+        scanner = ParallelDirectoryScanner(
+            self._classify, max_workers=2, max_depth=4, queue_size=1
+        )
+        iterator = scanner.scan([self.root])
+        self.assertIsNotNone(next(iterator))
+        iterator.close()
+        # Closing the generator shuts the pool down and finalizes the stats
+        self.assertGreater(scanner.stats.elapsed_seconds, 0)
+
+
+class TestScanIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name)
+        self.root = self.base / "root"
+        self.index_path = self.base / "cache" / "index.json"
+        _touch(self.root / "a.tmp", 10)
+        _touch(self.root / "keep.txt", 5)
+        _touch(self.root / "sub" / "b.tmp", 20)
+        self._age(self.root / "sub")
+        self._age(self.root)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    @staticmethod
+    def _age(path, mtime=1_000_000):
+        # Directories modified just before the scan are not cached
+        os.utime(path, (mtime, mtime))
+
+    def _scan(self):
+        scanner = ParallelDirectoryScanner(
+            TestParallelDirectoryScanner._classify,
+            max_workers=2,
+            max_depth=4,
+            index=ScanIndex.load(self.index_path),
+        )
+        names = {c.name for c in scanner.scan([self.root])}
+        scanner.index.save(complete=scanner.stats.completed)
+        return scanner, names
+
+    def test_unchanged_directories_are_replayed(self):
+        first, first_names = self._scan()
+        second, second_names = self._scan()
+
+        self.assertEqual(first.stats.index_misses, 2)
+        self.assertEqual(second.stats.index_hits, 2)
+        self.assertEqual(second_names, first_names)
+        self.assertEqual(second_names, {"a.tmp", "b.tmp"})
+        self.assertEqual(
+            second.index.stats_for(str(self.root / "sub"))["file_bytes"], 20
+        )
+
+    def test_changed_directory_is_rescanned(self):
+        self._scan()
+        _touch(self.root / "sub" / "c.tmp", 30)
+        self._age(self.root / "sub", 2_000_000)
+
+        scanner, names = self._scan()
+
+        self.assertEqual(scanner.stats.index_hits, 1)
+        self.assertEqual(scanner.stats.index_misses, 1)
+        self.assertIn("c.tmp", names)
+
+    def test_recently_modified_directories_are_not_cached(self):
+        _touch(self.root / "sub" / "c.tmp")
+        self._scan()
+        self.assertEqual(len(ScanIndex.load(self.index_path)), 1)
+
+    def test_unwalked_root_keeps_its_records(self):
+        other = self.base / "other"
+        _touch(other / "c.tmp", 30)
+        self._age(other)
+        scanner = ParallelDirectoryScanner(
+            TestParallelDirectoryScanner._classify,
+            max_workers=2,
+            max_depth=4,
+            index=ScanIndex.load(self.index_path),
+        )
+        list(scanner.scan([self.root, other]))
+        scanner.index.save(complete=scanner.stats.completed)
+        self.assertEqual(scanner.stats.roots_scanned, 2)
+
+        # A later scan that only walked the first of the mount's two roots
+        index = ScanIndex.load(self.index_path)
+        scanner = ParallelDirectoryScanner(
+            TestParallelDirectoryScanner._classify,
+            max_workers=2,
+            max_depth=4,
+            index=index,
+        )
+        list(scanner.scan([self.root]))
+        self.assertTrue(scanner.stats.completed)
+        mount = {"roots": [self.root, other], "scanner": scanner}
+        mount["entries"] = (entry for entry in ())
+        PerformanceOptimizer()._finish_temp_scan({"mounts": [mount], "index": index})
+
+        saved = ScanIndex.load(self.index_path)
+        self.assertEqual(saved.stats_for(str(other))["file_bytes"], 30)
+        self.assertEqual(saved.stats_for(str(self.root / "sub"))["file_bytes"], 20)
+
+    def test_corrupt_index_is_ignored(self):
+        self.index_path.parent.mkdir(parents=True)
+        self.index_path.write_text("not json")
+        self.assertEqual(len(ScanIndex.load(self.index_path)), 0)
+
+
+class TestTempCleanupScan(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.optimizer = PerformanceOptimizer()
+
+    def _scan_names(self):
+        cleanup_cfg = self.optimizer._load_cleanup_config()
+        cleanup_cfg["use_scan_index"] = False
+        scan = self.optimizer._scan_temp_cleanup(cleanup_cfg, [self.root])
+        try:
+            return {
+                Path(entry.path).relative_to(self.root).as_posix()
+                for mount in scan["mounts"]
+                for entry in mount["entries"]
+            }
+        finally:
+            self.optimizer._finish_temp_scan(scan)
+
+    def test_recent_directories_are_kept_whole(self):
+        # An active build tree holding files unpacked with old mtimes
+        _touch(self.root / "build" / "old.tmp", 10)
+        TestScanIndex._age(self.root / "build" / "old.tmp")
+        _touch(self.root / "stale" / "old.tmp", 10)
+        _touch(self.root / "stale" / "active" / "old.tmp", 10)
+        for path in ("stale/old.tmp", "stale/active/old.tmp", "stale"):
+            TestScanIndex._age(self.root / path)
+
+        self.assertEqual(self._scan_names(), {"stale/old.tmp"})
+
+
+class TestMountGrouping(unittest.TestCase):
+    def test_paths_on_one_filesystem_share_a_group(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = Path(tmp) / "a"
+            second = Path(tmp) / "b"
+            first.mkdir()
+            second.mkdir()
+            groups = group_by_mount([first, second])
+
+        self.assertEqual(list(groups.values()), [[first, second]])
+        mount_point = next(iter(groups))
+        self.assertTrue(os.path.ismount(mount_point))
+        self.assertEqual(find_mount_point(mount_point), mount_point)
+
+    def test_combine_scan_stats(self):
+        combined = ScanStats.combine(
+            [
+                ScanStats(entries_scanned=3, elapsed_seconds=1.0, completed=True),
+                ScanStats(entries_scanned=5, elapsed_seconds=2.0, completed=False),
+            ]
+        )
+        self.assertEqual(combined.entries_scanned, 8)
+        self.assertEqual(combined.elapsed_seconds, 2.0)
+        self.assertFalse(combined.completed)
+
+    def test_merge_plan_execution_results(self):
+        total = PlanExecutionResult(
+            RemovalResult(files_removed=1, bytes_freed=10), {"temp_files": 10}, 1
+        )
+        total.merge(
+            PlanExecutionResult(
+                RemovalResult(files_removed=2, bytes_freed=5), {"temp_files": 5}, 0
+            )
+        )
+        self.assertEqual(total.removal.files_removed, 3)
+        self.assertEqual(total.freed_by_category, {"temp_files": 15})
+        self.assertEqual(total.skipped, 1)
+
+
+class TestCleanupMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = CleanupMatcher(
+            {
+                "temp_files": ["*.tmp", "~*"],
+                "log_files": ["*.log", "*.log.*"],
+                "nested": ["cache/*.bin"],
+            },
+            ["Sys", "config"],
+            case_sensitive=True,
+        )
+
+    def test_match_reports_category(self):
+        self.assertEqual(self.matcher.match("a.tmp"), "temp_files")
+        self.assertEqual(self.matcher.match("~lock"), "temp_files")
+        self.assertEqual(self.matcher.match("app.log.3"), "log_files")
+        self.assertIsNone(self.matcher.match("notes.txt"))
+
+    def test_multi_component_globs_use_full_path(self):
+        self.assertEqual(self.matcher.match("x.bin", "/tmp/cache/x.bin"), "nested")
+        self.assertIsNone(self.matcher.match("x.bin", "/tmp/other/x.bin"))
+
+    def test_skip_prefixes_are_case_insensitive(self):
+        self.assertTrue(self.matcher.is_skipped("SYSTEMD-private"))
+        self.assertTrue(self.matcher.is_skipped("config.bak"))
+        self.assertFalse(self.matcher.is_skipped("a.tmp"))
+
+    def test_case_insensitive_matching(self):
+        matcher = CleanupMatcher({"temp": ["*.tmp"]}, case_sensitive=False)
+        self.assertEqual(matcher.match("A.TMP"), "temp")
+
+    def test_empty_patterns_match_everything(self):
+        matcher = CleanupMatcher({})
+        self.assertEqual(matcher.match("anything"), CleanupMatcher.UNCATEGORIZED)
+
+
+class TestRemoveTree(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "tree"
+        _touch(self.root / "a.bin", 100)
+        _touch(self.root / "x" / "b.bin", 200)
+        _touch(self.root / "x" / "y" / "c.bin", 300)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_remove_tree_measures_and_deletes_in_one_pass(self):
+        result = remove_tree(self.root)
+        self.assertFalse(self.root.exists())
+        self.assertEqual(result.bytes_freed, 600)
+        self.assertEqual(result.files_removed, 3)
+        self.assertEqual(result.dirs_removed, 3)
+        self.assertEqual(result.errors, [])
+
+    @unittest.skipIf(os.name == "nt", "symlinks need privileges on Windows")
+    def test_remove_tree_does_not_follow_symlinks(self):
+        outside = Path(self._tmp.name) / "outside"
+        _touch(outside / "precious.bin", 50)
+        os.symlink(outside, self.root / "link")
+        remove_tree(self.root)
+        self.assertTrue((outside / "precious.bin").exists())
+
+    def test_byte_budget_stops_removal(self):
+        budget = ByteBudget(150)
+        result = remove_tree(self.root, budget)
+        self.assertTrue(result.budget_exhausted)
+        self.assertTrue(self.root.exists())
+        self.assertGreaterEqual(budget.used, 150)
+
+    def test_throttle_charges_every_unlink_and_rmdir(self):
+        sleeps = []
+        throttle = IOThrottle(ops_per_second=1000, sleep=sleeps.append)
+        remove_tree(self.root, throttle=throttle)
+        self.assertEqual(throttle.stats.operations, 6)
+        self.assertEqual(throttle.stats.bytes, 600)
+
+    def test_remove_file_ignores_missing_paths(self):
+        result = remove_file(self.root / "missing.bin", 10)
+        self.assertEqual(result.files_removed, 0)
+        self.assertEqual(result.errors, [])
+
+
+class TestDeletionPlan(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name)
+        self.plan_path = self.base / "plans" / "plan.jsonl"
+        _touch(self.base / "data" / "a.tmp", 10)
+        _touch(self.base / "data" / "tree" / "b.tmp", 20)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _entry(self, relative, is_dir=False, category="temp_files"):
+        path = self.base / "data" / relative
+        st = os.lstat(path)
+        return PlanEntry(
+            path=str(path),
+            is_dir=is_dir,
+            size=0 if is_dir else st.st_size,
+            mtime=st.st_mtime,
+            category=category,
+        )
+
+    def test_plan_round_trip(self):
+        entries = [self._entry("a.tmp"), self._entry("tree", is_dir=True)]
+        with DeletionPlanWriter(self.plan_path, {"roots": ["data"]}) as writer:
+            for entry in entries:
+                writer.write(entry)
+
+        self.assertEqual(writer.entries, 2)
+        self.assertEqual(writer.bytes_by_category, {"temp_files": 10})
+        self.assertFalse(self.plan_path.with_name("plan.jsonl.part").exists())
+        self.assertEqual(list(read_plan(self.plan_path)), entries)
+
+    def test_invalid_plan_is_rejected(self):
+        self.plan_path.parent.mkdir(parents=True)
+        self.plan_path.write_text('{"format": "something-else"}\n')
+        with self.assertRaises(ValueError):
+            list(read_plan(self.plan_path))
+
+    def test_execute_plan_skips_changed_entries(self):
+        entries = [self._entry("a.tmp"), self._entry("tree", is_dir=True)]
+        (self.base / "data" / "a.tmp").write_bytes(b"rewritten")
+        os.utime(self.base / "data" / "a.tmp", (1, 1))
+
+        result = execute_plan(entries, max_workers=2, verify=True)
+
+        self.assertEqual(result.skipped, 1)
+        self.assertTrue((self.base / "data" / "a.tmp").exists())
+        self.assertFalse((self.base / "data" / "tree").exists())
+        self.assertEqual(result.freed_by_category, {"temp_files": 20})
+
+
+if __name__ == "__main__":
+    unittest.main()
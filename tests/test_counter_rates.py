@@ -0,0 +1,53 @@
+import unittest
+from collections import namedtuple
+from src.core.counter_rates import (
+    NET_FIELDS,
+    CounterTracker,
+    counter_delta,
+    to_rates,
+)
+
+Net = namedtuple("Net", NET_FIELDS)
+
+
+def _net(sent, recv=0):
+    return Net(sent, recv, 0, 0)
+
+
+class TestCounterDelta(unittest.TestCase):
+    def test_increasing_counter(self):
+        self.assertEqual(counter_delta(150, 100), 50)
+
+    def test_32_bit_wraparound(self):
+        self.assertEqual(counter_delta(10, 2**32 - 90), 100)
+
+    def test_reset_counts_from_zero(self):
+        self.assertEqual(counter_delta(500, 2**40), 500)
+        # A large drop of a 32-bit value is a reset, not a wrap
+        self.assertEqual(counter_delta(5, 3_000_000_000 - 2**31), 5)
+
+
+class TestCounterTracker(unittest.TestCase):
+    def test_first_snapshot_has_no_deltas(self):
+        tracker = CounterTracker(NET_FIELDS)
+        self.assertEqual(tracker.update({"eth0": _net(100)}, 0.0), {})
+        self.assertIsNone(tracker.elapsed)
+
+    def test_deltas_and_rates_per_key(self):
+        tracker = CounterTracker(NET_FIELDS)
+        tracker.update({"eth0": _net(100, 10), "lo": _net(0)}, 0.0)
+        deltas = tracker.update({"eth0": _net(300, 30), "wlan0": _net(5)}, 2.0)
+        self.assertEqual(set(deltas), {"eth0"})
+        self.assertEqual(deltas["eth0"]["bytes_sent"], 200)
+        rates = to_rates(deltas, tracker.elapsed)
+        self.assertEqual(rates["eth0"]["bytes_sent_per_second"], 100.0)
+        self.assertEqual(rates["eth0"]["bytes_recv_per_second"], 10.0)
+
+    def test_missing_counters_and_zero_elapsed(self):
+        tracker = CounterTracker(NET_FIELDS)
+        self.assertEqual(tracker.update(None, 0.0), {})
+        self.assertEqual(to_rates({"eth0": {"bytes_sent": 1}}, 0.0), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from datetime import datetime
+from src.core.health_rules import HealthEngine, HealthRule, parse_rules
+from src.core.monitoring_manager import MonitoringManager, SystemMetrics
+
+
+class TestHealthRule(unittest.TestCase):
+    def test_hysteresis_keeps_reached_level(self):
+        rule = HealthRule("cpu_percent", warning=90, critical=98, hysteresis=5)
+        self.assertEqual(rule.level_for(91, "healthy"), "warning")
+        self.assertEqual(rule.level_for(87, "healthy"), "healthy")
+        self.assertEqual(rule.level_for(87, "warning"), "warning")
+        self.assertEqual(rule.level_for(84, "warning"), "healthy")
+        self.assertEqual(rule.level_for(95, "critical"), "critical")
+        self.assertEqual(rule.level_for(92, "critical"), "warning")
+
+    def test_invalid_rules_are_rejected(self):
+        with self.assertRaises(ValueError):
+            HealthRule("cpu_percent")
+        with self.assertRaises(ValueError):
+            HealthRule("cpu_percent", warning=90, critical=80)
+        with self.assertRaises(ValueError):
+            HealthRule("cpu_percent", warning=90, hysteresis=-1)
+        with self.assertRaises(ValueError):
+            parse_rules([{"metric": "cpu_percent", "warning": 90, "unknown": 1}])
+
+    def test_parse_rules_from_mapping(self):
+        rules = parse_rules({"memory_percent": {"warning": "80", "min_duration": 2}})
+        self.assertEqual(rules, [HealthRule("memory_percent", 80.0, min_duration=2.0)])
+
+
+class TestHealthEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = HealthEngine(
+            [
+                HealthRule("cpu_percent", warning=90, hysteresis=5, min_duration=3),
+                HealthRule("disk_percent", warning=90, critical=95),
+            ]
+        )
+        self.events = []
+        self.engine.add_listener(self.events.append)
+
+    def test_level_is_raised_after_minimum_duration(self):
+        self.engine.evaluate({"cpu_percent": 95}, 0)
+        self.engine.evaluate({"cpu_percent": 95}, 2)
+        self.assertEqual(self.engine.status, "healthy")
+        self.engine.evaluate({"cpu_percent": 95}, 3)
+        self.assertEqual(self.engine.status, "warning")
+        self.assertEqual(len(self.events), 1)
+        event = self.events[0]
+        self.assertEqual((event.previous, event.current), ("healthy", "warning"))
+        self.assertEqual(event.status, "warning")
+
+    def test_short_spikes_do_not_change_level(self):
+        for timestamp, value in enumerate([95, 50, 95, 50, 95, 50]):
+            self.engine.evaluate({"cpu_percent": value}, timestamp)
+        self.assertEqual(self.engine.status, "healthy")
+        self.assertEqual(self.events, [])
+
+    def test_noise_inside_band_does_not_flap(self):
+        for timestamp in range(4):
+            self.engine.evaluate({"cpu_percent": 95}, timestamp)
+        for timestamp, value in enumerate([89, 91, 88, 92], start=4):
+            self.engine.evaluate({"cpu_percent": value}, timestamp)
+        self.assertEqual(self.engine.status, "warning")
+        self.engine.evaluate({"cpu_percent": 80}, 10)
+        self.assertEqual(self.engine.status, "healthy")
+        self.assertEqual([e.current for e in self.events], ["warning", "healthy"])
+
+    def test_per_mount_levels_and_overall_status(self):
+        self.engine.evaluate({"disk_percent": {"/": 50, "/data": 96}}, 0)
+        self.assertEqual(self.engine.status, "critical")
+        self.engine.evaluate({"disk_percent": {"/": 91, "/data": 50}}, 1)
+        self.assertEqual(self.engine.status, "warning")
+        keys = [(e.key, e.current) for e in self.events]
+        self.assertEqual(
+            keys, [("/data", "critical"), ("/", "warning"), ("/data", "healthy")]
+        )
+
+    def test_vanished_mount_is_cleared(self):
+        self.engine.evaluate({"disk_percent": {"/mnt": 99}}, 0)
+        self.engine.evaluate({"disk_percent": {}}, 1)
+        self.assertEqual(self.engine.status, "healthy")
+        self.assertEqual(self.events[-1].value, None)
+        self.assertEqual(self.engine.snapshot()["metrics"], [])
+
+    def test_failing_listener_does_not_stop_others(self):
+        def broken(event):
+            raise RuntimeError("boom")
+
+        engine = HealthEngine([HealthRule("memory_percent", warning=90)])
+        received = []
+        engine.add_listener(broken)
+        engine.add_listener(received.append)
+        engine.evaluate({"memory_percent": 95}, 0)
+        self.assertEqual(len(received), 1)
+
+
+class TestMonitoringHealth(unittest.TestCase):
+    def _sample(self, cpu, disk):
+        return SystemMetrics(
+            timestamp=datetime.now(),
+            cpu_percent=cpu,
+            memory_percent=10.0,
+            disk_usage={"/": {"percent": disk}},
+            network_io={},
+        )
+
+    def test_status_recovers_after_warning(self):
+        monitor = MonitoringManager()
+        monitor.initialize({"health_rules": [{"metric": "cpu_percent", "warning": 90}]})
+        monitor.stop_sampling()
+        monitor._record(self._sample(95.0, 99.0))
+        self.assertEqual(monitor.get_health_status(), "warning")
+        monitor._record(self._sample(10.0, 99.0))
+        self.assertEqual(monitor.get_health_status(), "healthy")
+        details = monitor.get_health_details()
+        self.assertTrue(details["success"])
+        self.assertEqual(details["metrics"][0]["metric"], "cpu_percent")
+        monitor.cleanup()
+
+    def test_default_rules_evaluate_per_mount_disk_usage(self):
+        monitor = MonitoringManager()
+        monitor._record(self._sample(10.0, 99.0))
+        self.assertEqual(monitor.get_health_status(), "critical")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from src.core.io_throttle import IOThrottle, TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_is_free_and_debt_is_paced(self):
+        bucket = TokenBucket(rate=10)
+        now = bucket._last
+        self.assertEqual(bucket.reserve(10, now), 0.0)
+        self.assertAlmostEqual(bucket.reserve(5, now), 0.5)
+
+    def test_tokens_refill_over_time(self):
+        bucket = TokenBucket(rate=10)
+        now = bucket._last
+        bucket.reserve(10, now)
+        self.assertEqual(bucket.reserve(10, now + 1.0), 0.0)
+
+
+class TestIOThrottle(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+
+    def test_unlimited_throttle_is_disabled(self):
+        throttle = IOThrottle(sleep=self.sleeps.append)
+        self.assertFalse(throttle.enabled)
+        self.assertEqual(throttle.acquire(1, 10**9), 0.0)
+        self.assertEqual(self.sleeps, [])
+
+    def test_byte_limit_paces_callers(self):
+        throttle = IOThrottle(bytes_per_second=1000, sleep=self.sleeps.append)
+        for _ in range(3):
+            throttle.acquire(1, 1000)
+
+        # One second of burst, then each request waits for its bytes
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertGreater(self.sleeps[-1], 1.5)
+        stats = throttle.snapshot()
+        self.assertEqual(stats["operations"], 3)
+        self.assertEqual(stats["bytes"], 3000)
+        self.assertGreater(stats["throttled_seconds"], 2.5)
+
+    def test_busy_disk_backs_off_and_recovers(self):
+        busy = [95.0, 95.0, 10.0]
+        throttle = IOThrottle(
+            ops_per_second=100,
+            busy_threshold_percent=80,
+            busy_probe=lambda: busy.pop(0),
+            probe_interval=0,
+            sleep=self.sleeps.append,
+        )
+        throttle.acquire()
+        throttle.acquire()
+        self.assertEqual(throttle.stats.backoffs, 2)
+        self.assertEqual(throttle.stats.rate_factor, 0.25)
+        self.assertEqual(throttle._ops.rate, 25)
+
+        throttle.acquire()
+        self.assertAlmostEqual(throttle.stats.rate_factor, 0.35)
+
+
+if __name__ == "__main__":
+    unittest.main()
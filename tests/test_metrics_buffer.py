@@ -0,0 +1,79 @@
+import math
+import unittest
+from src.core.metrics_buffer import MetricsRingBuffer
+
+
+def _fill(buffer, count, start=0):
+    for i in range(start, start + count):
+        buffer.append(float(i), i * 1.5, 50.0, {"/": float(i)}, i, 2 * i)
+
+
+class TestMetricsRingBuffer(unittest.TestCase):
+    def test_rejects_non_positive_capacity(self):
+        with self.assertRaises(ValueError):
+            MetricsRingBuffer(0)
+
+    def test_columns_are_chronological_before_wrapping(self):
+        buffer = MetricsRingBuffer(5)
+        _fill(buffer, 3)
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.column("timestamp").tolist(), [0.0, 1.0, 2.0])
+
+    def test_oldest_samples_are_overwritten(self):
+        buffer = MetricsRingBuffer(4)
+        _fill(buffer, 10)
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer.column("timestamp").tolist(), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(buffer.column("bytes_recv").tolist(), [12, 14, 16, 18])
+        self.assertEqual(buffer.disk_column("/").tolist(), [6.0, 7.0, 8.0, 9.0])
+
+    def test_slices_support_negative_positions(self):
+        buffer = MetricsRingBuffer(4)
+        _fill(buffer, 6)
+        self.assertEqual(buffer.column("timestamp", -2).tolist(), [4.0, 5.0])
+        self.assertEqual(buffer.column("timestamp", 1, 3).tolist(), [3.0, 4.0])
+
+    def test_mounts_appearing_later_are_nan_padded(self):
+        buffer = MetricsRingBuffer(4)
+        _fill(buffer, 2)
+        buffer.append(2.0, 1.0, 1.0, {"/": 3.0, "/data": 40.0})
+        self.assertEqual(buffer.mounts, ["/", "/data"])
+        values = buffer.disk_column("/data").tolist()
+        self.assertTrue(math.isnan(values[0]) and math.isnan(values[1]))
+        self.assertEqual(values[2], 40.0)
+
+    def test_export_returns_lists_with_none_for_missing_mounts(self):
+        buffer = MetricsRingBuffer(4)
+        buffer.append(1.0, 10.0, 20.0, {"/": 30.0})
+        buffer.append(2.0, 11.0, 21.0, {"/data": 40.0})
+        exported = buffer.export(columns=["timestamp", "cpu_percent"])
+        self.assertEqual(exported["timestamp"], [1.0, 2.0])
+        self.assertEqual(exported["cpu_percent"], [10.0, 11.0])
+        self.assertNotIn("memory_percent", exported)
+        self.assertEqual(
+            exported["disk_percent"], {"/": [30.0, None], "/data": [None, 40.0]}
+        )
+
+    def test_position_since_finds_first_newer_sample(self):
+        buffer = MetricsRingBuffer(4)
+        _fill(buffer, 6)
+        self.assertEqual(buffer.position_since(3.5), 2)
+        self.assertEqual(buffer.position_since(0.0), 0)
+        self.assertEqual(buffer.position_since(9.0), 4)
+
+    def test_version_changes_on_every_append(self):
+        buffer = MetricsRingBuffer(2)
+        _fill(buffer, 3)
+        self.assertEqual(buffer.version, 3)
+
+    def test_clear_forgets_samples_and_mounts(self):
+        buffer = MetricsRingBuffer(3)
+        _fill(buffer, 5)
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(buffer.mounts, [])
+        self.assertEqual(buffer.export()["timestamp"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+import tkinter
+import unittest
+from contextlib import ExitStack
+from unittest.mock import ANY, MagicMock, patch
+from src.core.metrics_events import HEALTH, SAMPLE, MetricsPublisher
+from src.core.monitoring_manager import MonitoringManager
+from src.gui import sentinel_gui
+
+
+class TestMetricsPublisher(unittest.TestCase):
+    def setUp(self):
+        self.publisher = MetricsPublisher()
+        self.addCleanup(self.publisher.close)
+
+    def test_callback_receives_events(self):
+        received = []
+        done = threading.Event()
+
+        def callback(event):
+            received.append(event)
+            if len(received) == 2:
+                done.set()
+
+        self.publisher.subscribe(callback=callback)
+        self.publisher.publish(HEALTH, {"current": "warning"}, 1.0)
+        self.publisher.publish(SAMPLE, {"cpu_percent": 5.0}, 1.0)
+        self.assertTrue(done.wait(2))
+        self.assertEqual([event.topic for event in received], [HEALTH, SAMPLE])
+
+    def test_slow_subscriber_gets_latest_sample_only(self):
+        release = threading.Event()
+        received = []
+
+        def slow(event):
+            release.wait(2)
+            received.append(event.payload["n"])
+
+        subscription = self.publisher.subscribe(callback=slow, topics=[SAMPLE])
+        self.publisher.publish(SAMPLE, {"n": 0})
+        time.sleep(0.05)  # The first sample is being delivered
+        started = time.perf_counter()
+        for n in range(1, 100):
+            self.publisher.publish(SAMPLE, {"n": n})
+        self.assertLess(time.perf_counter() - started, 0.5)
+        release.set()
+        deadline = time.monotonic() + 2
+        while len(received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(received, [0, 99])
+        self.assertEqual(subscription.coalesced, 98)
+
+    def test_rate_limit_delivers_trailing_sample(self):
+        received = []
+        self.publisher.subscribe(
+            callback=lambda event: received.append(event.payload["n"]),
+            min_interval=0.2,
+        )
+        self.publisher.publish(SAMPLE, {"n": 0})
+        time.sleep(0.05)
+        for n in range(1, 5):
+            self.publisher.publish(SAMPLE, {"n": n})
+        time.sleep(0.05)
+        self.assertEqual(received, [0])
+        time.sleep(0.3)
+        self.assertEqual(received, [0, 4])
+
+    def test_health_events_are_not_coalesced(self):
+        release = threading.Event()
+        received = []
+
+        def slow(event):
+            release.wait(2)
+            received.append(event.payload["n"])
+
+        self.publisher.subscribe(callback=slow, topics=[HEALTH])
+        for n in range(3):
+            self.publisher.publish(HEALTH, {"n": n})
+        self.publisher.publish(SAMPLE, {"n": 99})
+        release.set()
+        deadline = time.monotonic() + 2
+        while len(received) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(received, [0, 1, 2])
+
+    def test_cancelled_subscription_receives_nothing(self):
+        received = []
+        subscription = self.publisher.subscribe(callback=received.append)
+        subscription.cancel()
+        self.assertFalse(self.publisher.has_subscribers(SAMPLE))
+        self.publisher.publish(SAMPLE, {})
+        time.sleep(0.05)
+        self.assertEqual(received, [])
+
+    def test_invalid_subscriptions_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.publisher.subscribe()
+        with self.assertRaises(ValueError):
+            self.publisher.subscribe(callback=print, topics=["unknown"])
+        with self.assertRaises(ValueError):
+            self.publisher.subscribe(queue=asyncio.Queue())
+
+    def test_asyncio_queue_coalesces_when_full(self):
+        async def run():
+            queue = asyncio.Queue(maxsize=1)
+            subscription = self.publisher.subscribe(queue=queue)
+            for n in range(3):
+                self.publisher.publish(SAMPLE, {"n": n})
+                await asyncio.sleep(0.01)
+            first = await asyncio.wait_for(queue.get(), 1)
+            second = await asyncio.wait_for(queue.get(), 1)
+            subscription.cancel()
+            return first.payload["n"], second.payload["n"]
+
+        self.assertEqual(asyncio.run(run()), (0, 2))
+
+
+class TestMonitoringSubscription(unittest.TestCase):
+    def test_samples_are_pushed_to_subscribers(self):
+        monitor = MonitoringManager(sampling_interval=0.02)
+        self.addCleanup(monitor.cleanup)
+        received = []
+        arrived = threading.Event()
+
+        def callback(event):
+            received.append(event)
+            arrived.set()
+
+        monitor.subscribe(callback=callback, topics=[SAMPLE])
+        self.assertTrue(monitor.initialize())
+        self.assertTrue(arrived.wait(2))
+        payload = received[0].payload
+        self.assertTrue(payload["success"])
+        self.assertIn("cpu_percent", payload)
+        self.assertIn("health_status", payload)
+
+
+class TestGUIMetricsSubscription(unittest.TestCase):
+    def _create_gui(self, core):
+        # Headless stand-ins for Tk; only the scheduling calls matter here
+        stand_ins = {
+            "tk": MagicMock(TclError=tkinter.TclError),
+            "ttk": MagicMock(),
+            "theme": MagicMock(),
+            "GUIWorker": MagicMock(),
+            "ScrollableFrame": MagicMock(),
+        }
+        with ExitStack() as stack:
+            for name, stand_in in stand_ins.items():
+                stack.enter_context(patch.object(sentinel_gui, name, stand_in))
+            stack.enter_context(patch("tkinter.scrolledtext.ScrolledText"))
+            return sentinel_gui.SentinelGUI(core)
+
+    @staticmethod
+    def _scheduled(gui):
+        return [call.args[1] for call in gui.root.after.call_args_list]
+
+    def test_subscribed_gui_does_not_poll(self):
+        core = MagicMock()
+        gui = self._create_gui(core)
+
+        core.subscribe_metrics.assert_called_once()
+        self.assertNotIn(gui._schedule_metrics_update, self._scheduled(gui))
+        gui.worker.add_task.assert_not_called()
+        core.get_system_metrics.assert_not_called()
+
+    def test_gui_polls_without_subscriptions(self):
+        core = MagicMock(spec=["get_system_metrics", "version"])
+        gui = self._create_gui(core)
+
+        self.assertIn(gui._schedule_metrics_update, self._scheduled(gui))
+        gui.worker.add_task.assert_called_once_with(core.get_system_metrics, ANY)
+
+
+if __name__ == "__main__":
+    unittest.main()
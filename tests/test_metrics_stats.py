@@ -0,0 +1,98 @@
+import unittest
+from array import array
+from unittest.mock import patch
+from src.core import metrics_stats
+from src.core.metrics_buffer import MetricsRingBuffer
+from src.core.metrics_stats import (
+    MetricsStatistics,
+    describe,
+    parse_windows,
+    percentile,
+)
+
+
+def _buffer(samples):
+    buffer = MetricsRingBuffer(100)
+    for timestamp, cpu, sent in samples:
+        buffer.append(timestamp, cpu, 50.0, {"/": cpu / 2}, sent, 0)
+    return buffer
+
+
+class TestDescribe(unittest.TestCase):
+    def test_percentile_interpolates_linearly(self):
+        values = [1.0, 2.0, 3.0, 4.0]
+        self.assertEqual(percentile(values, 0), 1.0)
+        self.assertEqual(percentile(values, 50), 2.5)
+        self.assertAlmostEqual(percentile(values, 95), 3.85)
+        self.assertEqual(percentile(values, 100), 4.0)
+
+    def test_describe_ignores_nan(self):
+        stats = describe(array("d", [float("nan"), 10.0, 20.0, 30.0]))
+        self.assertEqual(stats["count"], 3)
+        self.assertEqual(stats["mean"], 20.0)
+        self.assertEqual((stats["min"], stats["max"]), (10.0, 30.0))
+        self.assertEqual(stats["p50"], 20.0)
+
+    def test_describe_empty_window(self):
+        stats = describe(array("d"))
+        self.assertEqual(stats["count"], 0)
+        self.assertIsNone(stats["p99"])
+
+
+class TestMetricsStatistics(unittest.TestCase):
+    def setUp(self):
+        # One sample per second, 1000 bytes sent per second
+        self.buffer = _buffer((t, float(t * 10), 1000) for t in range(10))
+        self.stats = MetricsStatistics(self.buffer)
+
+    def test_window_covers_the_last_seconds(self):
+        stats = self.stats.window("cpu_percent", seconds=2)
+        self.assertEqual(stats["count"], 3)
+        self.assertEqual((stats["min"], stats["max"]), (70.0, 90.0))
+        self.assertEqual(self.stats.window("cpu_percent")["count"], 10)
+
+    def test_disk_window(self):
+        self.assertEqual(self.stats.disk_window("/", seconds=1)["mean"], 42.5)
+
+    def test_rate_uses_elapsed_time(self):
+        self.assertEqual(self.stats.rate("bytes_sent"), 1000.0)
+        self.assertEqual(self.stats.rate("bytes_sent", seconds=3), 1000.0)
+        self.assertEqual(self.stats.rate("bytes_recv"), 0.0)
+
+    def test_results_are_cached_until_the_next_sample(self):
+        with patch.object(
+            metrics_stats, "describe", wraps=metrics_stats.describe
+        ) as spy:
+            for _ in range(5):
+                self.stats.window("cpu_percent", 60)
+            self.assertEqual(spy.call_count, 1)
+            self.buffer.append(10.0, 0.0, 0.0, {})
+            self.assertEqual(self.stats.window("cpu_percent", 60)["count"], 11)
+            self.assertEqual(spy.call_count, 2)
+
+    def test_ewma_is_updated_incrementally(self):
+        stats = MetricsStatistics(MetricsRingBuffer(10), ewma_alpha=0.5)
+        self.assertIsNone(stats.ewma()["cpu_percent"])
+        stats.observe(0.0, 10.0, 50.0, {"bytes_sent": 0})
+        stats.observe(2.0, 30.0, 50.0, {"bytes_sent": 4000, "disk_read_bytes": 10})
+        ewma = stats.ewma()
+        self.assertEqual(ewma["cpu_percent"], 20.0)
+        self.assertEqual(ewma["bytes_sent_per_second"], 2000.0)
+        self.assertEqual(ewma["disk_read_bytes_per_second"], 5.0)
+
+    def test_summary_labels_windows(self):
+        summary = self.stats.summary([5, None])
+        self.assertEqual(set(summary["windows"]), {"5s", "all"})
+        window = summary["windows"]["5s"]
+        self.assertEqual(window["cpu_percent"]["count"], 6)
+        self.assertIn("/", window["disk_percent"])
+        self.assertEqual(window["network"]["bytes_sent_per_second"], 1000.0)
+
+    def test_parse_windows(self):
+        self.assertEqual(parse_windows("60, 300, all"), [60.0, 300.0, None])
+        with self.assertRaises(ValueError):
+            parse_windows([0])
+
+
+if __name__ == "__main__":
+    unittest.main()
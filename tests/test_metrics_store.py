@@ -0,0 +1,144 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from src.core.metrics_store import (
+    MetricsStore,
+    MetricsStoreWriter,
+    TierSpec,
+    _Chunk,
+    _column_file,
+)
+
+# Small tiers so tests can cover several chunks and buckets
+TIERS = (
+    TierSpec("raw", 0, 100, 1000),
+    TierSpec("1m", 60, 600, 5000),
+    TierSpec("1h", 3600, 86400, 100000),
+)
+
+
+def _sample(timestamp, cpu=10.0, disk=None):
+    return {
+        "timestamp": timestamp,
+        "cpu_percent": cpu,
+        "memory_percent": 50.0,
+        "bytes_sent": 100,
+        "bytes_recv": 0,
+        "disk_percent": disk if disk is not None else {"/": 40.0},
+    }
+
+
+class TestMetricsStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.store = MetricsStore(self.root, TIERS)
+
+    def test_range_query_spans_chunks(self):
+        self.store.append([_sample(t, cpu=float(t)) for t in range(0, 250, 10)])
+        self.assertEqual(len(list((self.root / "raw").iterdir())), 3)
+        result = self.store.query(95, 125, resolution="raw")
+        self.assertEqual(result["timestamp"], [100.0, 110.0, 120.0])
+        self.assertEqual(result["cpu_percent"], [100.0, 110.0, 120.0])
+        self.assertEqual(result["disk_percent"], {"/": [40.0, 40.0, 40.0]})
+
+    def test_query_can_select_columns(self):
+        self.store.append([_sample(1.0)])
+        result = self.store.query(0, 10, "raw", columns=["cpu_percent"])
+        self.assertEqual(
+            set(result) - {"resolution"}, {"timestamp", "cpu_percent", "disk_percent"}
+        )
+
+    def test_new_mounts_are_padded(self):
+        self.store.append([_sample(1.0, disk={})])
+        self.store.append([_sample(2.0, disk={"D:\\": 70.0})])
+        result = self.store.query(0, 10, "raw")
+        self.assertEqual(result["disk_percent"]["D:\\"], [None, 70.0])
+
+    def test_interrupted_append_is_repaired(self):
+        self.store.append([_sample(1.0), _sample(2.0)])
+        chunk = self.root / "raw" / f"{0:012d}"
+        # Simulate a crash after a column was written but before its timestamp
+        with open(chunk / _column_file("cpu_percent"), "ab") as column_file:
+            column_file.write(b"\0" * 8)
+        store = MetricsStore(self.root, TIERS)
+        store.append([_sample(3.0, cpu=30.0)])
+        result = store.query(0, 10, "raw")
+        self.assertEqual(result["cpu_percent"], [10.0, 10.0, 30.0])
+        self.assertEqual(_Chunk(chunk).row_count(), 3)
+
+    def test_compaction_downsamples_complete_buckets(self):
+        self.store.append([_sample(t, cpu=float(t % 60)) for t in range(0, 150)])
+        summary = self.store.compact(now=150)
+        self.assertEqual(summary["downsampled"]["1m"], 2)
+        minute = self.store.query(0, 200, "1m")
+        self.assertEqual(minute["timestamp"], [0.0, 60.0])
+        self.assertEqual(minute["cpu_percent"], [29.5, 29.5])
+        self.assertEqual(minute["cpu_percent_max"], [59.0, 59.0])
+        self.assertEqual(minute["bytes_sent"], [6000.0, 6000.0])
+        self.assertEqual(minute["samples"], [60.0, 60.0])
+        # The partial minute is picked up by the next compaction only
+        self.store.compact(now=180)
+        self.assertEqual(
+            self.store.query(0, 200, "1m")["timestamp"], [0.0, 60.0, 120.0]
+        )
+
+    def test_hour_tier_weights_minutes_by_sample_count(self):
+        self.store.append([_sample(t, cpu=10.0) for t in range(0, 60)])
+        self.store.append([_sample(t, cpu=40.0) for t in range(60, 90)])
+        self.store.compact(now=120)
+        self.store.compact(now=3600)
+        hour = self.store.query(0, 3600, "1h")
+        self.assertEqual(hour["samples"], [90.0])
+        self.assertEqual(hour["cpu_percent"], [20.0])
+
+    def test_retention_removes_old_chunks(self):
+        self.store.append([_sample(t) for t in range(0, 300, 10)])
+        summary = self.store.compact(now=1250)
+        self.assertEqual(summary["removed_chunks"]["raw"], 2)
+        self.assertEqual(self.store.query(0, 400, "raw")["timestamp"][0], 200.0)
+
+    def test_state_survives_reopening(self):
+        self.store.append([_sample(t) for t in range(0, 120)])
+        self.store.compact(now=120)
+        reopened = MetricsStore(self.root, TIERS)
+        self.assertEqual(reopened.compact(now=120)["downsampled"], {})
+
+    def test_select_tier_prefers_finest_retained_tier(self):
+        self.assertEqual(self.store.select_tier(900, 1000, now=1000).name, "raw")
+        self.assertEqual(self.store.select_tier(0, 1000, now=2000).name, "1m")
+        self.assertEqual(self.store.select_tier(0, 1000, now=50000).name, "1h")
+
+    def test_unknown_resolution(self):
+        with self.assertRaises(ValueError):
+            self.store.query(0, 1, resolution="5m")
+
+
+class TestMetricsStoreWriter(unittest.TestCase):
+    def test_writer_batches_in_background(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = MetricsStore(tmp, TIERS)
+            writer = MetricsStoreWriter(store, flush_interval=0.01)
+            writer.start()
+            now = time.time()
+            for offset in range(5):
+                self.assertTrue(writer.submit(_sample(now + offset)))
+            writer.close()
+            self.assertEqual(writer.written, 5)
+            result = store.query(now, now + 10, "raw")
+            self.assertEqual(len(result["timestamp"]), 5)
+
+    def test_full_queue_drops_samples(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = MetricsStoreWriter(MetricsStore(tmp, TIERS), max_pending=1)
+            self.assertTrue(writer.submit(_sample(1.0)))
+            self.assertFalse(writer.submit(_sample(2.0)))
+            self.assertEqual(writer.dropped, 1)
+            writer.close()
+            self.assertEqual(writer.written, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
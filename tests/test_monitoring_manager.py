@@ -0,0 +1,108 @@
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from src.core.monitoring_manager import MonitoringManager
+
+
+class TestBackgroundSampling(unittest.TestCase):
+    def setUp(self):
+        self.monitor = MonitoringManager(sampling_interval=0.05)
+        self.addCleanup(self.monitor.cleanup)
+
+    def test_collect_metrics_returns_latest_sample_without_blocking(self):
+        self.assertTrue(self.monitor.initialize())
+        self.assertTrue(self.monitor.is_sampling)
+        started = time.perf_counter()
+        for _ in range(100):
+            metrics = self.monitor.collect_metrics()
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertIs(metrics, self.monitor.get_current_metrics())
+
+    def test_history_is_bounded(self):
+        self.monitor.initialize({"metrics_history_size": 3, "sampling_interval": 0.01})
+        time.sleep(0.2)
+        self.assertEqual(len(self.monitor.get_metrics_history()), 3)
+        history = self.monitor.get_performance_history()
+        self.assertEqual(history["history_size"], 3)
+
+    def test_history_can_be_exported_as_columns(self):
+        self.monitor.initialize({"sampling_interval": 0.01})
+        time.sleep(0.1)
+        history = self.monitor.get_performance_history(start=-2, columnar=True)
+        columns = history["columns"]
+        self.assertEqual(history["history_size"], 2)
+        self.assertEqual(len(columns["cpu_percent"]), 2)
+        self.assertEqual(len(columns["bytes_sent"]), 2)
+        for values in columns["disk_percent"].values():
+            self.assertEqual(len(values), 2)
+
+    def test_statistics_use_configured_windows(self):
+        self.monitor.initialize({"statistics_windows": "1, all"})
+        self.monitor.collect_metrics()
+        statistics = self.monitor.get_statistics()
+        self.assertTrue(statistics["success"])
+        self.assertEqual(set(statistics["windows"]), {"1s", "all"})
+        self.assertGreaterEqual(statistics["windows"]["all"]["cpu_percent"]["count"], 1)
+        self.assertIn("cpu_percent", statistics["ewma"])
+
+    def test_samples_are_persisted_to_the_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            started = time.time() - 1
+            self.monitor.initialize({"store_dir": tmp, "sampling_interval": 0.01})
+            time.sleep(0.1)
+            history = self.monitor.get_performance_history(
+                since=started, resolution="raw", columnar=True
+            )
+            self.monitor.cleanup()
+            self.assertTrue(history["success"])
+            self.assertEqual(history["resolution"], "raw")
+            self.assertGreater(history["history_size"], 1)
+            self.assertIn("cpu_percent", history["columns"])
+
+    def test_stored_history_requires_a_store(self):
+        history = self.monitor.get_performance_history(since=0)
+        self.assertFalse(history["success"])
+
+    def test_get_system_metrics_keeps_its_shape(self):
+        self.monitor.initialize()
+        metrics = self.monitor.get_system_metrics()
+        self.assertTrue(metrics["success"])
+        for key in ("cpu_percent", "memory_percent", "disk_usage", "network_io"):
+            self.assertIn(key, metrics)
+
+    def test_cleanup_stops_the_sampler(self):
+        self.monitor.initialize()
+        self.assertTrue(self.monitor.cleanup())
+        self.assertFalse(self.monitor.is_sampling)
+        self.assertIsNone(self.monitor.get_current_metrics())
+
+    def test_invalid_sampling_interval_fails_initialization(self):
+        self.assertFalse(self.monitor.initialize({"sampling_interval": 0}))
+
+
+class TestSynchronousFallback(unittest.TestCase):
+    @patch("psutil.cpu_percent", return_value=12.5)
+    def test_rates_are_derived_from_consecutive_samples(self, mock_cpu):
+        monitor = MonitoringManager()
+        first = monitor.collect_metrics()
+        self.assertEqual(first.network_rates, {})
+        second = monitor.collect_metrics()
+        self.assertTrue(second.network_rates)
+        for rates in second.network_rates.values():
+            self.assertIn("bytes_recv_per_second", rates)
+        self.assertIn("disk_read_bytes", second.io_deltas)
+        self.assertEqual(len(monitor.metrics_history.column("disk_read_bytes")), 2)
+
+    @patch("psutil.cpu_percent", return_value=12.5)
+    def test_collect_metrics_samples_directly_without_sampler(self, mock_cpu):
+        monitor = MonitoringManager()
+        metrics = monitor.collect_metrics()
+        self.assertEqual(metrics.cpu_percent, 12.5)
+        mock_cpu.assert_called_once_with(interval=1)
+        history = monitor.get_metrics_history()
+        self.assertEqual([m.cpu_percent for m in history], [12.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import threading
+import unittest
+from collections import namedtuple
+from unittest.mock import patch
+from src.core.partition_registry import (
+    MountProbeTimeout,
+    PartitionRegistry,
+    get_partition_registry,
+)
+
+Part = namedtuple("Part", "device mountpoint fstype opts")
+Usage = namedtuple("Usage", "total used free percent")
+
+MOUNTS = [
+    Part("proc", "/proc", "proc", "rw"),
+    Part("/dev/sda1", "/", "ext4", "rw"),
+    Part("/dev/sda1", "/etc/hosts", "ext4", "rw"),
+    Part("/dev/sdb1", "/data", "xfs", "rw"),
+    Part("overlay", "/var/lib/docker/overlay2/x/merged", "overlay", "rw"),
+    Part("/dev/sr0", "/media/cdrom", "", "ro"),
+]
+
+
+class TestPartitionRegistry(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("psutil.disk_partitions", return_value=MOUNTS)
+        self.disk_partitions = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.registry = PartitionRegistry(ttl_seconds=3600)
+
+    def test_filters_pseudo_filesystems_and_bind_mounts(self):
+        mounts = [p.mountpoint for p in self.registry.partitions()]
+        self.assertEqual(mounts, ["/", "/data"])
+
+    def test_mount_table_is_cached(self):
+        for _ in range(3):
+            self.registry.partitions()
+        self.assertEqual(self.disk_partitions.call_count, 1)
+        self.registry.invalidate()
+        self.registry.partitions()
+        self.assertEqual(self.disk_partitions.call_count, 2)
+
+    def test_probes_return_usage_or_errors_in_order(self):
+        def usage(mountpoint):
+            if mountpoint == "/data":
+                raise PermissionError(mountpoint)
+            return Usage(100, 40, 60, 40.0)
+
+        with patch("psutil.disk_usage", side_effect=usage):
+            results = self.registry.probe_usage()
+        self.assertEqual(list(results), ["/", "/data"])
+        self.assertEqual(results["/"].percent, 40.0)
+        self.assertIsInstance(results["/data"], PermissionError)
+
+    def test_hung_mount_times_out_and_is_not_probed_again(self):
+        release = threading.Event()
+        calls = []
+
+        def usage(mountpoint):
+            calls.append(mountpoint)
+            if mountpoint == "/data":
+                release.wait(5)
+            return Usage(100, 40, 60, 40.0)
+
+        with patch("psutil.disk_usage", side_effect=usage):
+            first = self.registry.probe_usage(timeout=0.05)
+            second = self.registry.probe_usage(timeout=0.05)
+            release.set()
+        self.assertEqual(first["/"].percent, 40.0)
+        self.assertIsInstance(first["/data"], MountProbeTimeout)
+        self.assertTrue(second["/data"].hung)
+        self.assertEqual(calls.count("/data"), 1)
+
+    def test_shared_registry(self):
+        self.assertIs(get_partition_registry(), get_partition_registry())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import time
+import unittest
+from src.core.monitoring_manager import MonitoringManager
+from src.core.process_sampler import ProcessSampler, format_top, get_process_sampler
+
+
+def _burn(seconds):
+    deadline = time.process_time() + seconds
+    while time.process_time() < deadline:
+        pass
+
+
+class TestProcessSampler(unittest.TestCase):
+    def test_first_scan_has_no_rates(self):
+        snapshot = ProcessSampler(top_n=3).sample()
+        self.assertGreater(snapshot["process_count"], 0)
+        for ranking in ("top_cpu", "top_memory", "top_io"):
+            self.assertLessEqual(len(snapshot[ranking]), 3)
+        self.assertTrue(
+            all(entry["cpu_percent"] is None for entry in snapshot["top_cpu"])
+        )
+
+    def test_busy_process_leads_cpu_ranking(self):
+        sampler = ProcessSampler(top_n=5)
+        sampler.sample()
+        _burn(0.3)
+        snapshot = sampler.sample()
+        pids = [entry["pid"] for entry in snapshot["top_cpu"]]
+        self.assertIn(os.getpid(), pids)
+        own = snapshot["top_cpu"][pids.index(os.getpid())]
+        self.assertGreater(own["cpu_percent"], 10)
+
+    def test_memory_ranking_is_sorted(self):
+        snapshot = ProcessSampler(top_n=5).sample()
+        rss = [entry["rss"] for entry in snapshot["top_memory"]]
+        self.assertEqual(rss, sorted(rss, reverse=True))
+
+    def test_latest_respects_max_age(self):
+        sampler = ProcessSampler()
+        self.assertIsNone(sampler.latest())
+        snapshot = sampler.sample()
+        self.assertIs(sampler.latest(60), snapshot)
+        self.assertIs(sampler.snapshot(60), snapshot)
+        self.assertIsNone(sampler.latest(0))
+
+    def test_invalid_top_n_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ProcessSampler(top_n=0)
+
+    def test_format_top(self):
+        entries = [{"name": "a", "pid": 1}, {"name": "b", "pid": 2}]
+        self.assertEqual(format_top(entries, 1), "a (1)")
+
+    def test_shared_sampler(self):
+        self.assertIs(get_process_sampler(), get_process_sampler())
+
+
+class TestMonitoringProcesses(unittest.TestCase):
+    def test_scans_are_kept_in_process_history(self):
+        monitor = MonitoringManager(sampling_interval=0.02)
+        self.addCleanup(monitor.cleanup)
+        monitor.initialize({"process_sampling_interval": 0.05, "process_top_n": 4})
+        time.sleep(0.3)
+        history = monitor.get_process_history(ranking="top_memory")
+        self.assertTrue(history["success"])
+        self.assertGreater(history["history_size"], 1)
+        self.assertLessEqual(len(history["snapshots"][-1]["top_memory"]), 4)
+        self.assertIsNotNone(monitor.get_current_metrics().top_processes)
+        self.assertFalse(monitor.get_process_history(ranking="bogus")["success"])
+
+    def test_process_sampling_can_be_disabled(self):
+        monitor = MonitoringManager(sampling_interval=0.02)
+        self.addCleanup(monitor.cleanup)
+        monitor.initialize({"process_sampling_interval": 0})
+        time.sleep(0.1)
+        self.assertEqual(monitor.get_process_history()["history_size"], 0)
+        self.assertIsNone(monitor.get_current_metrics().top_processes)
+
+
+if __name__ == "__main__":
+    unittest.main()
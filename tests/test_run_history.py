@@ -0,0 +1,188 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from src.core.performance_optimizer import ConfigurationError, PerformanceOptimizer
+from src.core.run_history import (
+    OUTCOME_CANCELLED,
+    OUTCOME_ERROR,
+    OUTCOME_FAILED,
+    OUTCOME_SUCCESS,
+    RunHistory,
+    RunHistoryWriter,
+)
+
+
+def report(*tasks, success=True):
+    return {
+        "success": success,
+        "duration_seconds": sum(duration for _, duration, _ in tasks),
+        "tasks_completed": sum(1 for _, _, ok in tasks if ok is True),
+        "tasks_failed": sum(1 for _, _, ok in tasks if ok is not True),
+        "task_results": [
+            {
+                "name": name,
+                "success": ok is True,
+                "duration_seconds": duration,
+                **({} if ok is True else {"error": ok or "TaskExecutionError"}),
+            }
+            for name, duration, ok in tasks
+        ],
+    }
+
+
+class TestRunHistory(unittest.TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        self.history = RunHistory(self.dir / "runs.db")
+        self.addCleanup(self.history.close)
+
+    def test_duration_percentile(self):
+        for duration in range(1, 101):
+            self.history.record(report(("temp_cleanup", duration, True)), "default")
+        self.assertEqual(self.history.duration_percentile("temp_cleanup", 95), 95)
+        self.assertEqual(self.history.duration_percentile("temp_cleanup", 100), 100)
+        self.assertEqual(self.history.duration_percentile("temp_cleanup", 0), 1)
+        self.assertIsNone(self.history.duration_percentile("disk_defrag"))
+        with self.assertRaises(ValueError):
+            self.history.duration_percentile("temp_cleanup", 101)
+
+    def test_queries_filter_by_time_and_profile(self):
+        now = time.time()
+        self.history.record(report(("a", 100, True)), "old", now - 40 * 86400)
+        self.history.record(report(("a", 1, True)), "default", now)
+        since = now - 30 * 86400
+        self.assertEqual(self.history.duration_percentile("a", 95, since=since), 1)
+        self.assertEqual(self.history.duration_percentile("a", 95, profile="old"), 100)
+        self.assertEqual(
+            [run["profile"] for run in self.history.runs()], ["default", "old"]
+        )
+        self.assertEqual(self.history.prune(since), 1)
+        self.assertEqual(self.history.count(), 1)
+
+    def test_failure_rates_per_task(self):
+        self.history.record(report(("a", 1, True), ("b", 1, True)), "default")
+        self.history.record(
+            report(("a", 1, None), ("b", 1, "cancelled"), success=False), "default"
+        )
+        self.history.record(report(("a", 1, True), ("b", 1, True)), "default")
+        self.history.record(report(("a", 1, True), ("b", 1, True)), "default")
+        self.assertEqual(self.history.failure_rates(), {"a": 0.25, "b": 0.25})
+        stats = self.history.task_stats()["b"]
+        self.assertEqual((stats["failures"], stats["cancelled"]), (0, 1))
+
+    def test_cancelled_tasks_count_as_failures(self):
+        self.history.record(
+            report(("scan", 2, OUTCOME_CANCELLED), success=False), "default"
+        )
+        self.history.record(report(("scan", 4, True)), "default")
+        stats = self.history.task_stats()["scan"]
+        self.assertEqual(
+            (stats["runs"], stats["failures"], stats["cancelled"]), (2, 0, 1)
+        )
+        self.assertEqual(stats["failure_rate"], 0.5)
+        self.assertEqual(stats["mean_duration"], 3)
+        self.assertEqual(stats["max_duration"], 4)
+
+    def test_run_outcomes_and_reports(self):
+        ok = self.history.record(report(("a", 1, True)), "default")
+        self.history.record(report(("a", 1, None), success=False), "default")
+        self.history.record({"success": False, "error": "boom"}, "default")
+        outcomes = [run["outcome"] for run in self.history.runs()]
+        self.assertEqual(outcomes, [OUTCOME_ERROR, OUTCOME_FAILED, OUTCOME_SUCCESS])
+        self.assertEqual(len(self.history.runs(outcome=OUTCOME_FAILED)), 1)
+        self.assertEqual(self.history.report(ok)["task_results"][0]["name"], "a")
+        self.assertIsNone(self.history.report(12345))
+        with self.assertRaises(ValueError):
+            self.history.runs(outcome="bogus")
+
+    def test_writer_records_in_the_background(self):
+        writer = RunHistoryWriter(self.history)
+        writer.start()
+        self.assertTrue(writer.submit(report(("a", 1, True)), "default"))
+        writer.close()
+        self.assertEqual(writer.written, 1)
+        self.assertEqual(self.history.count(), 1)
+
+    def test_flush_keeps_the_writer_order(self):
+        recorded = []
+        record = self.history.record
+
+        def slow_record(report, profile, timestamp):
+            time.sleep(0.05)
+            recorded.append(report["duration_seconds"])
+            record(report, profile, timestamp)
+
+        self.history.record = slow_record
+        writer = RunHistoryWriter(self.history)
+        writer.start()
+        self.addCleanup(writer.close)
+        for duration in range(1, 6):
+            writer.submit(report(("a", duration, True)), "default")
+        readers = [threading.Thread(target=writer.flush) for _ in range(3)]
+        for reader in readers:
+            reader.start()
+        writer.flush()
+        self.assertEqual(recorded, [1, 2, 3, 4, 5])
+        for reader in readers:
+            reader.join()
+
+    def test_full_writer_queue_drops_reports(self):
+        writer = RunHistoryWriter(self.history, max_pending=1)
+        self.assertTrue(writer.submit(report(), "default"))
+        self.assertFalse(writer.submit(report(), "default"))
+        self.assertEqual(writer.dropped, 1)
+        self.assertEqual(writer.flush(), 1)
+        self.assertEqual(self.history.runs()[0]["outcome"], OUTCOME_SUCCESS)
+
+
+class TestOptimizerRunHistory(unittest.TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        self.optimizer = PerformanceOptimizer()
+        self.optimizer.config.set("Performance", "measure_task_impact", "false")
+        self.addCleanup(
+            self.optimizer.config.remove_option, "Performance", "measure_task_impact"
+        )
+        self.optimizer._tasks["noop"] = lambda: {"success": True, "details": "ok"}
+        self.optimizer._tasks["fail"] = lambda: {"success": False, "error": "nope"}
+        self.optimizer._validate_optimization_ready = lambda: None
+        self.optimizer.open_history(self.dir / "runs.db")
+        self.addCleanup(self.optimizer.close_history)
+
+    def test_runs_are_recorded(self):
+        self.optimizer._get_tasks_for_profile = lambda profile: [
+            {"name": "noop", "function": "noop", "priority": 1},
+            {"name": "fail", "function": "fail", "priority": 2},
+        ]
+        self.optimizer.optimize_system("quick")
+        history = self.optimizer.get_run_history()
+        self.assertTrue(history["success"])
+        self.assertEqual(history["runs"][0]["profile"], "quick")
+        self.assertEqual(history["runs"][0]["outcome"], OUTCOME_FAILED)
+        stats = self.optimizer.get_task_statistics()["tasks"]
+        self.assertEqual(stats["fail"]["failure_rate"], 1.0)
+        self.assertIsNotNone(stats["noop"]["p95_duration"])
+
+    def test_failed_runs_are_recorded(self):
+        def broken_profile(profile):
+            raise ConfigurationError("broken profile")
+
+        self.optimizer._get_tasks_for_profile = broken_profile
+        with self.assertRaises(ConfigurationError):
+            self.optimizer.optimize_system()
+        runs = self.optimizer.get_run_history()["runs"]
+        self.assertEqual([run["outcome"] for run in runs], [OUTCOME_ERROR])
+
+    def test_queries_without_history_fail_softly(self):
+        self.optimizer.close_history()
+        self.assertFalse(self.optimizer.get_run_history()["success"])
+        self.assertFalse(self.optimizer.get_task_statistics()["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+from src.core.monitoring_manager import MonitoringManager
+from src.core.system_snapshot import (
+    SystemSnapshot,
+    SystemSnapshotService,
+    diff_snapshots,
+)
+
+
+class TestDiffSnapshots(unittest.TestCase):
+    def test_only_changed_values_are_reported(self):
+        before = SystemSnapshot(0, "probe", {"a": 1, "b": 2.5, "gone": 3, "s": "x"})
+        after = SystemSnapshot(1, "probe", {"a": 1, "b": 2.0, "new": 4, "s": "y"})
+        self.assertEqual(
+            diff_snapshots(before, after),
+            {
+                "b": {"before": 2.5, "after": 2.0, "delta": -0.5},
+                "gone": {"before": 3, "after": None, "delta": None},
+                "new": {"before": None, "after": 4, "delta": None},
+                "s": {"before": "x", "after": "y", "delta": None},
+            },
+        )
+
+
+class TestSystemSnapshotService(unittest.TestCase):
+    def test_probe_does_not_block_on_cpu(self):
+        service = SystemSnapshotService()
+        started = time.perf_counter()
+        snapshot = service.capture()
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(snapshot.source, "probe")
+        self.assertIn("memory_available", snapshot.values)
+        self.assertIn("process_count", snapshot.values)
+        self.assertTrue(any(key.startswith("disk_free:") for key in snapshot.values))
+
+    def test_snapshot_is_cached_until_ttl(self):
+        service = SystemSnapshotService(ttl_seconds=60)
+        first = service.capture()
+        self.assertIs(service.capture(), first)
+        time.sleep(0.05)  # Let the CPU time counters advance
+        later = service.capture(not_before=time.time())
+        self.assertIsNot(later, first)
+        self.assertIsNotNone(later.values["cpu_percent"])
+        service.invalidate()
+        self.assertIsNot(service.capture(), later)
+
+    def test_concurrent_captures_share_one_probe(self):
+        service = SystemSnapshotService(ttl_seconds=60)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(service.capture()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(snapshot) for snapshot in results}), 1)
+
+    def test_fresh_sampler_sample_is_reused(self):
+        monitor = MonitoringManager(sampling_interval=0.05)
+        self.addCleanup(monitor.cleanup)
+        monitor.initialize({"process_sampling_interval": 0})
+        service = SystemSnapshotService(monitor)
+        snapshot = service.capture()
+        self.assertEqual(snapshot.source, "sampler")
+        self.assertEqual(snapshot.to_dict()["source"], "sampler")
+
+
+if __name__ == "__main__":
+    unittest.main()
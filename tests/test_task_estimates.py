@@ -0,0 +1,151 @@
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from src.core.performance_optimizer import PerformanceOptimizer
+from src.core.task_estimates import TaskDurationModel
+from src.core.task_scheduler import TaskGraph
+
+DAY = 86400
+
+
+class TestTaskDurationModel(unittest.TestCase):
+    def setUp(self):
+        self.now = time.time()
+
+    def model(self, **settings):
+        return TaskDurationModel(min_samples=5, min_timeout=1, **settings)
+
+    def test_timeout_is_high_percentile_times_safety_factor(self):
+        model = self.model(safety_factor=2)
+        for duration in range(1, 101):
+            model.observe("scan", duration, self.now)
+        self.assertEqual(model.timeout("scan", self.now), 198)
+        self.assertEqual(model.estimate("scan", self.now), 50)
+
+    def test_too_few_samples_keep_the_configured_timeout(self):
+        model = self.model()
+        for _ in range(4):
+            model.observe("scan", 10, self.now)
+        self.assertIsNone(model.timeout("scan", self.now))
+        tasks = [{"name": "scan", "timeout": 600}]
+        self.assertEqual(model.apply(tasks, self.now), tasks)
+
+    def test_old_samples_decay(self):
+        model = self.model(half_life_seconds=DAY)
+        for _ in range(10):
+            model.observe("scan", 100, self.now - 10 * DAY)
+        for _ in range(10):
+            model.observe("scan", 1, self.now)
+        # The old samples weigh about 0.1% of the recent ones
+        self.assertEqual(model.quantile("scan", 95, self.now), 1)
+        # Without recent samples the stale estimate falls away entirely
+        self.assertIsNone(model.timeout("scan", self.now + 10 * DAY))
+
+    def test_timeouts_are_bounded(self):
+        model = TaskDurationModel(min_samples=1, min_timeout=30, max_timeout=100)
+        model.observe("fast", 0.1, self.now)
+        model.observe("slow", 1000, self.now)
+        self.assertEqual(model.timeout("fast", self.now), 30)
+        self.assertEqual(model.timeout("slow", self.now), 100)
+
+    def test_fast_runs_do_not_shrink_the_configured_timeout_below_half(self):
+        model = TaskDurationModel(min_samples=5)
+        for _ in range(5):
+            model.observe("temp_cleanup", 2, self.now)
+        self.assertEqual(model.timeout("temp_cleanup", self.now), 30)
+        (task,) = model.apply([{"name": "temp_cleanup", "timeout": 300}], self.now)
+        self.assertEqual(task["timeout"], 150)
+        self.assertEqual(task["configured_timeout"], 300)
+
+        raise_only = TaskDurationModel(min_samples=5, min_timeout_ratio=1)
+        for _ in range(5):
+            raise_only.observe("temp_cleanup", 2, self.now)
+            raise_only.observe("slow", 200, self.now)
+        tasks = raise_only.apply(
+            [
+                {"name": "temp_cleanup", "timeout": 300},
+                {"name": "slow", "timeout": 300},
+            ],
+            self.now,
+        )
+        self.assertEqual([task["timeout"] for task in tasks], [300, 600])
+
+    def test_only_successes_and_timeouts_are_learned(self):
+        model = self.model()
+        results = [
+            {"name": "a", "success": True, "duration_seconds": 1.0},
+            {"name": "b", "success": False, "error": "timeout", "duration_seconds": 5},
+            {
+                "name": "c",
+                "success": False,
+                "error": "cancelled",
+                "duration_seconds": 1,
+            },
+            {"name": "d", "success": False, "error": "unexpected"},
+        ]
+        self.assertEqual(model.observe_results(results, self.now), 2)
+        self.assertEqual(sorted(model.summary(self.now)), ["a", "b"])
+
+    def test_learned_estimates_order_the_schedule(self):
+        model = self.model()
+        for _ in range(5):
+            model.observe("slow", 120, self.now)
+            model.observe("fast", 2, self.now)
+        tasks = model.apply(
+            [
+                {"name": "fast", "timeout": 3600, "priority": 1},
+                {"name": "slow", "timeout": 60, "priority": 2},
+            ],
+            self.now,
+        )
+        self.assertEqual(tasks[1]["configured_timeout"], 60)
+        graph = TaskGraph(tasks)
+        self.assertEqual(graph.estimated_critical_path()[0], ["slow"])
+
+    def test_model_survives_a_restart(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = directory / "task_model.json"
+        model = TaskDurationModel(path, min_samples=1)
+        model.observe("scan", 40, self.now)
+        model.save()
+        loaded = TaskDurationModel.load(path, min_samples=1)
+        self.assertEqual(loaded.timeout("scan", self.now), 120)
+        path.write_text("not json")
+        self.assertEqual(TaskDurationModel.load(path).summary(), {})
+
+    def test_invalid_settings_are_rejected(self):
+        with self.assertRaises(ValueError):
+            TaskDurationModel(safety_factor=0.5)
+        with self.assertRaises(ValueError):
+            TaskDurationModel(min_timeout=10, max_timeout=5)
+        with self.assertRaises(ValueError):
+            TaskDurationModel(min_timeout_ratio=2)
+
+
+class TestOptimizerLearnedTimeouts(unittest.TestCase):
+    def test_runs_use_and_update_the_model(self):
+        optimizer = PerformanceOptimizer()
+        optimizer.config.set("Performance", "measure_task_impact", "false")
+        self.addCleanup(
+            optimizer.config.remove_option, "Performance", "measure_task_impact"
+        )
+        optimizer._tasks["noop"] = lambda: {"success": True, "details": "ok"}
+        optimizer._validate_optimization_ready = lambda: None
+        optimizer._get_tasks_for_profile = lambda profile: [
+            {"name": "noop", "function": "noop", "priority": 1, "timeout": 600}
+        ]
+        optimizer.task_model = TaskDurationModel(min_samples=2, min_timeout=5)
+
+        first = optimizer.optimize_system()
+        self.assertNotIn("learned_timeouts", first)
+        optimizer.optimize_system()
+        third = optimizer.optimize_system()
+        self.assertEqual(third["learned_timeouts"]["noop"]["configured_timeout"], 600)
+        self.assertEqual(third["learned_timeouts"]["noop"]["timeout"], 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.core.performance_optimizer import PerformanceOptimizer
+from src.core.system_snapshot import SystemSnapshot
+from src.core.task_impact import TaskImpactMeter
+from src.core.task_runtime import CancellationToken
+
+
+class ScriptedSnapshots:
+    """Snapshot service stand-in returning the given values in turn."""
+
+    def __init__(self, *values):
+        self.values = list(values)
+
+    def capture(self, not_before=None):
+        return SystemSnapshot(time.time(), "probe", self.values.pop(0))
+
+
+class TestTaskImpactMeter(unittest.TestCase):
+    def test_only_measured_values_are_reported(self):
+        snapshots = ScriptedSnapshots(
+            {"memory_available": 100, "disk_free:/": 50, "swap_percent": 1.0},
+            {"memory_available": 160, "disk_free:/": 50, "swap_percent": 2.0},
+        )
+        meter = TaskImpactMeter(snapshots, settle_seconds=0)
+        impact = meter.finish(meter.start("task"))
+        self.assertEqual(
+            impact["changes"],
+            {"memory_available": {"before": 100, "after": 160, "delta": 60}},
+        )
+        self.assertEqual(impact["overlapping_tasks"], [])
+
+    def test_overlapping_tasks_are_named(self):
+        meter = TaskImpactMeter(ScriptedSnapshots(*[{}] * 6), settle_seconds=0)
+        first = meter.start("first")
+        second = meter.start("second")
+        self.assertEqual(meter.finish(first)["overlapping_tasks"], ["second"])
+        third = meter.start("third")
+        self.assertEqual(meter.finish(second)["overlapping_tasks"], ["first", "third"])
+        self.assertEqual(meter.finish(third)["overlapping_tasks"], ["second"])
+
+    def test_cancellation_ends_the_settling_window(self):
+        meter = TaskImpactMeter(ScriptedSnapshots({}, {}), settle_seconds=5)
+        token = CancellationToken()
+        token.cancel("timeout")
+        started = time.monotonic()
+        impact = meter.finish(meter.start("task"), token)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertLess(impact["settle_seconds"], 1)
+
+    def test_negative_settle_window_is_rejected(self):
+        with self.assertRaises(ValueError):
+            TaskImpactMeter(ScriptedSnapshots(), settle_seconds=-1)
+
+
+class TestOptimizerImpact(unittest.TestCase):
+    def setUp(self):
+        self.optimizer = PerformanceOptimizer()
+        self.optimizer._tasks["noop"] = lambda: {"success": True, "details": "ok"}
+        self.optimizer.config.set("Performance", "impact_settle_seconds", "0.01")
+        self.addCleanup(
+            self.optimizer.config.remove_option,
+            "Performance",
+            "impact_settle_seconds",
+        )
+
+    def run_tasks(self):
+        tasks = [
+            {"name": "a", "function": "noop"},
+            {"name": "b", "function": "noop"},
+        ]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = self.optimizer._execute_tasks(executor, tasks)
+        return self.optimizer._generate_optimization_report(results)
+
+    def test_report_includes_per_task_impact(self):
+        report = self.run_tasks()
+        self.assertEqual(sorted(report["task_impact"]), ["a", "b"])
+        for impact in report["task_impact"].values():
+            self.assertIn("changes", impact)
+            self.assertGreaterEqual(impact["settle_seconds"], 0.01)
+
+    def test_measurement_can_be_disabled(self):
+        self.optimizer.config.set("Performance", "measure_task_impact", "false")
+        self.addCleanup(
+            self.optimizer.config.remove_option, "Performance", "measure_task_impact"
+        )
+        report = self.run_tasks()
+        self.assertNotIn("task_impact", report)
+        self.assertTrue(all("impact" not in r for r in report["task_results"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+from unittest.mock import patch
+from src.core.performance_optimizer import ConfigurationError, PerformanceOptimizer
+from src.core.task_plan import TaskPlanError, compile_task_plan, parse_param
+
+DEFAULTS = {
+    "scan": {
+        "function": "scan_files",
+        "priority": 2,
+        "timeout": 60,
+        "enabled": True,
+        "depends_on": [],
+    },
+    "trim": {
+        "function": "trim_memory",
+        "priority": 1,
+        "timeout": 30,
+        "enabled": True,
+        "params": {"aggressive": False},
+    },
+    "defrag": {"function": "defrag", "priority": 3, "enabled": True, "os": "Windows"},
+}
+FUNCTIONS = ("scan_files", "trim_memory", "defrag")
+
+
+def compile_plan(section, system="Linux"):
+    return compile_task_plan("quick", section, DEFAULTS, FUNCTIONS, system, "hash")
+
+
+class TestCompileTaskPlan(unittest.TestCase):
+    def test_defaults_without_a_section(self):
+        plan = compile_plan(None)
+        self.assertEqual(plan.source, "defaults")
+        self.assertEqual([task.name for task in plan.tasks], ["trim", "scan"])
+        self.assertIn("not found", plan.warnings[0])
+        self.assertTrue(plan.valid)
+
+    def test_profile_lines_override_the_defaults(self):
+        plan = compile_plan(
+            {
+                "scan": "true;0;120;depth=3;ratio=0.5;depends_on=trim;executor=Process",
+                "trim": "false",
+            }
+        )
+        (scan,) = plan.task_configs()
+        self.assertEqual(scan["priority"], 0)
+        self.assertEqual(scan["timeout"], 120)
+        self.assertEqual(scan["params"], {"depth": 3, "ratio": 0.5})
+        self.assertEqual(scan["depends_on"], ["trim"])
+        self.assertEqual(scan["executor"], "process")
+        self.assertEqual(plan.warnings, ())
+
+    def test_malformed_line_falls_back_with_a_precise_warning(self):
+        plan = compile_plan({"scan": "true;high", "bogus": "true"})
+        scan = plan.task_configs()[1]
+        self.assertEqual(scan["priority"], 2)
+        self.assertEqual(
+            plan.warnings,
+            (
+                "[OptimizationProfile:quick] bogus: unknown task; ignored",
+                "[OptimizationProfile:quick] scan = 'true;high': field 2 (priority) "
+                "must be an integer, got 'high'; using the task defaults",
+            ),
+        )
+
+    def test_scheduling_problems_are_errors(self):
+        plan = compile_plan({"scan": "true;2;60;executor=gpu"})
+        self.assertFalse(plan.valid)
+        self.assertIn("unknown executor 'gpu'", plan.errors[0])
+        with self.assertRaises(TaskPlanError) as raised:
+            plan.raise_for_errors()
+        self.assertEqual(raised.exception.details["profile"], "quick")
+
+    def test_os_specific_and_unimplemented_tasks_are_skipped(self):
+        windows = compile_task_plan("p", None, DEFAULTS, FUNCTIONS, "Windows")
+        self.assertIn("defrag", [task.name for task in windows.tasks])
+        missing = compile_task_plan("p", None, DEFAULTS, ("scan_files",), "Linux")
+        self.assertEqual([task.name for task in missing.tasks], ["scan"])
+        self.assertIn("'trim_memory' is not implemented", missing.warnings[1])
+
+    def test_plan_is_immutable(self):
+        plan = compile_plan(None)
+        with self.assertRaises(TypeError):
+            plan.tasks[0].config["priority"] = 5
+        configs = plan.task_configs()
+        configs[0]["params"]["aggressive"] = True
+        self.assertFalse(plan.task_configs()[0]["params"]["aggressive"])
+
+    def test_parse_param(self):
+        self.assertEqual(
+            [parse_param(v) for v in ("TRUE", "false", "7", "1.5", "a.b")],
+            [True, False, 7, 1.5, "a.b"],
+        )
+
+
+class TestOptimizerTaskPlans(unittest.TestCase):
+    SECTION = "OptimizationProfile:plan-test"
+
+    def setUp(self):
+        self.optimizer = PerformanceOptimizer()
+        self.config = self.optimizer.config
+        self.config.add_section(self.SECTION)
+        self.addCleanup(self.config.remove_section, self.SECTION)
+        self.config.set(self.SECTION, "memory_optimization", "true;1;100")
+        self.config.set(self.SECTION, "temp_cleanup", "false")
+
+    def test_plan_is_cached_until_the_config_changes(self):
+        plan = self.optimizer._get_task_plan("plan-test")
+        self.assertIs(self.optimizer._get_task_plan("plan-test"), plan)
+        self.assertEqual(
+            self.optimizer._get_tasks_for_profile("plan-test")[0]["timeout"], 100
+        )
+        self.config.set(self.SECTION, "memory_optimization", "true;1;200")
+        self.assertIsNot(self.optimizer._get_task_plan("plan-test"), plan)
+        self.assertEqual(
+            self.optimizer._get_tasks_for_profile("plan-test")[0]["timeout"], 200
+        )
+
+    def test_unchanged_config_is_not_rehashed(self):
+        manager = self.optimizer.config_manager
+        plan = self.optimizer._get_task_plan("plan-test")
+        with patch("src.core.config_manager.hashlib.sha1") as sha1:
+            self.assertIs(self.optimizer._get_task_plan("plan-test"), plan)
+            sha1.assert_not_called()
+
+        before = manager.content_hash()
+        self.config[self.SECTION]["temp_cleanup"] = "true"
+        changed = manager.content_hash()
+        self.assertNotEqual(changed, before)
+        self.config.read_dict({self.SECTION: {"temp_cleanup": "false"}})
+        self.assertEqual(manager.content_hash(), before)
+
+    def test_invalid_profile_is_rejected_up_front(self):
+        self.config.set(
+            self.SECTION, "memory_optimization", "true;1;100;depends_on=nothing"
+        )
+        with self.assertRaises(ConfigurationError):
+            self.optimizer._get_tasks_for_profile("plan-test")
+        report = self.optimizer.validate_profiles()
+        self.assertFalse(report["success"])
+        self.assertIn("nothing", report["profiles"]["plan-test"]["errors"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
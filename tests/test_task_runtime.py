@@ -0,0 +1,104 @@
+import sys
+import threading
+import time
+import unittest
+from src.core.performance_optimizer import DiskOperationError, PerformanceOptimizer
+from src.core.task_runtime import (
+    CancellationToken,
+    InlineExecutor,
+    IsolatedTaskError,
+    TaskCancelledError,
+    run_cancellable_process,
+    run_in_subprocess,
+)
+
+
+def _fail_with_disk_error():
+    raise DiskOperationError("Volume is read-only")
+
+
+class TestCancellationToken(unittest.TestCase):
+    def test_callbacks_run_once_on_cancel(self):
+        calls = []
+        token = CancellationToken()
+        token.add_callback(lambda: calls.append("a"))
+        token.cancel("timeout")
+        token.cancel("again")
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(token.reason, "timeout")
+        with self.assertRaises(TaskCancelledError):
+            token.raise_if_cancelled()
+
+    def test_callback_added_after_cancel_runs_immediately(self):
+        calls = []
+        token = CancellationToken()
+        token.cancel()
+        token.add_callback(lambda: calls.append("late"))
+        self.assertEqual(calls, ["late"])
+
+
+class TestInlineExecutor(unittest.TestCase):
+    def test_runs_in_the_calling_thread(self):
+        future = InlineExecutor().submit(threading.current_thread)
+        self.assertTrue(future.done())
+        self.assertIs(future.result(), threading.current_thread())
+
+    def test_exceptions_are_captured(self):
+        future = InlineExecutor().submit(int, "x")
+        self.assertIsInstance(future.exception(), ValueError)
+
+
+class TestRunCancellableProcess(unittest.TestCase):
+    def test_captures_output(self):
+        completed = run_cancellable_process(
+            [sys.executable, "-c", "print('hello')"], check=True
+        )
+        self.assertEqual(completed.stdout.strip(), "hello")
+
+    def test_cancel_kills_the_process(self):
+        token = CancellationToken()
+        threading.Timer(0.2, token.cancel).start()
+        started = time.monotonic()
+        with self.assertRaises(TaskCancelledError):
+            run_cancellable_process(
+                [sys.executable, "-c", "import time; time.sleep(30)"], token
+            )
+        self.assertLess(time.monotonic() - started, 10)
+
+
+class TestRunInSubprocess(unittest.TestCase):
+    def test_returns_the_result(self):
+        self.assertEqual(run_in_subprocess(pow, (2, 10)), 1024)
+
+    def test_errors_are_reported(self):
+        with self.assertRaises(IsolatedTaskError) as ctx:
+            run_in_subprocess(int, ("not a number",))
+        self.assertIn("ValueError", str(ctx.exception))
+
+    def test_error_type_is_kept(self):
+        with self.assertRaises(IsolatedTaskError) as ctx:
+            run_in_subprocess(int, ("not a number",))
+        self.assertEqual(ctx.exception.error_type, "ValueError")
+        self.assertIn("not a number", ctx.exception.error_message)
+
+    def test_known_errors_are_classified_like_on_the_thread_backend(self):
+        optimizer = PerformanceOptimizer()
+        on_thread = optimizer._optimize_task_wrapper("disk", _fail_with_disk_error, {})
+        in_process = optimizer._optimize_task_wrapper(
+            "disk", lambda: run_in_subprocess(_fail_with_disk_error), {}
+        )
+        self.assertEqual(on_thread["error"], "DiskOperationError")
+        self.assertEqual(in_process["error"], on_thread["error"])
+        self.assertEqual(in_process["details"], on_thread["details"])
+
+    def test_cancel_kills_the_child(self):
+        token = CancellationToken()
+        threading.Timer(0.5, token.cancel).start()
+        started = time.monotonic()
+        with self.assertRaises(TaskCancelledError):
+            run_in_subprocess(time.sleep, (30,), token)
+        self.assertLess(time.monotonic() - started, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
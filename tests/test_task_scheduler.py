@@ -0,0 +1,227 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.core.task_runtime import InlineExecutor
+from src.core.task_scheduler import DagScheduler, SchedulingError, TaskGraph
+
+
+def _task(name, depends_on=(), resources=(), estimate=1, priority=0, timeout=None):
+    return {
+        "name": name,
+        "depends_on": list(depends_on),
+        "resources": list(resources),
+        "estimated_seconds": estimate,
+        "priority": priority,
+        "timeout": timeout,
+    }
+
+
+class TestTaskGraph(unittest.TestCase):
+    def test_unknown_dependency_is_rejected(self):
+        with self.assertRaises(SchedulingError):
+            TaskGraph([_task("a", depends_on=["missing"])])
+
+    def test_cycle_is_rejected(self):
+        with self.assertRaises(SchedulingError) as ctx:
+            TaskGraph([_task("a", depends_on=["b"]), _task("b", depends_on=["a"])])
+        self.assertEqual(ctx.exception.details["tasks"], ["a", "b"])
+
+    def test_dependency_outside_the_run_is_dropped(self):
+        graph = TaskGraph([_task("a", depends_on=["b"])], known_tasks=["a", "b"])
+        self.assertEqual(graph.nodes["a"].depends_on, ())
+        self.assertEqual(graph.dropped_dependencies, {"a": ["b"]})
+
+    def test_unknown_executor_is_rejected(self):
+        with self.assertRaises(SchedulingError) as ctx:
+            TaskGraph([{"name": "a", "executor": "gpu"}])
+        self.assertEqual(ctx.exception.details["executor"], "gpu")
+
+    def test_estimated_critical_path(self):
+        graph = TaskGraph(
+            [
+                _task("a", estimate=1),
+                _task("b", depends_on=["a"], estimate=5),
+                _task("c", depends_on=["a"], estimate=2),
+            ]
+        )
+        self.assertEqual(graph.estimated_critical_path(), (["a", "b"], 6.0))
+
+
+class TestDagScheduler(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.running = set()
+        self.overlaps = []
+        self.order = []
+
+    def _run(self, config, token):
+        with self.lock:
+            self.overlaps.append((config["name"], frozenset(self.running)))
+            self.running.add(config["name"])
+            self.order.append(config["name"])
+        time.sleep(0.02)
+        with self.lock:
+            self.running.discard(config["name"])
+        return {"name": config["name"], "success": True}
+
+    def _schedule(self, tasks, max_parallel=4):
+        with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+            return DagScheduler(max_parallel).run(executor, TaskGraph(tasks), self._run)
+
+    def test_dependencies_run_first(self):
+        results, schedule = self._schedule(
+            [_task("b", depends_on=["a"]), _task("a"), _task("c", depends_on=["b"])]
+        )
+        self.assertEqual(self.order, ["a", "b", "c"])
+        self.assertEqual(schedule["critical_path"], ["a", "b", "c"])
+        self.assertEqual(len(results), 3)
+
+    def test_conflicting_resources_are_serialized(self):
+        _, schedule = self._schedule(
+            [
+                _task("clean", resources=["disk-io"]),
+                _task("defrag", resources=["disk-io"]),
+                _task("theme", resources=["registry"]),
+            ]
+        )
+        overlaps = dict(self.overlaps)
+        self.assertNotIn("clean", overlaps["defrag"])
+        self.assertNotIn("defrag", overlaps["clean"])
+        self.assertEqual(schedule["max_parallelism"], 2)
+        self.assertEqual(len(schedule["critical_path"]), 2)
+
+    def test_longest_chain_starts_first(self):
+        self._schedule(
+            [
+                _task("short", resources=["cpu"], estimate=1),
+                _task("long", resources=["cpu"], estimate=1),
+                _task("after", depends_on=["long"], estimate=10),
+            ],
+            max_parallel=1,
+        )
+        self.assertEqual(self.order[0], "long")
+
+    def test_tasks_run_on_their_executor_backend(self):
+        threads = {}
+
+        def run(config, token):
+            threads[config["name"]] = threading.current_thread()
+            return {"name": config["name"], "success": True}
+
+        tasks = [_task("pooled"), dict(_task("inline"), executor="inline")]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            _, schedule = DagScheduler(2).run(
+                executor,
+                TaskGraph(tasks),
+                run,
+                executors={"inline": InlineExecutor()},
+            )
+        self.assertIs(threads["inline"], threading.current_thread())
+        self.assertIsNot(threads["pooled"], threading.current_thread())
+        backends = {t["name"]: t["executor"] for t in schedule["timeline"]}
+        self.assertEqual(backends, {"pooled": "thread", "inline": "inline"})
+
+    def test_errors_become_results(self):
+        def fail(config, token):
+            raise RuntimeError("boom")
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results, _ = DagScheduler().run(
+                executor,
+                TaskGraph([_task("a")]),
+                fail,
+                on_error=lambda config, e: {"name": config["name"], "error": str(e)},
+            )
+        self.assertEqual(results, [{"name": "a", "error": "boom"}])
+
+
+class TestDeadlines(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown(wait=True)
+
+    def test_cooperative_task_is_cancelled_at_its_deadline(self):
+        def run(config, token):
+            token.wait(5)
+            return {"name": config["name"], "success": True}
+
+        started = time.monotonic()
+        results, _ = DagScheduler(2).run(
+            self.executor, TaskGraph([_task("slow", timeout=0.1)]), run
+        )
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(results[0]["error"], "timeout")
+        self.assertFalse(results[0]["success"])
+
+    def test_unresponsive_task_is_abandoned_after_grace(self):
+        def run(config, token):
+            if config["name"] == "hung":
+                self.release.wait(5)
+            return {"name": config["name"], "success": True}
+
+        results, schedule = DagScheduler(2, cancel_grace_seconds=0.1).run(
+            self.executor,
+            TaskGraph(
+                [
+                    _task("hung", resources=["disk-io"], timeout=0.1),
+                    _task("next", resources=["disk-io"]),
+                ]
+            ),
+            run,
+        )
+        by_name = {r["name"]: r for r in results}
+        self.assertTrue(by_name["hung"]["abandoned"])
+        # The abandoned task released disk-io so the next one could run
+        self.assertTrue(by_name["next"]["success"])
+        self.assertEqual(schedule["critical_path"], ["hung", "next"])
+
+    def test_deadline_starts_when_the_task_starts(self):
+        ran = []
+
+        def run(config, token):
+            if config["name"] == "a":
+                self.release.wait(1)  # Ignores its token
+            ran.append((config["name"], time.monotonic()))
+            return {"name": config["name"], "success": True}
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown, wait=True)
+        results, _ = DagScheduler(1, cancel_grace_seconds=0.1).run(
+            executor,
+            TaskGraph([_task("a", timeout=0.2), _task("b", ["a"], timeout=0.5)]),
+            run,
+        )
+        returned = time.monotonic()
+        by_name = {r["name"]: r for r in results}
+        self.assertTrue(by_name["a"]["abandoned"])
+        # b waited for the abandoned task's worker instead of timing out queued
+        self.assertTrue(by_name["b"]["success"])
+        self.assertEqual([name for name, _ in ran], ["a", "b"])
+        self.assertLessEqual(ran[1][1], returned)
+
+    def test_cancel_stops_running_and_pending_tasks(self):
+        scheduler = DagScheduler(1)
+
+        def run(config, token):
+            scheduler.cancel("stop")
+            token.raise_if_cancelled()
+            return {"name": config["name"], "success": True}
+
+        results, _ = scheduler.run(
+            self.executor,
+            TaskGraph([_task("first", estimate=2), _task("second")]),
+            run,
+            on_error=lambda config, e: {"name": config["name"], "error": str(e)},
+        )
+        by_name = {r["name"]: r for r in results}
+        self.assertEqual(by_name["first"]["error"], "Task cancelled: stop")
+        self.assertEqual(by_name["second"]["error"], "cancelled")
+
+
+if __name__ == "__main__":
+    unittest.main()